@@ -0,0 +1,329 @@
+"""Benchmarks for python_enigma, with a committed baseline to gate on.
+
+Each benchmark times a workload - loading the catalogue, building machines,
+formatting and parsing messages, stepping an M4 - and records three numbers:
+its rate, in characters (or operations) per second; that rate relative to a
+fixed calibration loop timed alongside it; and the memory it allocates and
+still holds when it returns, output included, per character (or operation).
+Rates are the best of several runs; memory comes from one extra run with
+tracemalloc on, as tracing slows everything down, and is the sum of the
+growths between a snapshot taken before that run and one taken after it,
+divided by the characters handled. Unlike a peak, which a workload repeated
+in a loop reaches once, that total grows with every call that leaks or
+fills a cache.
+
+Run from the repository root::
+
+    python -m benchmarks.bench                # compare with baseline.json
+    python -m benchmarks.bench --save         # record a new baseline
+    python -m benchmarks.bench --quick --only parse_short m4_step
+
+The exit status is 1 if any benchmark's relative rate has fallen, or its
+memory held per character grown, by more than --threshold (a fraction) against
+the baseline. Comparing relative rates takes out how fast the computer is,
+and how busy, so a baseline recorded on one computer holds on another of
+the same Python. Nothing here needs a network or NumPy.
+"""
+
+import argparse
+from collections.abc import Callable, Sequence
+import json
+from pathlib import Path
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, NamedTuple, Optional
+
+from python_enigma.enigma import Catalog, Enigma, Operator
+
+BASELINE = Path(__file__).with_name("baseline.json")
+MESSAGE = (
+    "Vorderhand nur Einsatz von Spezialmaschinen, Stoerungen bei Nachschub: "
+    "Treibstoff (Benzin) fehlt. Lage unveraendert? Ende 1940. "
+)
+M4 = {
+    "rotors": (("Beta", "E"), ("VI", "P"), ("VII", "E"), ("VIII", "L")),
+    "reflector": "Reflector C Thin",
+    "stecker": "AE BF CM DQ HU JN LX PR SZ VW",
+}
+
+CALIBRATION_OPS = 200_000
+
+Workload = Callable[[], object]
+
+
+class Benchmark(NamedTuple):
+    """A named workload. Setup takes the scale (1 for a full run) and
+    returns the function to time and the characters or operations it
+    handles per call."""
+
+    name: str
+    unit: str
+    setup: Callable[[float], tuple[Workload, int]]
+
+
+class Result(NamedTuple):
+    unit: str
+    size: int
+    rate: float
+    relative: float
+    allocated_per_unit: float
+
+
+def calibration() -> None:
+    """Plain interpreted Python - a loop of arithmetic and list lookups -
+    that the rates are measured against."""
+    table = list(range(676))
+    signal = 0
+    for i in range(CALIBRATION_OPS):
+        signal = table[(26 * (i % 26) + signal) % 676]
+
+
+def catalog_json(scale: float) -> tuple[Workload, int]:
+    loads = max(1, int(50 * scale))
+
+    def run() -> None:
+        with Catalog.resource_path("catalogue.json") as path:
+            for _ in range(loads):
+                Catalog.from_json(path)
+
+    return run, loads
+
+
+def catalog_binary(scale: float) -> tuple[Workload, int]:
+    loads = max(1, int(200 * scale))
+
+    def run() -> None:
+        with Catalog.resource_path("catalogue.bin") as path:
+            for _ in range(loads):
+                Catalog.from_binary(path)
+
+    return run, loads
+
+
+def construction(scale: float) -> tuple[Workload, int]:
+    machines = max(1, int(2000 * scale))
+
+    def run() -> None:
+        for _ in range(machines):
+            Enigma(rotors=(("I", "A"), ("II", "B"), ("III", "C")), stecker="AQ BJ")
+
+    return run, machines
+
+
+def operator_format(scale: float) -> tuple[Workload, int]:
+    message = MESSAGE * max(1, int(8000 * scale))
+    operator = Operator(5)
+    return (lambda: operator.format(message)), len(message)
+
+
+def parse_short(scale: float) -> tuple[Workload, int]:
+    messages = max(1, int(2000 * scale))
+    machine = Enigma(rotors=(("I", "A"), ("II", "B"), ("III", "C")), stecker="AQ BJ")
+
+    def run() -> None:
+        for _ in range(messages):
+            machine.set_wheels("ABC")
+            machine.parse(MESSAGE)
+
+    return run, messages * len(MESSAGE)
+
+
+def parse_large(scale: float) -> tuple[Workload, int]:
+    """A multi-megabyte message, without an operator."""
+    message = "HELLO WORLD " * max(1, int((2 << 20) * scale / 12))
+    machine = Enigma(operator=False)
+
+    def run() -> str:
+        machine.set_wheels("AAA")
+        return machine.parse(message)
+
+    return run, len(message)
+
+
+def m4_parse(scale: float) -> tuple[Workload, int]:
+    """Rotors VI to VIII have two notches each, so the M4's middle wheels
+    step twice as often as usual."""
+    message = "A" * max(1, int(200_000 * scale))
+    machine = Enigma(operator=False, **M4)  # type: ignore[arg-type]
+
+    def run() -> str:
+        machine.set_wheels("CDSZ")
+        return machine.parse(message)
+
+    return run, len(message)
+
+
+def m4_step(scale: float) -> tuple[Workload, int]:
+    steps = max(1, int(500_000 * scale))
+    machine = Enigma(operator=False, **M4)  # type: ignore[arg-type]
+    step = machine.wheel_pack.step
+
+    def run() -> None:
+        machine.set_wheels("CDSZ")
+        for _ in range(steps):
+            step()
+
+    return run, steps
+
+
+BENCHMARKS = (
+    Benchmark("catalog_json", "loads", catalog_json),
+    Benchmark("catalog_binary", "loads", catalog_binary),
+    Benchmark("construction", "machines", construction),
+    Benchmark("operator_format", "chars", operator_format),
+    Benchmark("parse_short", "chars", parse_short),
+    Benchmark("parse_large", "chars", parse_large),
+    Benchmark("m4_parse", "chars", m4_parse),
+    Benchmark("m4_step", "steps", m4_step),
+)
+
+
+def best_time(run: Workload, best: float) -> float:
+    start = time.perf_counter()
+    run()
+    return min(best, time.perf_counter() - start)
+
+
+def allocated(run: Workload) -> int:
+    """The bytes run allocates and still holds when it returns, counting
+    what it returns, summed over the source lines that allocated them."""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        output = run()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        tracemalloc.stop()
+    del output
+    return sum(max(0, stat.size_diff) for stat in after.compare_to(before, "lineno"))
+
+
+def measure(benchmark: Benchmark, scale: float, repeat: int) -> Result:
+    """Times the benchmark's best of repeat runs, after one run to warm up,
+    each run next to one of the calibration loop, then runs it once more
+    to count its allocations."""
+    run, size = benchmark.setup(scale)
+    run()
+    best = float("inf")
+    best_calibration = float("inf")
+    for _ in range(repeat):
+        best_calibration = best_time(calibration, best_calibration)
+        best = best_time(run, best)
+    rate = size / best
+    relative = rate / (CALIBRATION_OPS / best_calibration)
+    return Result(benchmark.unit, size, rate, relative, allocated(run) / size)
+
+
+def compare(
+    results: dict[str, Result], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Describes every result that is worse than its baseline entry by more
+    than threshold. Benchmarks missing from the baseline are skipped. Rates
+    are compared relative to the calibration loop, not per second. Memory
+    is only compared for runs of the baseline's size, as what a run holds
+    once, such as a cache filled on its first call, weighs differently per
+    unit at other sizes, and within a byte per unit of the baseline it
+    always passes, so tiny figures don't fail on noise."""
+    failures = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if result.relative < base["relative"] * (1 - threshold):
+            failures.append(
+                f"{name}: {result.relative:.4g} {result.unit} per calibration "
+                f"op, baseline {base['relative']:.4g}"
+            )
+        if result.size != base["size"]:
+            continue
+        allowed = max(
+            base["allocated_per_unit"] * (1 + threshold),
+            base["allocated_per_unit"] + 1,
+        )
+        if result.allocated_per_unit > allowed:
+            failures.append(
+                f"{name}: {result.allocated_per_unit:,.1f} bytes allocated/"
+                f"{result.unit[:-1]}, baseline {base['allocated_per_unit']:,.1f}"
+            )
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=[b.name for b in BENCHMARKS],
+        help="run just these benchmarks",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timed runs each (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="run every workload at a twentieth of its size",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE,
+        help="baseline file (default: benchmarks/baseline.json)",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="write the results to the baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="regression allowed, as a fraction (default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    scale = 0.05 if args.quick else 1.0
+    selected = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+
+    results = {}
+    for benchmark in selected:
+        result = measure(benchmark, scale, args.repeat)
+        results[benchmark.name] = result
+        print(
+            f"{benchmark.name:16} {result.rate:>14,.0f} {result.unit}/s"
+            f" {result.relative:>10.4g} relative"
+            f" {result.allocated_per_unit:>12,.1f} bytes allocated/{result.unit[:-1]}"
+        )
+
+    if args.save:
+        document = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "benchmarks": {name: result._asdict() for name, result in results.items()},
+        }
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Saved the baseline to {args.baseline}.")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save to make one.")
+        return 0
+    baseline = json.loads(args.baseline.read_text())["benchmarks"]
+    failures = compare(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if not failures:
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+
+from python_enigma.cli import main
+
+sys.exit(main())
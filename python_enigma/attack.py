@@ -0,0 +1,233 @@
+"""Ciphertext-only attacks on the Enigma machine.
+
+The rotor search scores every wheel order, reflector and starting position
+by the index of coincidence of the decrypt with an empty stecker board: the
+right rotor settings give text whose letter frequencies are much closer to a
+real language's than to random, even with the stecker still unknown. The best
+candidates then have their ring settings hill-climbed, again by index of
+coincidence.
+
+Every starting position of a wheel order is scored at once: the scrambler for
+each rotor state is built as one table, the decrypts for all starts are array
+gathers on it, and the frequency counts are a single bincount. This needs the
+optional NumPy dependency, like python_enigma.vectorized.
+"""
+
+from collections.abc import Iterable, Sequence
+import heapq
+from itertools import permutations
+from typing import NamedTuple, Optional
+
+from python_enigma import vectorized as vec
+from python_enigma.bombe import letters_only
+from python_enigma.enigma import Catalog, Enigma, pool_map, resolve_catalog
+from python_enigma.vectorized import Array
+
+import numpy as np
+
+# The most decrypted letters score_order holds at once, by default: 32 MiB.
+BLOCK_LETTERS = 1 << 22
+
+
+class Candidate(NamedTuple):
+    """A scored rotor setting. Positions and ringstellung read left to
+    right, as for Enigma.set_wheels and the rotors argument of Enigma."""
+
+    score: float
+    rotors: tuple[str, ...]
+    reflector: str
+    ringstellung: str
+    positions: str
+
+    def machine(
+        self, catalog: Catalog | str = "default", stator: str = "military"
+    ) -> Enigma:
+        """Returns a machine with these settings, wheels set, no stecker and
+        no operator."""
+        machine = Enigma(
+            catalog=catalog,
+            stator=stator,
+            rotors=list(zip(self.rotors, self.ringstellung)),
+            reflector=self.reflector,
+            operator=False,
+        )
+        machine.set_wheels(self.positions)
+        return machine
+
+
+def index_of_coincidence(counts: Array) -> Array:
+    """The index of coincidence for letter counts in the last axis."""
+    counts = counts.astype(np.float64)
+    total = counts.sum(axis=-1)
+    pairs = (counts * (counts - 1)).sum(axis=-1)
+    return pairs / np.maximum(total * (total - 1), 1)  # type: ignore[no-any-return]
+
+
+def score_text(text: bytes) -> float:
+    """The index of coincidence of ASCII upper case text."""
+    counts = np.bincount(np.frombuffer(text, dtype=np.uint8) - 65, minlength=26)
+    return float(index_of_coincidence(counts))
+
+
+def score_order(
+    catalog: Catalog,
+    order: Sequence[str],
+    reflector: str,
+    ringstellung: str,
+    stator: str,
+    ciphertext: bytes,
+    top: int,
+    block: Optional[int] = None,
+) -> list[Candidate]:
+    """Scores every starting position of one wheel order and reflector and
+    returns the top best, best first. Starts are decrypted block at a time;
+    by default as many as come to BLOCK_LETTERS letters between them."""
+    machine = Enigma(
+        catalog=catalog,
+        stator=stator,
+        rotors=list(zip(order, ringstellung)),
+        reflector=reflector,
+        operator=False,
+    )
+    width = len(order)
+    states = vec.all_states(width)
+    scrambler = vec.scrambler_table(machine, states)
+    following = vec.next_states(machine.wheel_pack)
+    letters = np.frombuffer(ciphertext, dtype=np.uint8).astype(np.int64) - 65
+    block = block or max(1, BLOCK_LETTERS // max(1, len(letters)))
+
+    best: list[tuple[float, int]] = []  # A bounded min-heap of (score, start).
+    for first in range(0, len(states), block):
+        starts = np.arange(first, min(first + block, len(states)))
+        current = starts
+        decrypts = np.empty((len(starts), len(letters)), dtype=np.int64)
+        for k, letter in enumerate(letters):
+            current = following[current]  # Step, then substitute.
+            decrypts[:, k] = scrambler[current, letter]
+        decrypts += 26 * np.arange(len(starts))[:, None]
+        counts = np.bincount(decrypts.ravel(), minlength=26 * len(starts))
+        scores = index_of_coincidence(counts.reshape(-1, 26))
+
+        keep = min(top, len(starts))
+        for i in np.argpartition(scores, len(starts) - keep)[len(starts) - keep :]:
+            item = (float(scores[i]), int(starts[i]))
+            if len(best) < top:
+                heapq.heappush(best, item)
+            else:
+                heapq.heappushpop(best, item)
+
+    return [
+        Candidate(
+            score=score,
+            rotors=tuple(order),
+            reflector=reflector,
+            ringstellung=ringstellung,
+            positions="".join(chr(65 + p) for p in reversed(states[start])),
+        )
+        for score, start in sorted(best, reverse=True)
+    ]
+
+
+def climb_rings(
+    candidate: Candidate,
+    ciphertext: str,
+    catalog: Catalog | str = "default",
+    stator: str = "military",
+) -> Candidate:
+    """Hill-climbs the ring settings of a candidate, rightmost wheel first.
+    Turning a ring and the wheel's position by the same amount leaves the
+    wiring where it was and moves only the turnover, so each ring is tried
+    with its position moved along with it, and all 25 trials for a wheel are
+    scored at once on the candidate's own rotor tables."""
+    text = letters_only(ciphertext).encode("ascii")
+    letters = np.frombuffer(text, dtype=np.uint8).astype(np.int64) - 65
+    best = candidate
+    improved = True
+    while improved:
+        improved = False
+        for wheel in reversed(range(len(best.rotors))):
+            scores = ring_trials(best.machine(catalog, stator), letters, wheel)
+            shift = int(np.argmax(scores)) + 1
+            if scores[shift - 1] > best.score:
+                rings = list(best.ringstellung)
+                positions = list(best.positions)
+                rings[wheel] = chr((ord(rings[wheel]) - 65 + shift) % 26 + 65)
+                positions[wheel] = chr((ord(positions[wheel]) - 65 + shift) % 26 + 65)
+                best = best._replace(
+                    score=float(scores[shift - 1]),
+                    ringstellung="".join(rings),
+                    positions="".join(positions),
+                )
+                improved = True
+    return best
+
+
+def ring_trials(machine: Enigma, letters: Array, wheel: int) -> Array:
+    """Scores the decrypts of letters (A=0) with wheel's ring and position
+    (counted left to right) both turned on by 1 to 25 from machine's, as an
+    array of 25 scores. Each trial steps from its own position, but its
+    wiring offsets are taken back by the shift, so the machine's tables
+    stand in for the trial's turned ring."""
+    mechanism = machine.wheel_pack
+    column = len(mechanism.rotors) - 1 - wheel  # Rightmost first.
+    start = [rotor.position for rotor in mechanism.rotors]
+    shifts = np.arange(1, 26)
+
+    positions = np.empty((len(shifts), len(letters), len(start)), dtype=np.int64)
+    for n, shift in enumerate(range(1, 26)):
+        for i, rotor in enumerate(mechanism.rotors):
+            rotor.position = start[i]
+            rotor.step_me = False
+        mechanism.rotors[column].position = (start[column] + shift) % 26
+        positions[n] = vec.step_positions(mechanism, len(letters))
+    positions[:, :, column] -= shifts[:, None]
+    offsets = 26 * (positions % 26)
+
+    entry, lamps = (np.asarray(table) for table in machine.signal_tables())
+    decrypts = lamps[vec.wheel_pack(mechanism, offsets, entry[letters])] - 65
+    decrypts += 26 * np.arange(len(shifts))[:, None]
+    counts = np.bincount(decrypts.ravel(), minlength=26 * len(shifts))
+    return index_of_coincidence(counts.reshape(-1, 26))
+
+
+def search(
+    ciphertext: str,
+    rotors: Sequence[str] = ("I", "II", "III", "IV", "V"),
+    wheels: int = 3,
+    reflectors: Sequence[str] = ("Reflector B",),
+    orders: Optional[Iterable[Sequence[str]]] = None,
+    ringstellung: Optional[str] = None,
+    top: int = 10,
+    climb: bool = True,
+    catalog: Catalog | str = "default",
+    stator: str = "military",
+    workers: Optional[int] = None,
+) -> list[Candidate]:
+    """Scores every wheel order - each arrangement of wheels of the given
+    rotors, unless orders are given explicitly - with every reflector and
+    starting position, spreading the orders over a pool of processes.
+
+    :param ringstellung: One letter per wheel to search with; all A if not
+        given. With climb, the rings of the top candidates are then improved.
+    :param top: How many candidates to keep and return.
+    :param workers: Number of processes; 1 searches in this process.
+    :returns: The top best candidates, best first.
+    """
+    catalog = resolve_catalog(catalog)
+    text = letters_only(ciphertext).encode("ascii")
+    if len(text) < 2:
+        raise ValueError("Too little ciphertext to score.")
+    if orders is None:
+        orders = permutations(rotors, wheels)
+    jobs = [
+        (catalog, order, reflector, ringstellung or "A" * len(order), stator)
+        for order in orders
+        for reflector in reflectors
+    ]
+
+    results = pool_map(score_order, [(*job, text, top) for job in jobs], workers)
+    candidates = heapq.nlargest(top, (c for r in results for c in r))
+    if climb:
+        climbs = [(c, ciphertext, catalog, stator) for c in candidates]
+        candidates = pool_map(climb_rings, climbs, workers)
+    return sorted(candidates, reverse=True)
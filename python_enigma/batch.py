@@ -0,0 +1,238 @@
+"""One message under many keys at once.
+
+Key search and test-vector generation both encipher the same text under a
+great many keys. Building an Enigma per key and typing the message into each
+costs far more than the enciphering itself, so here the keys become rows of
+arrays instead: the stepping of every key is worked out for the whole message
+as cumulative sums over a (keys, letters) array, and the letters of all keys
+pass through the compiled rotor tables as array gathers. No Enigma is built.
+
+Rotor tables come from ROTOR_CACHE, so a batch of keys drawn from the usual
+handful of rotors shares a few tables between all of them. This needs the
+optional NumPy dependency, like python_enigma.vectorized.
+"""
+
+from collections.abc import Sequence
+from itertools import groupby
+import re
+from typing import NamedTuple, Optional
+
+from python_enigma.enigma import (
+    ROTOR_CACHE,
+    Catalog,
+    Enigma,
+    ReflectorNotFound,
+    RotorNotFound,
+    RotorTables,
+    Stator,
+    SteckerSettingsInvalid,
+    resolve_catalog,
+)
+from python_enigma.vectorized import ORD_A, Array
+
+import numpy as np
+
+UNSTECKERED = bytes(range(ORD_A, ORD_A + 26))
+PLUG_PAIRS = re.compile(rb" *[A-Z]{2}(?: +[A-Z]{2})* *")
+
+
+class Key(NamedTuple):
+    """A machine setting. Rotors, ringstellung and positions read left to
+    right, as for the rotors argument of Enigma and Enigma.set_wheels."""
+
+    rotors: tuple[str, ...]
+    ringstellung: str
+    positions: str
+    stecker: Optional[str] = None
+    reflector: str = "Reflector B"
+
+    def machine(
+        self, catalog: Catalog | str = "default", stator: str = "military"
+    ) -> Enigma:
+        """Returns an Enigma with this key and no operator."""
+        machine = Enigma(
+            catalog=catalog,
+            stator=stator,
+            rotors=list(zip(self.rotors, self.ringstellung)),
+            reflector=self.reflector,
+            stecker=self.stecker,
+            operator=False,
+        )
+        machine.set_wheels(self.positions)
+        return machine
+
+
+class KeyBatch:
+    """The compiled tables for a batch of keys with the same number of
+    wheels, as arrays with one row per key. Wheel columns run rightmost
+    first, as in RotorMechanism."""
+
+    def __init__(
+        self,
+        keys: Sequence[Key],
+        catalog: Catalog | str = "default",
+        stator: str = "military",
+        ignore_static_wheels: bool = False,
+    ) -> None:
+        catalog = resolve_catalog(catalog)
+        if not keys:
+            raise ValueError("A batch needs at least one key.")
+        width = len(keys[0].rotors)
+        if any(len(key.rotors) != width for key in keys):
+            raise ValueError("Every key in a batch needs the same number of wheels.")
+
+        # Each distinct rotor gets one row of the banks; keys index into them.
+        bank: dict[tuple[str, str], int] = {}
+        tables: list[RotorTables] = []
+
+        def row(name: str, ringstellung: str) -> int:
+            found = bank.get((name, ringstellung))
+            if found is None:
+                number = ord(ringstellung.upper()) - ORD_A + 1
+                found = bank[(name, ringstellung)] = len(tables)
+                tables.append(
+                    ROTOR_CACHE.get(catalog, name, number, ignore_static_wheels)
+                )
+            return found
+
+        count = len(keys)
+        wheel_rows: list[int] = []
+        reflector_rows: list[int] = []
+        positions = bytearray()
+        steckers = bytearray()
+        for k, key in enumerate(keys):
+            settings = key.ringstellung + key.positions
+            if len(settings) != 2 * width or not (
+                settings.isascii() and settings.isalpha()
+            ):
+                raise ValueError(f"Key {k} needs one ring and position per wheel.")
+            wheel_rows.extend(
+                map(row, reversed(key.rotors), reversed(key.ringstellung))
+            )
+            positions += key.positions[::-1].upper().encode("ascii")
+            try:
+                reflector_rows.append(row(key.reflector, "A"))
+            except RotorNotFound:
+                raise ReflectorNotFound(key.reflector) from None
+            steckers += stecker_letters(key.stecker)
+
+        wheels = np.array(wheel_rows, dtype=np.int64).reshape(count, width)
+        reflectors = np.array(reflector_rows, dtype=np.int64)
+
+        # The stecker and stator folded together, as in Enigma.signal_tables.
+        pins = np.empty(26, dtype=np.int64)
+        for char, pin in Stator(stator).stator_settings.items():
+            pins[ord(char) - ORD_A] = pin - 1
+        stecker_codes = np.frombuffer(steckers, dtype=np.uint8).reshape(count, 26)
+        self.positions = (
+            np.frombuffer(positions, dtype=np.uint8).reshape(count, width) - ORD_A
+        ).astype(np.int64)
+        self.entry = np.empty((count, 26), dtype=np.int64)
+        np.put_along_axis(
+            self.entry, stecker_codes.astype(np.int64) - ORD_A, pins[None, :], axis=1
+        )
+        self.lamps = np.empty((count, 26), dtype=np.uint8)
+        self.lamps[:, pins] = stecker_codes
+
+        self.keys = keys
+        self.wheels = wheels  # (keys, wheels): rows of the banks below.
+        self.forward = np.array([t.forward_table for t in tables], dtype=np.int64)
+        self.backward = np.array([t.backward_table for t in tables], dtype=np.int64)
+        self.reflectors = reflectors
+        self.notches = np.zeros((len(tables), 26), dtype=bool)
+        for i, t in enumerate(tables):
+            self.notches[i, list(t.notch)] = True
+        self.static = np.array([t.static for t in tables], dtype=bool)[wheels]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def step_positions(self, count: int) -> Array:
+        """Returns a (keys, count, wheels) array of the rotor positions in
+        use at each of the next count key presses, from the keys' starting
+        positions. This is vectorized.step_positions with keys as an extra
+        axis: each wheel moves on the presses its right-hand neighbour moved
+        from a notch, and static wheels never move."""
+        keys, width = self.positions.shape
+        positions = np.empty((keys, count, width), dtype=np.int64)
+        if count == 0:
+            return positions
+        fired = np.ones((keys, count), dtype=bool)
+        trigger = fired
+        for i in range(width):
+            static = self.static[:, i, None]
+            start = self.positions[:, i, None]
+            if i > 0:
+                # Once a static wheel's step flag is raised it stays up, so
+                # it counts as firing on every press after.
+                fired = np.where(
+                    static, np.logical_or.accumulate(trigger, axis=1), trigger
+                )
+            steps = np.where(static, 0, np.cumsum(fired, axis=1))
+            positions[:, :, i] = (start + steps) % 26
+            before = np.where(static, start, (start + steps - fired) % 26)
+            trigger = fired & self.notches[self.wheels[:, i, None], before]
+        return positions
+
+    def encipher_codes(self, codes: Array) -> Array:
+        """Enciphers a message given as letter codes (A=0) under every key,
+        returning a (keys, letters) uint8 array of ASCII letters. Codes may
+        also be a (keys, letters) array, a different message for each key."""
+        rows = np.arange(len(self))[:, None]
+        signal = self.entry[rows, np.asarray(codes, dtype=np.int64)]
+        offsets = 26 * self.step_positions(signal.shape[1])
+        wheels = self.wheels[:, :, None]
+        for i in range(wheels.shape[1]):
+            signal = self.forward[wheels[:, i], offsets[:, :, i] + signal]
+        signal = self.forward[self.reflectors[:, None], signal]
+        for i in reversed(range(wheels.shape[1])):
+            signal = self.backward[wheels[:, i], offsets[:, :, i] + signal]
+        return self.lamps[rows, signal]  # type: ignore[no-any-return]
+
+
+def stecker_letters(setting: Optional[str]) -> bytes:
+    """The letter each of A to Z is steckered to, as ASCII. This checks the
+    setting as Stecker does, without building one."""
+    if not setting:
+        return UNSTECKERED
+    text = setting.upper().encode("ascii", errors="replace")
+    plugs = text.replace(b" ", b"")
+    if not PLUG_PAIRS.fullmatch(text) or len(set(plugs)) != len(plugs):
+        raise SteckerSettingsInvalid(setting)
+    firsts, seconds = plugs[0::2], plugs[1::2]
+    return UNSTECKERED.translate(bytes.maketrans(firsts + seconds, seconds + firsts))
+
+
+def encipher(
+    message: str | bytes,
+    keys: Sequence[Key],
+    catalog: Catalog | str = "default",
+    stator: str = "military",
+    block: int = 1 << 22,
+) -> list[bytes]:
+    """Enciphers (or deciphers) message under each of keys, returning the
+    results in the same order. As with Enigma.parse_bytes, letters are
+    enciphered (lower case ones as upper case) and everything else is left
+    where it is; message must be ASCII.
+
+    Keys may have different numbers of wheels; each size is done as its own
+    batch. Batches are split so no array holds much more than block letters.
+    """
+    data = message.encode("ascii") if isinstance(message, str) else bytes(message)
+    text = np.frombuffer(data.upper(), dtype=np.uint8)
+    letters = (text >= ORD_A) & (text <= ord("Z"))
+    codes = text[letters].astype(np.int64) - ORD_A
+    per_batch = max(1, block // max(1, len(codes)))
+
+    results: list[bytes] = [b""] * len(keys)
+    ordered = sorted(range(len(keys)), key=lambda k: len(keys[k].rotors))
+    for _, group in groupby(ordered, key=lambda k: len(keys[k].rotors)):
+        indices = list(group)
+        for first in range(0, len(indices), per_batch):
+            chunk = indices[first : first + per_batch]
+            batch = KeyBatch([keys[k] for k in chunk], catalog, stator)
+            outputs = np.tile(text, (len(chunk), 1))
+            outputs[:, letters] = batch.encipher_codes(codes)
+            for k, output in zip(chunk, outputs):
+                results[k] = output.tobytes()
+    return results
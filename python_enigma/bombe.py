@@ -0,0 +1,271 @@
+"""A Bombe-style key search for the Enigma machine.
+
+Given a ciphertext and a crib - plaintext believed to sit at a known place in
+it - this tries every wheel order, reflector and starting position, and keeps
+those for which some stecker arrangement could turn the crib into the
+ciphertext. This is what the Turing-Welchman Bombe did.
+
+The crib and ciphertext letters form a "menu": a graph with an edge between
+each plaintext letter and its ciphertext letter, labelled with its position.
+Guessing the stecker partner of one menu letter fixes, through the scrambler
+at each position, the partners of every letter connected to it. Loops in the
+menu lead back to letters already fixed, and a contradiction there - or a
+letter steckered to two partners, which Welchman's diagonal board caught - rules
+the guess out. A position where some guess survives is a "stop", reported
+along with the stecker pairs it implies.
+
+As on the real Bombe, ring settings are fixed (all A by default); the search
+finds wheel positions relative to them. Only the letters A-Z of the ciphertext
+and crib count, so operator spacing doesn't matter.
+"""
+
+from collections.abc import Iterable, Sequence
+from itertools import permutations, product
+import re
+from typing import NamedTuple, Optional
+
+from python_enigma.enigma import Catalog, Enigma, pool_map, resolve_catalog
+
+Menu = list[tuple[int, int, int]]
+"""Edges of a menu: (plaintext letter, ciphertext letter, position), A=0."""
+
+
+class BombeStop(NamedTuple):
+    """A wheel order, reflector and starting position consistent with the
+    crib, and the stecker pairs that made it so."""
+
+    rotors: tuple[str, ...]
+    reflector: str
+    positions: str  # As for Enigma.set_wheels, left to right.
+    steckers: tuple[tuple[str, str], ...]
+
+    def stecker_setting(self) -> Optional[str]:
+        """The implied stecker pairs as a string for Enigma, leaving out
+        letters found to be unsteckered."""
+        pairs = " ".join(a + b for a, b in self.steckers if a < b)
+        return pairs or None
+
+
+def letters_only(text: str) -> str:
+    """Returns the letters A-Z of text, upper-cased, and nothing else."""
+    return "".join(c for c in text.upper() if "A" <= c <= "Z")
+
+
+def build_menu(ciphertext: str, crib: str, offset: int = 0) -> Menu:
+    """Returns the menu for crib placed offset letters into ciphertext.
+    Raises ValueError if the crib can't sit there, either because it runs off
+    the end or because a letter would encipher to itself."""
+    ciphertext = letters_only(ciphertext)
+    crib = letters_only(crib)
+    if offset < 0 or offset + len(crib) > len(ciphertext):
+        raise ValueError("The crib doesn't fit in the ciphertext there.")
+
+    menu = []
+    for i, (plain, cipher) in enumerate(zip(crib, ciphertext[offset:])):
+        if plain == cipher:
+            raise ValueError(f"Enigma can't encipher {plain} to itself.")
+        menu.append((ord(plain) - 65, ord(cipher) - 65, i))
+    return menu
+
+
+def drag_cribs(ciphertext: str, cribs: Iterable[str]) -> dict[str, list[int]]:
+    """Returns, for each crib, every offset at which it could sit in
+    ciphertext, using the rule that Enigma never enciphers a letter to
+    itself. The offsets count letters only, as for build_menu and search.
+
+    The result is keyed by each crib's letters as letters_only gives them,
+    since those are all that is matched: cribs that differ only in case,
+    spacing or punctuation share one entry, as do repeated cribs.
+
+    Rather than comparing letter by letter, each letter of the ciphertext
+    becomes a bitmap (one byte per position, held in one big integer) and
+    each crib is checked by OR-ing shifted bitmaps together, so the work per
+    crib letter happens in C over the whole ciphertext at once.
+    """
+    text = letters_only(ciphertext).encode("ascii")
+    bitmaps = {}
+    for letter in range(65, 91):
+        only_letter = bytes(int(code == letter) for code in range(256))
+        bitmaps[letter] = int.from_bytes(text.translate(only_letter), "little")
+
+    offsets: dict[str, list[int]] = {}
+    for crib in cribs:
+        key = letters_only(crib)
+        if key in offsets:
+            continue
+        crib_letters = key.encode("ascii")
+        places = len(text) - len(crib_letters) + 1
+        if places <= 0:
+            offsets[key] = []
+            continue
+        clashes = 0
+        for i, letter in enumerate(crib_letters):
+            clashes |= bitmaps[letter] >> (8 * i)
+        slots = clashes.to_bytes(len(text), "little")[:places]
+        offsets[key] = [match.start() for match in re.finditer(b"\0", slots)]
+    return offsets
+
+
+def crib_offsets(ciphertext: str, crib: str) -> list[int]:
+    """Every offset at which crib could sit in ciphertext. See drag_cribs."""
+    return drag_cribs(ciphertext, [crib])[letters_only(crib)]
+
+
+def menu_loops(menu: Menu) -> int:
+    """Counts the independent loops in the menu. More loops mean fewer
+    false stops; a menu without any relies on the diagonal board alone."""
+    parent = list(range(26))
+
+    def root(letter: int) -> int:
+        while parent[letter] != letter:
+            letter = parent[letter]
+        return letter
+
+    loops = 0
+    for a, b, _ in menu:
+        ra, rb = root(a), root(b)
+        if ra == rb:
+            loops += 1
+        else:
+            parent[ra] = rb
+    return loops
+
+
+def try_position(
+    links: Sequence[Sequence[tuple[int, int]]],
+    scramblers: Sequence[Sequence[int]],
+    test_letter: int,
+) -> list[list[int]]:
+    """Tries all 26 stecker partners for test_letter against one set of
+    scramblers (one per menu position) and returns, for every guess that
+    survives, the stecker as a list of partners with -1 for unknown."""
+    survivors = []
+    for guess in range(26):
+        stecker = [-1] * 26
+        pending: list[int] = []
+
+        def assign(letter: int, partner: int) -> bool:
+            # Steckering is symmetric, so both ends are set at once.
+            for x, y in ((letter, partner), (partner, letter)):
+                if stecker[x] == -1:
+                    stecker[x] = y
+                    pending.append(x)
+                elif stecker[x] != y:
+                    return False
+            return True
+
+        consistent = assign(test_letter, guess)
+        while consistent and pending:
+            letter = pending.pop()
+            for other, position in links[letter]:
+                partner = scramblers[position][stecker[letter]]
+                if not assign(other, partner):
+                    consistent = False
+                    break
+        if consistent:
+            survivors.append(stecker)
+    return survivors
+
+
+def run_order(
+    catalog: Catalog,
+    order: Sequence[str],
+    reflector: str,
+    ringstellung: str,
+    stator: str,
+    menu: Menu,
+    offset: int,
+) -> list[BombeStop]:
+    """Searches every starting position of one wheel order and reflector."""
+    machine = Enigma(
+        catalog=catalog,
+        stator=stator,
+        rotors=list(zip(order, ringstellung)),
+        reflector=reflector,
+        operator=False,
+    )
+    entry, lamps = machine.signal_tables()  # No stecker: just the stator.
+    mechanism = machine.wheel_pack
+    rotors = mechanism.rotors
+
+    scrambler_cache: dict[bytes, bytes] = {}
+
+    def scrambler(state: bytes) -> bytes:
+        """The scrambler permutation (A=0) for rotor positions state."""
+        found = scrambler_cache.get(state)
+        if found is None:
+            pins = mechanism.scrambler(state)
+            found = bytes([lamps[pins[pin]] - 65 for pin in entry])
+            scrambler_cache[state] = found
+        return found
+
+    links: list[list[tuple[int, int]]] = [[] for _ in range(26)]
+    for a, b, position in menu:
+        links[a].append((b, position))
+        links[b].append((a, position))
+    test_letter = max(range(26), key=lambda letter: len(links[letter]))
+    span = max(position for _, _, position in menu) + 1
+    width = len(rotors)
+
+    stops = []
+    for start in product(range(26), repeat=width):  # Rightmost rotor first.
+        for rotor, position in zip(rotors, start):
+            rotor.position = position
+            rotor.step_me = False
+        mechanism.seek(offset)
+        schedule = mechanism.schedule(span).tobytes()
+        scramblers = [
+            scrambler(schedule[k * width : (k + 1) * width]) for k in range(span)
+        ]
+        for stecker in try_position(links, scramblers, test_letter):
+            stops.append(
+                BombeStop(
+                    rotors=tuple(order),
+                    reflector=reflector,
+                    positions="".join(chr(65 + p) for p in reversed(start)),
+                    steckers=tuple(
+                        (chr(65 + a), chr(65 + b))
+                        for a, b in enumerate(stecker)
+                        if b != -1
+                    ),
+                )
+            )
+    return stops
+
+
+def search(
+    ciphertext: str,
+    crib: str,
+    offset: int = 0,
+    rotors: Sequence[str] = ("I", "II", "III", "IV", "V"),
+    wheels: int = 3,
+    reflectors: Sequence[str] = ("Reflector B",),
+    orders: Optional[Iterable[Sequence[str]]] = None,
+    ringstellung: Optional[str] = None,
+    catalog: Catalog | str = "default",
+    stator: str = "military",
+    workers: Optional[int] = None,
+) -> list[BombeStop]:
+    """Runs the Bombe over every wheel order - each arrangement of wheels
+    of the given rotors, unless orders are given explicitly - with every
+    reflector, spreading the orders over a pool of worker processes.
+
+    :param offset: How many letters into the ciphertext the crib starts.
+    :param ringstellung: One letter per wheel; all A if not given.
+    :param workers: Number of processes; 1 searches in this process.
+    :returns: Every stop, in the order the wheel orders were given.
+    """
+    catalog = resolve_catalog(catalog)
+    menu = build_menu(ciphertext, crib, offset)
+    if not menu:
+        raise ValueError("The crib is empty.")
+    if orders is None:
+        orders = permutations(rotors, wheels)
+    jobs = [
+        (catalog, order, reflector, ringstellung or "A" * len(order), stator)
+        for order in orders
+        for reflector in reflectors
+    ]
+
+    results = pool_map(run_order, [(*job, menu, offset) for job in jobs], workers)
+    return [stop for stops in results for stop in stops]
@@ -0,0 +1,344 @@
+"""The command line interface: ``enigma`` or ``python -m python_enigma``.
+
+Takes the same settings as the Enigma class and enciphers files (or standard
+input) with them. Input files are memory-mapped and output is written in large
+blocks, so the size of a file doesn't matter. --jobs spreads several files, or
+one large file, over a pool of processes.
+
+Example::
+
+    enigma --rotors I,II,III --rings ABC --reflector "Reflector B" \\
+        --stecker "AQ BJ" --start ABC message.txt
+"""
+
+import argparse
+from codecs import getincrementaldecoder
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+import mmap
+import os
+import string
+import sys
+import time
+from typing import BinaryIO, NoReturn, Optional
+
+from python_enigma import __version__
+from python_enigma.enigma import (
+    Enigma,
+    Operator,
+    ReflectorNotFound,
+    RotorNotFound,
+    SteckerSettingsInvalid,
+    UndefinedStatorError,
+)
+
+ASCII_LETTERS = string.ascii_letters.encode("ascii")
+
+
+def positive_int(text: str) -> int:
+    """The argparse type of counts and sizes, which must be at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a whole number: {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="enigma",
+        description="Encipher or decipher text with an emulated Enigma machine.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="files to process; standard input if none are given",
+    )
+    parser.add_argument(
+        "--rotors",
+        default="I,II,III",
+        help="comma separated rotor names from the catalogue, left to right "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rings",
+        default=None,
+        help="ringstellung letters, one per rotor (default: all A)",
+    )
+    parser.add_argument("--reflector", default="UKW", help="(default: %(default)s)")
+    parser.add_argument(
+        "--stecker", default=None, help='stecker pairs, for example "AQ BJ"'
+    )
+    parser.add_argument(
+        "--stator",
+        default="military",
+        choices=["military", "civilian"],
+        help="(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--start", default=None, help="starting wheel positions, for example ABC"
+    )
+    parser.add_argument(
+        "--word-length", type=positive_int, default=5, help="(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--no-operator",
+        action="store_true",
+        help="don't format the text; non-letters are passed through unchanged",
+    )
+    parser.add_argument("--ignore-static-wheels", action="store_true")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="output file for a single input (default: standard output)",
+    )
+    parser.add_argument(
+        "--suffix",
+        default=".enigma",
+        help="with several input files, each is written to its name plus this "
+        "suffix (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=1,
+        help="number of processes to use (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=1 << 20,
+        help="bytes to process per block (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print throughput to standard error when done",
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    return parser
+
+
+def build_machine(
+    args: argparse.Namespace, parser: Optional[argparse.ArgumentParser] = None
+) -> Enigma:
+    """Returns a machine set up as the arguments say. Bad settings are
+    reported through parser, if given, and otherwise end the program."""
+
+    def fail(message: str) -> NoReturn:
+        if parser is not None:
+            parser.error(message)
+        raise SystemExit(f"enigma: {message}")
+
+    names = args.rotors.split(",")
+    rings = args.rings or "A" * len(names)
+    if not (len(rings) == len(names) and rings.isascii() and rings.isalpha()):
+        fail("--rings needs one letter per rotor")
+    if args.start and not (
+        len(args.start) == len(names) and args.start.isascii() and args.start.isalpha()
+    ):
+        fail("--start needs one letter per rotor")
+    try:
+        machine = Enigma(
+            stecker=args.stecker,
+            stator=args.stator,
+            rotors=list(zip(names, rings)),
+            reflector=args.reflector,
+            operator=not args.no_operator,
+            word_length=args.word_length,
+            ignore_static_wheels=args.ignore_static_wheels,
+        )
+    except RotorNotFound as e:
+        fail(f"no rotor {e} in the catalogue")
+    except ReflectorNotFound as e:
+        fail(f"no reflector {e} in the catalogue")
+    except (SteckerSettingsInvalid, IndexError):
+        fail(f"--stecker must be pairs of different letters, not {args.stecker!r}")
+    except UndefinedStatorError:
+        fail(f"no stator {args.stator!r}")
+    if args.start:
+        machine.set_wheels(args.start)
+    return machine
+
+
+def read_blocks(path: Optional[str], chunk_size: int) -> Iterator[bytes]:
+    """Yields the contents of path (standard input if None) in blocks of
+    chunk_size bytes. Regular files are memory-mapped."""
+    if path is None:
+        reader: BinaryIO = sys.stdin.buffer
+        yield from iter(lambda: reader.read(chunk_size), b"")
+        return
+
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # Empty files and pipes can't be mapped.
+            yield from iter(lambda: file.read(chunk_size), b"")
+            return
+        with mapped:
+            for start in range(0, len(mapped), chunk_size):
+                yield mapped[start : start + chunk_size]
+
+
+def process(machine: Enigma, blocks: Iterator[bytes], writer: BinaryIO) -> int:
+    """Sends blocks of input through machine, writing each block of output
+    as it is ready. Returns the number of input bytes processed."""
+    processed = 0
+    if machine.operator is None:
+        # Without the operator there is nothing to decode: bytes go straight
+        # through, letters enciphered and everything else left as it is.
+        for block in blocks:
+            output = bytearray(block)
+            machine.parse_into(output, output)
+            writer.write(output)
+            processed += len(block)
+        return processed
+
+    decoder = getincrementaldecoder("utf-8")(errors="replace")
+
+    def decoded() -> Iterator[str]:
+        nonlocal processed
+        for block in blocks:
+            processed += len(block)
+            yield decoder.decode(block)
+        yield decoder.decode(b"", final=True)
+
+    for str_ciphertext in machine.iter_parse(decoded()):
+        writer.write(str_ciphertext.encode("ascii"))
+    return processed
+
+
+def process_file(
+    args: argparse.Namespace, path: Optional[str], output: Optional[str]
+) -> int:
+    """Processes one input into one output; either may be None for the
+    standard streams. Returns the number of input bytes processed."""
+    machine = build_machine(args)
+    if output is None:
+        written = process(
+            machine, read_blocks(path, args.chunk_size), sys.stdout.buffer
+        )
+        sys.stdout.buffer.flush()
+        return written
+    with open(output, "wb") as writer:
+        return process(machine, read_blocks(path, args.chunk_size), writer)
+
+
+def process_parallel(
+    args: argparse.Namespace, path: Optional[str], output: Optional[str]
+) -> int:
+    """Processes one large input file across args.jobs processes. Returns
+    the number of input bytes processed.
+
+    The file is cut into pieces of at most args.chunk_size bytes, and each
+    worker memory-maps just the piece it is given, so no process ever holds
+    the whole file. A first pass counts the letters each piece will type; a
+    second seeks each worker's machine past the letters before its piece
+    and enciphers it. Standard input can't be mapped, so it is processed in
+    this process instead."""
+    if path is None:
+        return process_file(args, path, output)
+    with open(path, "rb") as file:
+        length = os.fstat(file.fileno()).st_size
+        bounds = [0]
+        if length:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                size = min(args.chunk_size, -(-length // args.jobs))
+                for bound in range(size, length, size):
+                    # With the operator, pieces are decoded on their own, so
+                    # they mustn't start partway through a UTF-8 sequence.
+                    while (
+                        not args.no_operator
+                        and bound < length
+                        and 0x80 <= mapped[bound] < 0xC0
+                    ):
+                        bound += 1
+                    if bounds[-1] < bound < length:
+                        bounds.append(bound)
+            bounds.append(length)
+    starts, ends = bounds[:-1], bounds[1:]
+
+    with ExitStack() as stack:
+        if output is None:
+            writer: BinaryIO = sys.stdout.buffer
+        else:
+            writer = stack.enter_context(open(output, "wb"))
+        pool = stack.enter_context(ProcessPoolExecutor(max_workers=args.jobs))
+        settings = [args] * len(starts)
+        paths = [path] * len(starts)
+        offsets = []
+        letters = 0
+        for count in pool.map(count_letters, settings, paths, starts, ends):
+            offsets.append(letters)
+            letters += count
+        for block in pool.map(encipher_piece, settings, paths, starts, ends, offsets):
+            writer.write(block)
+        writer.flush()
+    return length
+
+
+def read_piece(path: str, start: int, end: int) -> bytes:
+    """Bytes start to end of a file, read through a memory map."""
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[start:end]
+
+
+def count_letters(args: argparse.Namespace, path: str, start: int, end: int) -> int:
+    """Worker for process_parallel: the number of letters the machine will
+    be sent for one piece of the input."""
+    block = read_piece(path, start, end)
+    if args.no_operator:
+        return len(block) - len(block.translate(None, ASCII_LETTERS))
+    return len(Operator(args.word_length).clean(block.decode("utf-8", "replace")))
+
+
+def encipher_piece(
+    args: argparse.Namespace, path: str, start: int, end: int, offset: int
+) -> bytes:
+    """Worker for process_parallel: enciphers one piece of the input, which
+    starts offset letters into the whole."""
+    block = read_piece(path, start, end)
+    machine = build_machine(args)
+    machine.seek(offset)
+    if machine.operator is None:
+        return machine.parse_bytes(block)
+    letters = machine.operator.clean(block.decode("utf-8", "replace"))
+    str_message = machine.operator.group(letters, offset)
+    return machine.encipher(str_message).encode("ascii")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    build_machine(args, parser)  # Report bad settings before doing any work.
+    if len(args.files) > 1 and args.output is not None:
+        parser.error("--output can only be used with a single input")
+
+    started = time.perf_counter()
+    if len(args.files) > 1:
+        outputs = [path + args.suffix for path in args.files]
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            processed = sum(
+                pool.map(process_file, [args] * len(outputs), args.files, outputs)
+            )
+    else:
+        path = args.files[0] if args.files else None
+        if args.jobs > 1:
+            processed = process_parallel(args, path, args.output)
+        else:
+            processed = process_file(args, path, args.output)
+    elapsed = time.perf_counter() - started
+
+    if args.stats:
+        rate = processed / elapsed if elapsed else float("inf")
+        print(
+            f"{processed} bytes in {elapsed:.3f} s ({rate:,.0f} bytes/s)",
+            file=sys.stderr,
+        )
+    return 0
@@ -0,0 +1,94 @@
+"""Precompiled keys for the Enigma machine.
+
+A machine setting only ever passes through a limited number of rotor states
+before it starts repeating itself - 26 ** 3 for the usual three single-notch
+wheels. A CompiledKey works out the complete substitution, stecker included,
+for every one of those states once, so that enciphering afterwards is a single
+table lookup per letter with no stepping logic at all.
+
+This pays off when large volumes are enciphered under a small set of keys.
+For a single short message, just use Enigma.parse.
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from python_enigma.enigma import Enigma
+
+ORD_A = ord("A")
+
+
+class CompiledKey:
+    """The full substitution table of a machine for one key: the rotors,
+    reflector, stator, stecker and starting state of an Enigma. The machine
+    itself is left untouched.
+
+    Row k of the table is the substitution in use at the k-th letter typed
+    after the start. The first "tail" rows are only passed through once (an
+    M4 greek wheel raising its step flag, for example); after that the rows
+    repeat every "period" letters.
+    """
+
+    def __init__(self, machine: "Enigma", max_states: int = 1 << 20) -> None:
+        """Compiles machine's current key. Raises ValueError if the rotor
+        states haven't repeated after max_states key presses."""
+        mechanism = machine.wheel_pack
+        positions = [rotor.position for rotor in mechanism.rotors]
+        flags = [rotor.step_me for rotor in mechanism.rotors]
+        entry, lamps = machine.signal_tables()
+
+        seen: dict[tuple[tuple[int, ...], tuple[bool, ...]], int] = {}
+        table = bytearray()
+        while True:
+            mechanism.advance(positions, flags)
+            state = (tuple(positions), tuple(flags))
+            if state in seen:
+                break
+            seen[state] = len(seen)
+            if len(seen) > max_states:
+                raise ValueError(
+                    f"Rotor states did not repeat within {max_states} key presses."
+                )
+
+            scrambler = mechanism.scrambler(positions)
+            table.extend([lamps[scrambler[pin]] for pin in entry])
+
+        self.table = bytes(table)
+        self.tail = seen[state]
+        self.period = len(seen) - self.tail
+
+    def row(self, offset: int) -> int:
+        """Returns the table row used for the letter at offset."""
+        if offset < self.tail:
+            return offset
+        return self.tail + (offset - self.tail) % self.period
+
+    def encipher(self, str_message: str, offset: int = 0) -> str:
+        """Enciphers an already prepared message (see Enigma.prepare) whose
+        first letter sits offset letters after the start of the key.
+        Characters other than A-Z are passed through unchanged."""
+        table = self.table
+        tail = self.tail
+        period = self.period
+        row = 26 * (offset if offset < tail else tail + (offset - tail) % period)
+        end = 26 * (tail + period)
+        restart = 26 * tail
+
+        out = []
+        for character in str_message:
+            letter = ord(character) - ORD_A
+            if 0 <= letter < 26:
+                out.append(chr(table[row + letter]))
+                row += 26
+                if row == end:
+                    row = restart
+            else:
+                out.append(character)
+        return "".join(out)
+
+    def __len__(self) -> int:
+        """The number of rows, i.e. distinct rotor states, in the table."""
+        return self.tail + self.period
+
+    def __repr__(self) -> str:
+        return f"<CompiledKey tail={self.tail} period={self.period}>"
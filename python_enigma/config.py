@@ -0,0 +1,239 @@
+"""Machine settings shared between threads.
+
+An Enigma keeps its rotor positions on its Rotor objects, so one machine can
+only encipher one message at a time. A MachineConfig is the rest of the
+setup - rotors, rings, reflector, stator and stecker - compiled into lookup
+tables once and never changed afterwards. It is hashable, so it can key a
+dict of configs, and it holds no state at all while enciphering.
+
+The state lives in a Cursor instead: the starting positions, the number of
+letters enciphered since, and the positions that gives. Cursors cost a few
+small lists, so any number of threads can each take their own and encipher
+against one shared config, with no locking and no machine to build or copy
+per message.
+"""
+
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from python_enigma.enigma import Catalog, Enigma, RotorMechanism, seek_state
+
+ORD_A = ord("A")
+
+
+class MachineConfig:
+    """The compiled, immutable part of an Enigma setup. It takes the same
+    settings as Enigma, less the operator and the wheel positions, which
+    belong to a Cursor. Two configs are equal when they were built from the
+    same Catalog object with the same settings."""
+
+    __slots__ = (
+        "catalog",
+        "rotor_names",
+        "reflector_name",
+        "stator",
+        "stecker",
+        "ignore_static_wheels",
+        "entry",
+        "lamps",
+        "mechanism",
+        "notches",
+        "static",
+        "_hash",
+    )
+
+    catalog: Catalog
+    rotor_names: tuple[tuple[str, str], ...]
+    reflector_name: str
+    stator: str
+    stecker: Optional[str]
+    ignore_static_wheels: bool
+    entry: tuple[int, ...]
+    lamps: tuple[int, ...]
+    mechanism: RotorMechanism
+    notches: tuple[frozenset[int], ...]
+    static: tuple[bool, ...]
+    _hash: int
+
+    def __init__(
+        self,
+        catalog: Catalog | str = "default",
+        stecker: str | None = None,
+        stator: str = "military",
+        rotors: Sequence[Sequence[str]] = (("I", "A"), ("II", "A"), ("III", "A")),
+        reflector: str = "UKW",
+        ignore_static_wheels: bool = False,
+    ) -> None:
+        machine = Enigma(
+            catalog=catalog,
+            stecker=stecker,
+            stator=stator,
+            rotors=rotors,
+            reflector=reflector,
+            operator=False,
+            ignore_static_wheels=ignore_static_wheels,
+        )
+        self._compile(machine)
+
+    @classmethod
+    def from_machine(cls, machine: Enigma) -> "MachineConfig":
+        """The config of machine's settings. See Enigma.config."""
+        config = cls.__new__(cls)
+        config._compile(machine)
+        return config
+
+    def _compile(self, machine: Enigma) -> None:
+        entry, lamps = machine.signal_tables()
+        rotors = machine.wheel_pack.rotors  # Rightmost first, as everywhere.
+        pairs = sorted(
+            f"{a}{b}" for a, b in machine.stecker.stecker_setting.items() if a < b
+        )
+        settings = {
+            "catalog": machine.catalog,
+            "rotor_names": machine.rotor_names,
+            "reflector_name": machine.reflector_name,
+            "stator": machine.stator.mode,
+            "stecker": " ".join(pairs) or None,
+            "ignore_static_wheels": machine.ignore_static_wheels,
+            "entry": tuple(entry),
+            "lamps": tuple(lamps),
+            # Only RotorMechanism.advance and trace are used, which never
+            # read or move the rotors, so the machine may carry on.
+            "mechanism": machine.wheel_pack,
+            "notches": tuple(frozenset(rotor.notch) for rotor in rotors),
+            "static": tuple(rotor.static for rotor in rotors),
+        }
+        for name, value in settings.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_hash", hash(self._key()))
+
+    def _key(self) -> tuple[Any, ...]:
+        # The entry and lamp tables stand for the stator and stecker.
+        return (
+            self.rotor_names,
+            self.reflector_name,
+            self.ignore_static_wheels,
+            self.entry,
+            self.lamps,
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MachineConfig):
+            return NotImplemented
+        return self.catalog is other.catalog and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickles as the settings; the tables are compiled again."""
+        catalog = "default" if self.catalog is Catalog.default() else self.catalog
+        return (
+            type(self),
+            (
+                catalog,
+                self.stecker,
+                self.stator,
+                self.rotor_names,
+                self.reflector_name,
+                self.ignore_static_wheels,
+            ),
+        )
+
+    def cursor(self, positions: str, offset: int = 0) -> "Cursor":
+        """A new Cursor starting at positions (letters left to right, as for
+        Enigma.set_wheels), moved on by offset key presses."""
+        return Cursor(self, positions, offset)
+
+    def __repr__(self) -> str:
+        return (
+            f"MachineConfig(rotors={self.rotor_names!r}, "
+            f"reflector={self.reflector_name!r}, stecker={self.stecker!r})"
+        )
+
+
+class Cursor:
+    """Where one message has got to against a MachineConfig: the starting
+    positions, how many key presses have been made since, and the rotor
+    positions and step flags they lead to. A cursor belongs to one thread
+    at a time; the config it points at can be shared by any number."""
+
+    __slots__ = ("config", "start", "offset", "_positions", "_flags")
+
+    def __init__(self, config: MachineConfig, positions: str, offset: int = 0) -> None:
+        if len(positions) != len(config.static):
+            raise ValueError("A cursor needs one position per wheel.")
+        if not (positions.isascii() and positions.isalpha()):
+            raise ValueError("Positions must be letters.")
+        self.config = config
+        self.start = positions.upper()
+        self.reset()
+        self.seek(offset)
+
+    @property
+    def positions(self) -> str:
+        """The current rotor positions, as letters left to right."""
+        return "".join(chr(ORD_A + p) for p in reversed(self._positions))
+
+    def reset(self) -> None:
+        """Goes back to the starting positions."""
+        self.offset = 0
+        self._positions = [ord(c) - ORD_A for c in reversed(self.start)]
+        self._flags = [False] * len(self._positions)
+
+    def seek(self, count: int) -> None:
+        """Moves on by count key presses without enciphering anything, in
+        the same time however large count is. See RotorMechanism.seek."""
+        config = self.config
+        self._positions, self._flags = seek_state(
+            self._positions, self._flags, config.notches, config.static, count
+        )
+        self.offset += count
+
+    def copy(self) -> "Cursor":
+        """A cursor at the same place, to carry on from independently."""
+        other = Cursor.__new__(Cursor)
+        other.config = self.config
+        other.start = self.start
+        other.offset = self.offset
+        other._positions = list(self._positions)
+        other._flags = list(self._flags)
+        return other
+
+    def encipher(self, str_message: str) -> str:
+        """Sends an already prepared message (see Enigma.prepare) through
+        the machine from the cursor's place, moving it on by one key press
+        per letter. Characters other than A-Z are passed through unchanged,
+        as in Enigma.encipher."""
+        config = self.config
+        entry = config.entry
+        lamps = config.lamps
+        advance = config.mechanism.advance
+        trace = config.mechanism.trace
+        positions = self._positions
+        flags = self._flags
+
+        out = []
+        letters = 0
+        for character in str_message:
+            letter = ord(character) - ORD_A
+            if 0 <= letter < 26:
+                advance(positions, flags)
+                out.append(chr(lamps[trace(positions, entry[letter])]))
+                letters += 1
+            else:
+                out.append(character)
+        self.offset += letters
+        return "".join(out)
+
+    def __repr__(self) -> str:
+        return (
+            f"<Cursor start={self.start!r} offset={self.offset} "
+            f"positions={self.positions!r}>"
+        )
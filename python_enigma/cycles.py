@@ -0,0 +1,364 @@
+"""Rejewski's characteristics, and an index of them.
+
+Under the pre-1938 indicator procedure every message key was enciphered
+twice at the daily ground setting, so the first and fourth letters of every
+indicator were the same letter enciphered by the scrambler at the first and
+fourth key presses (call them A1 and A4), and likewise for the second and
+fifth, and third and sixth. Enough indicators from one day give the products
+A1A4, A2A5 and A3A6 completely. Their cycle structure - the "characteristic" -
+doesn't depend on the stecker at all, only on the wheel order and the ground
+setting, so a catalogue of characteristics for every wheel order and starting
+position narrows a day's key down to a handful of candidates.
+
+Each product is of two fixed-point-free involutions, so its cycles come in
+pairs of equal length; a product's structure is a partition of 13, one of 101.
+A CycleIndex stores one number for the three per wheel order and position,
+and the positions for each number, in a file that is memory-mapped to query:
+both directions are a couple of array reads.
+
+The index file is a header (magic, order count, wheels and the length of the
+names block), a names block (the reflector, the ring settings, then one wheel
+order per line, all UTF-8), padding to a multiple of 4 bytes, and three
+little-endian uint32 arrays: the characteristic number for each (order, state)
+entry, the start of each number's run in the last array, and the entries
+sorted by number. A state is numbered sum(position[i] * 26 ** i), rightmost
+wheel first. Building one needs the optional NumPy dependency; querying
+doesn't.
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import permutations as arrangements
+import mmap
+from pathlib import Path
+import struct
+from types import TracebackType
+from typing import TYPE_CHECKING, Optional
+
+from python_enigma.enigma import Catalog, Enigma, pool_map, resolve_catalog
+from python_enigma.plugboard import ScramblerSequence
+
+if TYPE_CHECKING:
+    from python_enigma.vectorized import Array
+
+Partition = tuple[int, ...]
+"""Cycle lengths of one product, longest first, e.g. (13, 13)."""
+
+Characteristic = tuple[Partition, Partition, Partition]
+"""The cycle structures of A1A4, A2A5 and A3A6."""
+
+INDEX_MAGIC = b"ENIGCYC1"
+INDEX_HEADER = struct.Struct("<8sIII")
+
+
+def _halves(total: int, largest: int) -> Iterator[Partition]:
+    """Partitions of total with no part above largest, largest parts first."""
+    if total == 0:
+        yield ()
+        return
+    for part in range(min(total, largest), 0, -1):
+        for rest in _halves(total - part, part):
+            yield (part,) + rest
+
+
+PARTITIONS: tuple[Partition, ...] = tuple(
+    tuple(length for half in halves for length in (half, half))
+    for halves in _halves(13, 13)
+)
+"""Every possible cycle structure of a product, in numbering order."""
+
+PARTITION_NUMBERS = {partition: n for n, partition in enumerate(PARTITIONS)}
+CHARACTERISTICS = len(PARTITIONS) ** 3
+
+
+def cycle_structure(permutation: Sequence[int]) -> Partition:
+    """The cycle lengths of a permutation of range(n), longest first."""
+    seen = [False] * len(permutation)
+    lengths = []
+    for start in range(len(permutation)):
+        length = 0
+        letter = start
+        while not seen[letter]:
+            seen[letter] = True
+            letter = permutation[letter]
+            length += 1
+        if length:
+            lengths.append(length)
+    return tuple(sorted(lengths, reverse=True))
+
+
+def characteristic(machine: Enigma) -> Characteristic:
+    """The characteristic of machine at its current setting: the cycle
+    structures of the products of the scramblers at its next six key
+    presses. The machine isn't moved."""
+    sequence = ScramblerSequence.build(machine, 6)
+    products = []
+    for first in range(3):
+        a, b = sequence[first], sequence[first + 3]
+        products.append(cycle_structure([b[a[x]] for x in range(26)]))
+    return (products[0], products[1], products[2])
+
+
+def characteristic_from_indicators(indicators: Iterable[str]) -> Characteristic:
+    """The characteristic shown by a day's doubly-enciphered indicators:
+    six letters each, the message key enciphered twice over. Raises
+    ValueError if they don't determine all three products, which takes
+    around 80 indicators, or contradict each other."""
+    products = [[-1] * 26 for _ in range(3)]
+    for indicator in indicators:
+        letters = [ord(c) - 65 for c in indicator.upper() if "A" <= c <= "Z"]
+        if len(letters) != 6:
+            raise ValueError(f"Indicator {indicator!r} doesn't have six letters.")
+        for first, product in enumerate(products):
+            a, b = letters[first], letters[first + 3]
+            if product[a] not in (-1, b):
+                raise ValueError("The indicators aren't from one ground setting.")
+            product[a] = b
+    for product in products:
+        if -1 in product or len(set(product)) != 26:
+            raise ValueError("Too few indicators to find every cycle.")
+    structures = [cycle_structure(product) for product in products]
+    return (structures[0], structures[1], structures[2])
+
+
+def characteristic_number(value: Characteristic) -> int:
+    """The number a CycleIndex uses for a characteristic."""
+    base = len(PARTITIONS)
+    first, second, third = (PARTITION_NUMBERS[tuple(p)] for p in value)
+    return (first * base + second) * base + third
+
+
+def characteristic_of(number: int) -> Characteristic:
+    """The characteristic with a CycleIndex number."""
+    base = len(PARTITIONS)
+    return (
+        PARTITIONS[number // base // base],
+        PARTITIONS[number // base % base],
+        PARTITIONS[number % base],
+    )
+
+
+def order_characteristics(
+    catalog: Catalog,
+    order: Sequence[str],
+    reflector: str,
+    ringstellung: str,
+    stator: str,
+) -> bytes:
+    """The characteristic number of every starting position of one wheel
+    order, indexed by state, as little-endian uint32s. Every scrambler and
+    product is worked out for all 26 ** wheels states at once."""
+    from python_enigma import vectorized as vec
+    import numpy as np
+
+    machine = Enigma(
+        catalog=catalog,
+        stator=stator,
+        rotors=list(zip(order, ringstellung)),
+        reflector=reflector,
+        operator=False,
+    )
+    states = vec.all_states(len(order))
+    scrambler = vec.scrambler_table(machine, states).astype(np.int64)
+    following = vec.next_states(machine.wheel_pack)
+
+    presses = []
+    current = np.arange(len(states))
+    for _ in range(6):
+        current = following[current]
+        presses.append(scrambler[current])
+
+    base = len(PARTITIONS)
+    numbers = np.zeros(len(states), dtype=np.int64)
+    for first in range(3):
+        product = np.take_along_axis(presses[first + 3], presses[first], axis=1)
+        numbers = numbers * base + partition_numbers(product)
+    return numbers.astype("<u4").tobytes()
+
+
+def partition_numbers(products: "Array") -> "Array":
+    """The PARTITIONS number of each row of a (rows, 26) array of
+    permutations. Needs NumPy."""
+    import numpy as np
+
+    letters = np.arange(26)
+    lengths = np.zeros(products.shape, dtype=np.int64)
+    power = products
+    for length in range(1, 27):
+        lengths[(power == letters) & (lengths == 0)] = length
+        power = np.take_along_axis(products, power, axis=1)
+
+    # Cycles come in pairs no longer than 13, and there are at most 13
+    # pairs of any length: count them as one base-14 number per row, longest
+    # cycles in the lowest digit.
+    histogram = np.zeros(len(products), dtype=np.int64)
+    for length in range(1, 14):
+        pairs = (lengths == length).sum(axis=1) // (2 * length)
+        histogram = histogram * 14 + pairs
+    distinct, inverse = np.unique(histogram, return_inverse=True)
+
+    numbers = []
+    for value in distinct.tolist():
+        partition: list[int] = []
+        for length in range(13, 0, -1):
+            partition += [length] * (2 * (value % 14))
+            value //= 14
+        numbers.append(PARTITION_NUMBERS[tuple(partition)])
+    return np.asarray(numbers, dtype=np.int64)[inverse.ravel()]
+
+
+class CycleIndex:
+    """A memory-mapped index of characteristics for every starting position
+    of a set of wheel orders, at one reflector and ring setting. Build one
+    with CycleIndex.build; open an existing one by path. Positions found are
+    relative to the index's ring settings, as with a Bombe stop.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self._map.close()
+            raise ValueError("Not a cycle index.")
+        if len(self._map) < INDEX_HEADER.size:
+            self._map.close()
+            raise ValueError("The cycle index is the wrong size.")
+        _, orders, wheels, names_length = INDEX_HEADER.unpack_from(self._map)
+        start = INDEX_HEADER.size
+        self.wheels: int = wheels
+        self.states: int = 26**wheels
+
+        self._numbers = -(-(start + names_length) // 4) * 4
+        self._starts = self._numbers + 4 * orders * self.states
+        self._entries = self._starts + 4 * (CHARACTERISTICS + 1)
+        if len(self._map) != self._entries + 4 * orders * self.states:
+            self._map.close()
+            raise ValueError("The cycle index is the wrong size.")
+
+        names = self._map[start : start + names_length].decode("utf-8").split("\n")
+        self.reflector = names[0]
+        self.ringstellung = names[1]
+        self.orders = [tuple(order.split(",")) for order in names[2 : 2 + orders]]
+        self._order_numbers = {order: n for n, order in enumerate(self.orders)}
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        rotors: Sequence[str] = ("I", "II", "III", "IV", "V"),
+        wheels: int = 3,
+        orders: Optional[Iterable[Sequence[str]]] = None,
+        reflector: str = "Reflector B",
+        ringstellung: Optional[str] = None,
+        catalog: Catalog | str = "default",
+        stator: str = "military",
+        workers: Optional[int] = None,
+    ) -> "CycleIndex":
+        """Works out the characteristic of every starting position of every
+        wheel order - each arrangement of wheels of the given rotors, unless
+        orders are given - spreading the orders over a pool of processes,
+        writes the index to path and opens it. Needs NumPy.
+
+        :param ringstellung: One letter per wheel; all A if not given.
+        :param workers: Number of processes; 1 builds in this process.
+        """
+        import numpy as np
+
+        catalog = resolve_catalog(catalog)
+        if orders is None:
+            orders = arrangements(rotors, wheels)
+        order_list = [tuple(order) for order in orders]
+        if not order_list or any(len(order) != wheels for order in order_list):
+            raise ValueError(f"Every wheel order needs {wheels} wheels.")
+        rings = ringstellung or "A" * wheels
+        jobs = [(catalog, order, reflector, rings, stator) for order in order_list]
+
+        results = pool_map(order_characteristics, jobs, workers)
+
+        numbers = np.frombuffer(b"".join(results), dtype="<u4")
+        entries = np.argsort(numbers, kind="stable").astype("<u4")
+        starts = np.zeros(CHARACTERISTICS + 1, dtype="<u4")
+        np.cumsum(np.bincount(numbers, minlength=CHARACTERISTICS), out=starts[1:])
+
+        names = "\n".join(
+            [reflector, rings] + [",".join(order) for order in order_list]
+        ).encode("utf-8")
+        with open(path, "wb") as out:
+            out.write(
+                INDEX_HEADER.pack(INDEX_MAGIC, len(order_list), wheels, len(names))
+            )
+            out.write(names)
+            out.write(bytes(-(INDEX_HEADER.size + len(names)) % 4))
+            out.write(numbers.tobytes())
+            out.write(starts.tobytes())
+            out.write(entries.tobytes())
+        return cls(path)
+
+    def _uint32(self, offset: int, index: int) -> int:
+        value: int = struct.unpack_from("<I", self._map, offset + 4 * index)[0]
+        return value
+
+    def lookup(self, order: Sequence[str], positions: str) -> Characteristic:
+        """The characteristic of a wheel order at starting positions (left
+        to right, as for Enigma.set_wheels)."""
+        entry = self._order_numbers[tuple(order)] * self.states + self._state(positions)
+        return characteristic_of(self._uint32(self._numbers, entry))
+
+    def find(self, value: Characteristic) -> list[tuple[tuple[str, ...], str]]:
+        """Every (wheel order, starting positions) with this characteristic,
+        in the order the index lists wheel orders."""
+        number = characteristic_number(value)
+        first = self._uint32(self._starts, number)
+        last = self._uint32(self._starts, number + 1)
+        found = struct.unpack_from(
+            f"<{last - first}I", self._map, self._entries + 4 * first
+        )
+        return [
+            (self.orders[entry // self.states], self._positions(entry % self.states))
+            for entry in found
+        ]
+
+    def count(self, value: Characteristic) -> int:
+        """How many wheel orders and positions have this characteristic."""
+        number = characteristic_number(value)
+        return self._uint32(self._starts, number + 1) - self._uint32(
+            self._starts, number
+        )
+
+    def _state(self, positions: str) -> int:
+        positions = positions.upper()
+        if len(positions) != self.wheels:
+            raise ValueError(f"Give {self.wheels} positions.")
+        if not (positions.isascii() and positions.isalpha()):
+            raise ValueError(f"Positions are letters A-Z, not {positions!r}.")
+        state = 0
+        for position in positions:  # Leftmost wheel first.
+            state = state * 26 + ord(position) - 65
+        return state
+
+    def _positions(self, state: int) -> str:
+        letters = []
+        for _ in range(self.wheels):
+            letters.append(chr(65 + state % 26))
+            state //= 26
+        return "".join(reversed(letters))
+
+    def __len__(self) -> int:
+        return len(self.orders) * self.states
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "CycleIndex":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<CycleIndex orders={len(self.orders)} reflector={self.reflector!r}>"
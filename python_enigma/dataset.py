@@ -0,0 +1,251 @@
+"""Synthetic (plaintext, key, ciphertext) datasets.
+
+generate draws random keys for the machine models in MODELS, enciphers a
+plaintext under each with python_enigma.batch, and writes the results to
+shard files, one process per shard at a time. Each shard is seeded from the
+dataset seed and its own number, so a shard's contents depend on nothing
+but the seed and settings: they are the same however many workers there
+are, and a lost shard can be regenerated alone. Records are made and written
+a block at a time, so memory stays bounded however large a shard is.
+
+A shard is tab-separated text with a header row; rotors, ringstellung and
+positions read left to right, as for Enigma, and plaintext and ciphertext are
+letters only. Plaintexts are windows of a corpus, if one is given, or else
+random letters with German letter frequencies.
+
+This needs the optional NumPy dependency, like python_enigma.batch.
+"""
+
+from collections.abc import Sequence
+import os
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from python_enigma.batch import Key, KeyBatch
+from python_enigma.enigma import Catalog, RotorNotFound, pool_map
+from python_enigma.scoring import NgramTable, encode
+from python_enigma.vectorized import Array
+
+import numpy as np
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+HEADER = b"rotors\tringstellung\tpositions\treflector\tstecker\tplaintext\tciphertext\n"
+
+
+class MachineModel(NamedTuple):
+    """The catalog entries a machine could be fitted with. Models with
+    greek wheels put one of them, static, at the far left."""
+
+    wheels: tuple[str, ...]
+    reflectors: tuple[str, ...]
+    greek: tuple[str, ...] = ()
+
+    def random_keys(
+        self, generator: np.random.Generator, count: int, plugs: int = 10
+    ) -> list[Key]:
+        """Draws count keys: wheel orders, rings, positions, reflectors and
+        plugs stecker pairs each. The draws are made as arrays, so this costs
+        little more than building the Keys."""
+        wheels = np.argsort(generator.random((count, len(self.wheels))), axis=1)[:, :3]
+        names = [np.array(self.wheels, dtype=object)[wheels]]
+        if self.greek:
+            greek = generator.integers(0, len(self.greek), (count, 1))
+            names.insert(0, np.array(self.greek, dtype=object)[greek])
+        rotors = np.hstack(names)
+        width = rotors.shape[1]
+        settings = generator.integers(65, 91, (count, 2 * width), dtype=np.uint8)
+        letters = np.argsort(generator.random((count, 26)), axis=1)[:, : 2 * plugs]
+        pairs = np.full((count, 3 * plugs), ord(" "), dtype=np.uint8)
+        pairs[:, 0::3] = letters[:, 0::2] + 65
+        pairs[:, 1::3] = letters[:, 1::2] + 65
+        reflectors = generator.integers(0, len(self.reflectors), count)
+
+        keys = []
+        for k in range(count):
+            setting = settings[k].tobytes().decode("ascii")
+            keys.append(
+                Key(
+                    rotors=tuple(rotors[k]),
+                    ringstellung=setting[:width],
+                    positions=setting[width:],
+                    stecker=pairs[k, :-1].tobytes().decode("ascii") or None,
+                    reflector=self.reflectors[reflectors[k]],
+                )
+            )
+        return keys
+
+
+MODELS = {
+    "M3": MachineModel(
+        wheels=("I", "II", "III", "IV", "V", "VI", "VII", "VIII"),
+        reflectors=("Reflector B", "Reflector C"),
+    ),
+    "M4": MachineModel(
+        wheels=("I", "II", "III", "IV", "V", "VI", "VII", "VIII"),
+        reflectors=("Reflector B Thin", "Reflector C Thin"),
+        greek=("Beta", "Gamma"),
+    ),
+}
+"""The Army and Navy three-wheel Enigma, and the naval M4 with its greek
+wheels and thin reflectors."""
+
+
+def shard_path(directory: str | Path, shard: int, shards: int) -> Path:
+    """The file name of one shard, numbered from zero."""
+    return Path(directory) / f"shard-{shard:05d}-of-{shards:05d}.tsv"
+
+
+def write_shard(
+    path: str | Path,
+    shard: int,
+    records: int,
+    seed: int,
+    length: int = 100,
+    models: Sequence[str] = ("M3", "M4"),
+    plugs: int = 10,
+    corpus: Optional[bytes] = None,
+    block: int = 4096,
+    catalog: Catalog | str = "default",
+) -> int:
+    """Writes one shard of records to path, seeded by seed and shard alone.
+    Corpus, if given, is letter codes (A=0). Returns the number of records
+    written."""
+    generator = np.random.default_rng([seed, shard])
+    machines = [MODELS[name] for name in models]
+    if corpus is not None:
+        letters = np.frombuffer(corpus, dtype=np.uint8)
+        if len(letters) < length:
+            raise ValueError("The corpus is shorter than one plaintext.")
+    else:
+        frequencies = 10 ** np.frombuffer(NgramTable.load("german", 1).log_probs)
+        frequencies /= frequencies.sum()
+
+    with open(path, "wb") as out:
+        out.write(HEADER)
+        for first in range(0, records, block):
+            count = min(block, records - first)
+            choices = generator.integers(0, len(machines), count)
+            keys = [Key((), "", "")] * count
+            for i, machine in enumerate(machines):
+                rows = np.flatnonzero(choices == i)
+                drawn = machine.random_keys(generator, len(rows), plugs)
+                for k, key in zip(rows, drawn):
+                    keys[k] = key
+            if corpus is not None:
+                starts = generator.integers(0, len(letters) - length + 1, count)
+                plaintexts = letters[starts[:, None] + np.arange(length)]
+            else:
+                plaintexts = generator.choice(26, size=(count, length), p=frequencies)
+            ciphertexts = encipher_rows(keys, plaintexts, catalog)
+            out.writelines(
+                format_record(key, plaintext, ciphertext)
+                for key, plaintext, ciphertext in zip(
+                    keys, (plaintexts + 65).astype(np.uint8), ciphertexts
+                )
+            )
+    return records
+
+
+def encipher_rows(
+    keys: Sequence[Key], plaintexts: Array, catalog: Catalog | str = "default"
+) -> Array:
+    """Enciphers row k of plaintexts (letter codes, A=0) under keys[k],
+    returning ASCII letters. Keys with different numbers of wheels are done
+    as separate batches."""
+    ciphertexts = np.empty(plaintexts.shape, dtype=np.uint8)
+    widths = np.array([len(key.rotors) for key in keys])
+    for width in np.unique(widths):
+        rows = np.flatnonzero(widths == width)
+        batch = KeyBatch([keys[k] for k in rows.tolist()], catalog)
+        ciphertexts[rows] = batch.encipher_codes(plaintexts[rows])
+    return ciphertexts
+
+
+def format_record(key: Key, plaintext: Array, ciphertext: Array) -> bytes:
+    """One line of a shard file. The texts are ASCII letter arrays."""
+    fields = (
+        ",".join(key.rotors),
+        key.ringstellung,
+        key.positions,
+        key.reflector,
+        key.stecker or "",
+    )
+    return (
+        b"\t".join(
+            (
+                "\t".join(fields).encode("ascii"),
+                plaintext.tobytes(),
+                ciphertext.tobytes(),
+            )
+        )
+        + b"\n"
+    )
+
+
+def read_shard(path: str | Path) -> list[tuple[Key, str, str]]:
+    """Reads back a shard as (key, plaintext, ciphertext) triples."""
+    records = []
+    with open(path, "r", encoding="ascii") as file:
+        file.readline()  # The header.
+        for line in file:
+            rotors, rings, positions, reflector, stecker, plain, cipher = line.rstrip(
+                "\n"
+            ).split("\t")
+            key = Key(
+                rotors=tuple(rotors.split(",")),
+                ringstellung=rings,
+                positions=positions,
+                stecker=stecker or None,
+                reflector=reflector,
+            )
+            records.append((key, plain, cipher))
+    return records
+
+
+def generate(
+    directory: str | Path,
+    records: int,
+    shards: int,
+    seed: int = 0,
+    length: int = 100,
+    models: Sequence[str] = ("M3", "M4"),
+    plugs: int = 10,
+    corpus: Optional[str] = None,
+    workers: Optional[int] = None,
+    block: int = 4096,
+) -> list[Path]:
+    """Generates records records across shards shard files in directory,
+    spreading the shards over a pool of processes.
+
+    :param length: Letters per plaintext.
+    :param models: Names from MODELS, drawn from with equal chance.
+    :param plugs: Stecker pairs per key; 0 to 13.
+    :param corpus: Text to take plaintext windows from; see scoring.encode.
+    :param workers: Number of processes; 1 generates in this process.
+    :param block: Records made and written at a time in each process.
+    :returns: The shard files, in order.
+    """
+    for name in models:
+        if name not in MODELS:
+            raise ValueError(f"Unknown machine model {name!r}.")
+        model = MODELS[name]
+        for rotor in model.wheels + model.reflectors + model.greek:
+            if rotor not in Catalog.default():
+                raise RotorNotFound(rotor)
+    if not 0 <= plugs <= 13:
+        raise ValueError("There are between 0 and 13 stecker pairs.")
+    if shards < 1:
+        raise ValueError("There must be at least one shard.")
+    corpus_codes = bytes(encode(corpus)) if corpus is not None else None
+
+    os.makedirs(directory, exist_ok=True)
+    paths = [shard_path(directory, shard, shards) for shard in range(shards)]
+    # The first records % shards shards take one record more than the rest.
+    sizes = [records // shards + (shard < records % shards) for shard in range(shards)]
+    jobs = [
+        (path, shard, size, seed, length, tuple(models), plugs, corpus_codes, block)
+        for shard, (path, size) in enumerate(zip(paths, sizes))
+    ]
+
+    pool_map(write_shard, jobs, workers)
+    return paths
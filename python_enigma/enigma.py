@@ -20,14 +20,39 @@ Development was by Zac Adam-MacEwen. See the README.md for details.
 """
 
 # General Purpose Imports Block
-from collections import UserDict
-import json
-from typing import Any, Optional
-from collections.abc import Mapping, Sequence
-import importlib.resources as ir
-import python_enigma.resources
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, UserDict
+import mmap
+import os
+from pathlib import Path
+import struct
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Generic,
+    NamedTuple,
+    Optional,
+    TextIO,
+    TypeVar,
+)
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+from functools import lru_cache, partial
 from python_enigma.types import Char, RotorSpec
 
+if TYPE_CHECKING:
+    from python_enigma.compiled import CompiledKey
+    from python_enigma.config import MachineConfig
+
+
+ByteBuffer = bytes | bytearray | memoryview | mmap.mmap
+"""Anything parse_bytes and parse_into accept."""
+
+PIN_NAMES = tuple(str(pin) for pin in range(1, 27))  # Catalogue wiring keys.
+NEXT_PIN = bytes.maketrans(bytes(range(26)), bytes(range(1, 27)))
+
 
 class SteckerSettingsInvalid(Exception):
     """Raised if the stecker doesn't like its settings - either a duplicated
@@ -51,29 +76,196 @@ class Catalog(UserDict[str, RotorSpec]):
     """
     This class will eventually be a dict of rotors,
     but the Rotor class needs to be modified before that happens.
-    So in the current version this just has the load default method.
+    So in the current version this has the loaders for the catalog formats:
+    the precompiled binary one, JSON, and the CSV table they are made from.
     """
 
     CATALOG_FILE_NAME = "catalogue.json"
-    CATALOG_FILE_DIR = ir.files(python_enigma.resources)
-    CATALOG_FILE_PATH = CATALOG_FILE_DIR.joinpath(CATALOG_FILE_NAME)
+    BINARY_FILE_NAME = "catalogue.bin"
+
+    # Binary layout: the magic, a record count, then fixed-size records of
+    # name, wiring and inverse wiring (zero-indexed output for each input,
+    # one byte each), notches as a bitmask with A as bit 0, and flags.
+    BINARY_MAGIC = b"ENIGCAT1"
+    BINARY_HEADER = struct.Struct("<8sI")
+    BINARY_RECORD = struct.Struct("<32s26s26sIB")
+    BINARY_STATIC = 1
 
     default_data: Optional[Mapping[str, Any]] = None
+    default_catalog: Optional["Catalog"] = None
+
+    def __init__(self, data: Optional[Mapping[str, RotorSpec]] = None) -> None:
+        # The zero-indexed wiring and inverse of rotors loaded from a binary
+        # catalogue, which compile_rotor builds the tables from directly.
+        # Replacing a rotor drops its entry.
+        self.wirings: dict[str, tuple[bytes, bytes]] = {}
+        # Counts changes, so that tables compiled before one aren't reused.
+        self.generation = 0
+        self.readonly = False
+        super().__init__(data)
+
+    def __setitem__(self, key: str, item: RotorSpec) -> None:
+        self._check_writable()
+        self.wirings.pop(key, None)
+        self.data[key] = item
+        self.generation += 1
+
+    def __delitem__(self, key: str) -> None:
+        self._check_writable()
+        self.wirings.pop(key, None)
+        del self.data[key]
+        self.generation += 1
+
+    def _check_writable(self) -> None:
+        if self.readonly:
+            raise TypeError("The default catalogue is read-only; change a copy.")
+
+    def copy(self) -> "Catalog":
+        """Returns a catalogue with the same rotors that can be changed
+        without touching this one, the default included."""
+        other = Catalog(self.data)
+        other.wirings = dict(self.wirings)
+        return other
+
+    __copy__ = copy
 
     @classmethod
     def default(cls) -> "Catalog":
-        """Returns the default catalogue."""
+        """Returns the default catalogue. It is loaded once and the same
+        Catalog is handed out afterwards, so that rotors built from it can
+        share their compiled wiring. It is read-only: adding, replacing or
+        deleting a rotor raises TypeError, so change a copy instead.
+
+        Nothing is read until the first call. The precompiled binary
+        catalogue is preferred, with catalogue.json as the fallback."""
+        if cls.default_catalog is not None:
+            return cls.default_catalog
+
         if cls.default_data is None:
-            with cls.CATALOG_FILE_PATH.open("r") as f:
-                cls.default_data = json.load(f)
-        assert cls.default_data is not None
+            try:
+                with cls.resource_path(cls.BINARY_FILE_NAME) as path:
+                    catalog = cls.from_binary(path)
+            except (OSError, ValueError):
+                with cls.resource_path(cls.CATALOG_FILE_NAME) as path:
+                    catalog = cls.from_json(path)
+            cls.default_data = catalog.data
+        else:
+            catalog = Catalog(cls.default_data)
+
+        catalog.readonly = True
+        cls.default_catalog = catalog
+        return catalog
+
+    @staticmethod
+    def resource_path(name: str) -> ContextManager[Path]:
+        """Returns a context manager giving a real path to a file shipped
+        in python_enigma.resources."""
+        import importlib.resources as ir
+        import python_enigma.resources
+
+        return ir.as_file(ir.files(python_enigma.resources).joinpath(name))
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "Catalog":
+        """Loads a catalogue in the format of catalogue.json."""
+        import json
 
-        for k, v in cls.default_data.items():
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        for k, v in data.items():
             v["name"] = k
             if "static" not in v:
                 v["static"] = False
 
-        return Catalog(cls.default_data)
+        return cls(data)
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "Catalog":
+        """Builds a catalogue from a table like table_rotors.csv, with one
+        rotor per line: name, wiring as the letters for A to Z, the notch
+        letters and optionally "static" for wheels that never turn."""
+        import csv
+
+        catalog = cls()
+        with open(path, "r", newline="") as file:
+            for line in csv.reader(file):
+                if not line:
+                    continue
+                rotor_label = line[0]
+                bindings_dict = {}
+                counter = 1
+                for character in line[1]:
+                    binding = alpha_to_num(Char(character.upper()))
+                    bindings_dict[str(counter)] = binding
+                    counter += 1
+                catalog[rotor_label] = RotorSpec(
+                    name=rotor_label,
+                    wiring=bindings_dict,
+                    notch=line[2],
+                    static=len(line) > 3 and line[3].strip().lower() == "static",
+                )
+        return catalog
+
+    @classmethod
+    def from_binary(cls, path: str | Path) -> "Catalog":
+        """Loads a catalogue written by to_binary. The file is memory-mapped
+        rather than read. Raises ValueError if it isn't a binary catalogue.
+
+        The wiring is kept as the byte arrays it is stored as, and rotors
+        are compiled straight from those; the RotorSpec dicts are built
+        without parsing any text."""
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return cls.from_buffer(buffer)
+
+    @classmethod
+    def from_buffer(cls, buffer: ByteBuffer) -> "Catalog":
+        """Loads a binary catalogue from anything supporting the buffer
+        protocol, such as bytes or an mmap."""
+        # The views must be released on every path out, or closing an mmap
+        # behind them fails with BufferError instead of the ValueError.
+        with memoryview(buffer) as view:
+            try:
+                header = cls.BINARY_HEADER.unpack_from(view)
+            except struct.error:
+                raise ValueError("Not a binary catalogue.") from None
+            magic, count = header
+            end = cls.BINARY_HEADER.size + count * cls.BINARY_RECORD.size
+            if magic != cls.BINARY_MAGIC or len(view) != end:
+                raise ValueError("Not a binary catalogue.")
+
+            catalog = cls()
+            with view[cls.BINARY_HEADER.size : end] as records:
+                for record in cls.BINARY_RECORD.iter_unpack(records):
+                    name, wiring, inverse, notch, flags = record
+                    rotor_label = name.rstrip(b"\0").decode("utf-8")
+                    catalog[rotor_label] = RotorSpec(
+                        name=rotor_label,
+                        wiring=dict(zip(PIN_NAMES, wiring.translate(NEXT_PIN))),
+                        notch=notch_letters(notch),
+                        static=bool(flags & cls.BINARY_STATIC),
+                    )
+                    catalog.wirings[rotor_label] = (wiring, inverse)
+        return catalog
+
+    def to_binary(self, path: str | Path) -> None:
+        """Writes this catalogue in the precompiled binary format."""
+        records = [self.BINARY_HEADER.pack(self.BINARY_MAGIC, len(self))]
+        for rotor_label, description in self.items():
+            wiring, inverse = wiring_bytes(description)
+            notch = 0
+            for position in description["notch"]:
+                notch |= 1 << alpha_to_index(Char(position))
+            flags = self.BINARY_STATIC if description.get("static") else 0
+
+            name = rotor_label.encode("utf-8")
+            if len(name) > 32:
+                raise ValueError(f"Rotor name too long: {rotor_label!r}")
+            records.append(self.BINARY_RECORD.pack(name, wiring, inverse, notch, flags))
+
+        with open(path, "wb") as out:
+            out.write(b"".join(records))
 
 
 class Stecker:
@@ -176,6 +368,181 @@ class Stator:
         return f"Stator({self.mode!r})"
 
 
+class RotorTables(NamedTuple):
+    """The immutable, compiled description of one rotor at one ringstellung.
+    These are shared between every Rotor built from the same catalog entry,
+    so nothing here may be modified."""
+
+    ringstellung: int
+    notch: tuple[int, ...]
+    static: bool
+    wiring: Mapping[int, int]
+    wiring_back: Mapping[int, int]
+    forward_table: tuple[int, ...]
+    backward_table: tuple[int, ...]
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for an LRUCache, in the style of functools.lru_cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class LRUCache(Generic[K, V]):
+    """A least-recently-used cache, bounded by the total size of the values
+    it holds. Each value counts as 1 towards maxsize, unless a sizeof
+    function is given to measure it."""
+
+    def __init__(self, maxsize: int, sizeof: Optional[Callable[[V], int]] = None):
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.currsize = 0
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    def lookup(
+        self,
+        key: K,
+        build: Callable[[], V],
+        usable: Optional[Callable[[V], bool]] = None,
+    ) -> V:
+        """Returns the value cached for key, or on a miss builds one and
+        caches it in place of any old value. A cached value that usable
+        turns down counts as a miss. A value bigger than the whole cache is
+        returned without being kept."""
+        value = self._entries.get(key)
+        if value is not None:
+            if usable is None or usable(value):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+            self.currsize -= self._size(value)
+
+        self.misses += 1
+        value = build()
+        size = self._size(value)
+        if size <= self.maxsize:
+            self._entries[key] = value
+            self.currsize += size
+            while self.currsize > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self.currsize -= self._size(evicted)
+        return value
+
+    def _size(self, value: V) -> int:
+        return 1 if self.sizeof is None else self.sizeof(value)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, self.currsize)
+
+    def clear(self) -> None:
+        """Empties the cache and resets the statistics."""
+        self._entries.clear()
+        self.currsize = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RotorCache(
+    LRUCache[tuple[int, int, str, int, bool], tuple[Catalog, RotorTables]]
+):
+    """A bounded, least-recently-used cache of RotorTables, keyed by catalog
+    identity and generation, rotor name, ringstellung and ignore_static.
+    Building a machine from rotors that are already in the cache does no
+    wiring work at all, and changing a catalog in place leaves the tables
+    compiled before the change behind.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        super().__init__(maxsize)
+
+    def get(
+        self, catalog: Catalog, rotor_number: str, ringstellung: int, ignore_static: bool
+    ) -> RotorTables:
+        """Returns the tables for this rotor, compiling them on a miss."""
+        key = (
+            id(catalog),
+            catalog.generation,
+            rotor_number,
+            ringstellung,
+            ignore_static,
+        )
+        # The catalog is kept in the entry so its id can't be reused.
+        _, tables = self.lookup(
+            key,
+            lambda: (
+                catalog,
+                compile_rotor(catalog, rotor_number, ringstellung, ignore_static),
+            ),
+            lambda entry: entry[0] is catalog,
+        )
+        return tables
+
+    def __repr__(self) -> str:
+        return f"RotorCache({self.maxsize!r})"
+
+
+ROTOR_CACHE = RotorCache()
+"""The cache every Rotor gets its tables from."""
+
+
+def compile_rotor(
+    catalog: Catalog, rotor_number: str, ringstellung: int, ignore_static: bool
+) -> RotorTables:
+    """Builds the RotorTables for a catalog entry at a ringstellung given as
+    a number (A=1). Most callers want ROTOR_CACHE.get instead."""
+    if rotor_number in catalog:
+        description = catalog[rotor_number]
+    else:
+        raise RotorNotFound(rotor_number)
+
+    wirings = catalog.wirings.get(rotor_number)
+    wiring_out, inverse = wirings or wiring_bytes(description)
+
+    # Turning the ring by r moves both the entry and the exit contacts of
+    # the core wiring round by r.
+    r = ringstellung - 1
+    wiring = {}
+    wiring_back = {}
+    for pin in range(26):
+        wiring[pin + 1] = (wiring_out[(pin - r) % 26] + r) % 26 + 1
+        wiring_back[pin + 1] = (inverse[(pin - r) % 26] + r) % 26 + 1
+
+    notch = [alpha_to_index(Char(position)) for position in description["notch"]]
+
+    static = False
+    if not ignore_static:
+        # Issue 4: Bravo and Gamma rotor need to be static for m4
+        static = bool(description.get("static", False))
+
+    # The wiring dicts are kept for reference, but the signal path runs on
+    # the flattened tables: entry 26 * position + signal holds the
+    # (zero-indexed) output for that position, so the faces never have to
+    # be mapped again while a message is being processed.
+    return RotorTables(
+        ringstellung=ringstellung,
+        notch=tuple(notch),
+        static=static,
+        wiring=MappingProxyType(wiring),
+        wiring_back=MappingProxyType(wiring_back),
+        forward_table=compile_table(wiring),
+        backward_table=compile_table(wiring_back),
+    )
+
+
 class Rotor:
     """This simple class represents a single rotor object. The rotors themselves
     are defined in RotorSettings.json of this package. Select a rotor by provding
@@ -200,56 +567,42 @@ class Rotor:
         """
         self.name = rotor_number
         self.step_me = False
-        self.static = False
         self.catalog = catalog
         self.ignore_static = ignore_static
-        if rotor_number in catalog:
-            description = catalog[rotor_number]
-        else:
-            raise RotorNotFound(rotor_number)
 
-        self.ringstellung: int = alpha_to_num(Char("A"))
+        ring_number = alpha_to_num(Char("A"))
         if ringstellung is not None:
-            ringstellung = Char(ringstellung)
-            self.ringstellung = alpha_to_num(ringstellung.upper())
+            ring_number = alpha_to_num(Char(ringstellung).upper())
 
         self.position: int
-
-        # Extremely nasty ringstellung implementation follows.
-        # For this to work, ringstellung needs to be a number,
-        # rather than an index.
-
-        ringstellunged_to_keys = {}  # ringstellung offset for entry pins.
-        pins_to_ringstellunged = {}  # ringstellung offset for exit pins.
-
-        pos = self.ringstellung
-        for i in range(1, 27):
-            if pos > 26:
-                pos -= 26
-            ringstellunged_to_keys[pos] = i
-            pins_to_ringstellunged[i] = pos
-            pos += 1
-
-        self.notch = []
-        for position in description["notch"]:
-            self.notch.append(alpha_to_index(Char(position)))
-        self.wiring = {}
-        self.wiring_back = {}
-
-        for shifted_input in ringstellunged_to_keys:
-            in_pin = ringstellunged_to_keys[shifted_input]
-            out_pin = pins_to_ringstellunged[description["wiring"][str(in_pin)]]
-            self.wiring[shifted_input] = out_pin
-            self.wiring_back[out_pin] = shifted_input
-
-        if not ignore_static:
-            if (
-                "static" in description.keys()
-            ):  # Issue 4: Bravo and Gamma rotor need to be static for m4
-                if description["static"]:
-                    self.static = True
-                else:
-                    self.static = False
+        self.ringstellung = ring_number
+        self._attach_tables()
+
+    def _attach_tables(self) -> None:
+        """Only the position and step flag belong to this rotor; the wiring
+        is shared with every other rotor of the same type and ringstellung."""
+        self.tables = ROTOR_CACHE.get(
+            self.catalog, self.name, self.ringstellung, self.ignore_static
+        )
+        self.notch = self.tables.notch
+        self.static = self.tables.static
+        self.wiring = self.tables.wiring
+        self.wiring_back = self.tables.wiring_back
+        self.forward_table = self.tables.forward_table
+        self.backward_table = self.tables.backward_table
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickles without the shared tables; they are looked up again."""
+        state = self.__dict__.copy()
+        for name in RotorTables._fields:
+            state.pop(name, None)
+        del state["tables"]
+        state["ringstellung"] = self.ringstellung
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._attach_tables()
 
     def __repr__(self) -> str:
         return f'Rotor("{self.catalog!r}", {self.name!r}", {self.ringstellung!r}, {self.ignore_static!r})'
@@ -268,11 +621,109 @@ class RotorMechanism:
         for rotor in self.rotors:
             rotor.position = 1
         self.reflector = reflector
+        # What "advance" and "trace" need, looked up once.
+        self._notches = [frozenset(rotor.notch) for rotor in list_rotors]
+        self._moving = [i for i, rotor in enumerate(list_rotors) if not rotor.static]
+        self._checks = range(len(list_rotors) - 1)
+        self._order = range(len(list_rotors))
+        self._reverse = self._order[::-1]
+        self._forward = [rotor.forward_table for rotor in list_rotors]
+        self._backward = [rotor.backward_table for rotor in list_rotors]
 
     def set(self, rotor_slot: int, setting: Char) -> None:
         """Expects a python-indexed rotor and a character for a setting"""
         self.rotors[rotor_slot].position = alpha_to_index(setting)
 
+    def step(self) -> None:
+        """Advances the wheel pack by one key press, without substituting
+        anything. This is the stepping half of "process", and steps the
+        rotors' own state by way of "advance"."""
+        rotors = self.rotors
+        positions = [rotor.position for rotor in rotors]
+        flags = [rotor.step_me for rotor in rotors]
+        self.advance(positions, flags)
+        for rotor, position, flag in zip(rotors, positions, flags):
+            rotor.position = position
+            rotor.step_me = flag
+
+    def advance(self, positions: list[int], flags: list[bool]) -> None:
+        """Steps a rotor state kept outside the rotors - positions and step
+        flags, rightmost rotor first - by one key press, in place. "step"
+        applies it to the rotors' own state; here the rotors themselves
+        aren't touched, so any number of threads may advance their own
+        states at once."""
+        notches = self._notches
+        flags[0] = True
+        for i in self._checks:
+            if flags[i] and positions[i] in notches[i]:
+                flags[i + 1] = True
+        for i in self._moving:
+            if flags[i]:
+                flags[i] = False
+                positions[i] = (positions[i] + 1) % 26
+
+    def trace(self, positions: Sequence[int], pin: int) -> int:
+        """The zero-indexed pin a signal entering on pin comes back out on,
+        through the rotors, reflector and rotors again with the rotors at
+        positions (rightmost first) rather than wherever they are."""
+        forward = self._forward
+        backward = self._backward
+        for i in self._order:
+            pin = forward[i][26 * positions[i] + pin]
+        pin = self.reflector.forward_table[pin]  # The reflector sits at 0.
+        for i in self._reverse:
+            pin = backward[i][26 * positions[i] + pin]
+        return pin
+
+    def scrambler(self, positions: Sequence[int]) -> bytes:
+        """The whole permutation of pins the pack makes at positions, as
+        "trace" gives it for each of the 26 pins."""
+        return bytes([self.trace(positions, pin) for pin in range(26)])
+
+    def schedule(self, count: int, advance: bool = False) -> "array[int]":
+        """Returns the rotor positions in use for each of the next count key
+        presses, as a flat array of count * len(rotors) bytes. Row k holds the
+        positions (A=0, rightmost rotor first) the signal of press k meets.
+
+        This follows exactly the same stepping rules as "step", but without
+        touching the rotors unless advance is True, in which case the pack is
+        left as it would be after count calls to "process".
+        """
+        positions = [rotor.position for rotor in self.rotors]
+        flags = [rotor.step_me for rotor in self.rotors]
+
+        schedule: "array[int]" = array("B")
+        for _ in range(count):
+            self.advance(positions, flags)
+            schedule.extend(positions)
+
+        if advance:
+            for rotor, position, flag in zip(self.rotors, positions, flags):
+                rotor.position = position
+                rotor.step_me = flag
+        return schedule
+
+    def seek(self, count: int) -> None:
+        """Moves the pack to the state it would be in after count more key
+        presses, without stepping through them one at a time.
+
+        Rotor n + 1 moves on the presses where rotor n moved from one of its
+        notches, and because rotor n's position on its r-th move is simply
+        its start plus r, those presses repeat with a period of 26 moves.
+        Counting them is plain arithmetic, so this takes the same time for
+        ten key presses as for ten million.
+        """
+        positions, flags = seek_state(
+            [rotor.position for rotor in self.rotors],
+            [rotor.step_me for rotor in self.rotors],
+            [rotor.notch for rotor in self.rotors],
+            [rotor.static for rotor in self.rotors],
+            count,
+        )
+        for rotor, position, flag in zip(self.rotors, positions, flags):
+            rotor.position = position
+            rotor.step_me = flag
+
     def process(self, bit_in: int) -> int:
         """Expects the pinning code from Stator, and returns an output
         of a similar nature. Also increments the state by adjusting the
@@ -281,40 +732,16 @@ class RotorMechanism:
 
         next_bit = bit_in
 
-        self.rotors[0].step_me = True  # The rightmost rotor always steps.
-        indexer = -1
-        for rotor in self.rotors:
-            indexer += 1
-            if (
-                rotor.position in rotor.notch
-            ):  # If a rotor is at its notch, the one on the left steps.
-                if rotor.step_me:
-                    try:
-                        self.rotors[indexer + 1].step_me = True
-                    except IndexError:
-                        pass
-
-        for rotor in self.rotors:
-            if not rotor.static:  # Edge Case: The M4 B & C rotors don't rotate.
-                if rotor.step_me:
-                    rotor.step_me = False  # We gonna step now.
-                    rotor.position += 1
-                    if rotor.position > 25:  # Position can't exceed 25.
-                        rotor.position -= 26
+        self.step()
 
+        next_bit -= 1  # The compiled tables are zero-indexed.
         for rotor in self.rotors:
-            entry_face, exit_face = map_faces(rotor)
-            entry_pin = entry_face[next_bit]
-            exit_pin = rotor.wiring[entry_pin]
-            next_bit = exit_face[exit_pin]
-        next_bit = self.reflector.wiring[next_bit]
+            next_bit = rotor.forward_table[26 * rotor.position + next_bit]
+        next_bit = self.reflector.forward_table[next_bit]  # Reflector sits at 0.
         for rotor in reversed(self.rotors):
-            entry_face, exit_face = map_faces(rotor)
-            entry_pin = entry_face[next_bit]
-            exit_pin = rotor.wiring_back[entry_pin]
-            next_bit = exit_face[exit_pin]
+            next_bit = rotor.backward_table[26 * rotor.position + next_bit]
 
-        output = next_bit
+        output = next_bit + 1
 
         return output
 
@@ -322,6 +749,111 @@ class RotorMechanism:
         return f"RotorMechanism({self.rotors!r}, {self.reflector!r})"
 
 
+class _Firing:
+    """The set of key presses on which one rotor of a pack fires, as used by
+    RotorMechanism.seek. Give either start, for every press from start on, or
+    the level to the right and the move numbers (mod 26) that carry over."""
+
+    def __init__(
+        self,
+        start: Optional[int] = None,
+        right: Optional["_Firing"] = None,
+        hits: Sequence[int] = (),
+    ) -> None:
+        self.start = start
+        self.right = right
+        self.hits = hits
+
+    def count(self, presses: int) -> int:
+        """How many of the first presses this rotor fires on."""
+        if self.start is not None:
+            return max(0, presses - self.start)
+        assert self.right is not None
+        moves = self.right.count(presses)
+        full, partial = divmod(moves, 26)
+        return full * len(self.hits) + bisect_left(self.hits, partial)
+
+    def nth(self, r: int, never: int) -> int:
+        """The press the r-th firing happens on, or never if it doesn't."""
+        if self.start is not None:
+            return min(self.start + r, never)
+        assert self.right is not None
+        if not self.hits:
+            return never
+        cycles, hit = divmod(r, len(self.hits))
+        return self.right.nth(26 * cycles + self.hits[hit], never)
+
+
+def seek_state(
+    positions: Sequence[int],
+    flags: Sequence[bool],
+    notches: Sequence[Iterable[int]],
+    static: Sequence[bool],
+    count: int,
+) -> tuple[list[int], list[bool]]:
+    """The rotor positions and step flags, rightmost rotor first, after
+    count more key presses from the given ones. This is the arithmetic
+    behind RotorMechanism.seek, for callers that keep the state themselves.
+    """
+    if count < 0:
+        raise ValueError("The wheel pack cannot be stepped backwards.")
+
+    # Each entry describes the presses (numbered from 0) on which a
+    # rotor's step_me flag is up when the notches are checked: either
+    # every press from a given one onwards, or those of the rotor to the
+    # right whose move number r has r % 26 in a sorted list of hits.
+    levels: list[_Firing] = []
+    for i in range(len(positions)):
+        if i == 0:
+            level = _Firing(start=0)
+        else:
+            right = frozenset(notches[i - 1])
+            if static[i - 1]:
+                hits = list(range(26)) if positions[i - 1] in right else []
+            else:
+                hits = [d for d in range(26) if (positions[i - 1] + d) % 26 in right]
+            level = _Firing(right=levels[i - 1], hits=hits)
+            if static[i]:  # Once raised, a static wheel's flag stays up.
+                first = 0 if flags[i] else level.nth(0, count)
+                level = _Firing(start=first)
+        levels.append(level)
+
+    new_positions = list(positions)
+    new_flags = list(flags)
+    for i, level in enumerate(levels):
+        fired = level.count(count)
+        if static[i]:
+            new_flags[i] = new_flags[i] or fired > 0
+        else:
+            new_positions[i] = (positions[i] + fired) % 26
+    return new_positions, new_flags
+
+
+class _OperatorTable(dict[int, Optional[str]]):
+    """The translation table behind Operator.clean. Punctuation is spelled
+    out, A-Z are kept and the rest of Latin-1 is deleted, all held in the
+    table. Any other code point is deleted without being stored, so the
+    table never grows however varied the text."""
+
+    def __missing__(self, key: int) -> Optional[str]:
+        return None
+
+
+OPERATOR_TABLE = _OperatorTable(
+    {
+        **dict.fromkeys(range(256)),
+        **{code: chr(code) for code in range(65, 91)},
+        ord("."): "X",
+        ord(":"): "XX",
+        ord(","): "ZZ",
+        ord("?"): "FRAQ",
+        ord("("): "KLAM",
+        ord(")"): "KLAM",
+        ord("'"): "X",
+    }
+)
+
+
 class Operator:
     """A special pre-parser that does some pre-formatting to the feed. This
     includes adjusting the spacing and stripping out characters that can't
@@ -335,40 +867,71 @@ class Operator:
 
     def format(self, message: str) -> str:
         """Accepts a string as input and does some parsing to it."""
-        cased_message = message.upper()
-        message_characters = cased_message.replace(" ", "")
-        dict_replacement_characters = {
-            ".": "X",
-            ":": "XX",
-            ",": "ZZ",
-            "?": "FRAQ",
-            "(": "KLAM",
-            ")": "KLAM",
-            """'""": "X",
-        }
-        for punct in dict_replacement_characters:
-            message_characters = message_characters.replace(
-                punct, dict_replacement_characters[punct]
-            )
-
-        for character in message_characters:
-            if character not in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
-                message_characters = message_characters.replace(character, "")
-
-        m = message_characters
-        # This next step adds the spaces which cut the words up.
-        message_spaced = " ".join(
-            [
-                m[i : i + self.word_length]
-                for i in range(0, len(message_characters), self.word_length)
-            ]
-        )
+        return self.group(self.clean(message))
+
+    def clean(self, message: str) -> str:
+        """The first half of "format": returns message as the bare letters
+        to be typed, with punctuation spelled out and everything else that
+        Enigma can't represent removed. Every character is cleaned on its
+        own, so a message may be cleaned in pieces."""
+        return message.upper().translate(OPERATOR_TABLE)
+
+    def formatter(self) -> "IncrementalFormatter":
+        """Returns an IncrementalFormatter for feeding a message to this
+        operator a piece at a time."""
+        return IncrementalFormatter(self)
+
+    def group(self, letters: str, offset: int = 0) -> str:
+        """The second half of "format": cuts cleaned letters up into words.
+        Offset is the number of letters already written before these, so
+        that a message formatted in pieces comes out exactly as a whole."""
+        first = -offset % self.word_length  # Letters to finish an open word.
+        m = letters
+        words = [
+            m[i : i + self.word_length]
+            for i in range(first, len(letters), self.word_length)
+        ]
+        message_spaced = letters[:first]
+        if words:
+            if offset + first > 0:
+                message_spaced += " "
+            message_spaced += " ".join(words)
         return message_spaced
 
     def __repr__(self) -> str:
         return f"Operator({self.word_length!r})"
 
 
+class IncrementalFormatter:
+    """Formats a message for an Operator a piece at a time. Feeding it
+    pieces gives, joined together, exactly what Operator.format gives for
+    the whole message."""
+
+    def __init__(self, operator: Operator) -> None:
+        self.operator = operator
+        self.written = 0  # Letters output so far.
+
+    def feed(self, message: str) -> str:
+        """Returns the formatted output for the next piece of the message."""
+        letters = self.operator.clean(message)
+        message_spaced = self.operator.group(letters, self.written)
+        self.written += len(letters)
+        return message_spaced
+
+    def __repr__(self) -> str:
+        return f"IncrementalFormatter({self.operator!r})"
+
+
+class MachineState(NamedTuple):
+    """What Enigma.snapshot records: the rotor positions and step flags,
+    rightmost rotor first, and the Stecker in use. Steckers are never
+    changed in place (set_stecker makes a new one), so sharing it is safe."""
+
+    positions: tuple[int, ...]
+    flags: tuple[bool, ...]
+    stecker: Stecker
+
+
 class Enigma:
     """A magic package that instantiates everything, allowing you to call your
     enigma machine as though it were a machine and operator pair. Allows these
@@ -400,10 +963,7 @@ class Enigma:
         # We have to reverse the rotors as we insert them because the signal
         # originates at the right-hand edge of the wheelpack.
 
-        if isinstance(catalog, str):
-            if catalog != "default":
-                raise ValueError('Must be a Catalog or "default".')
-            catalog = Catalog.default()
+        catalog = resolve_catalog(catalog)
         self.catalog = catalog
         wheels = []
         rotors = rotors[::-1]  # reverse the tuple
@@ -445,20 +1005,170 @@ class Enigma:
         for i in range(0, len(physical_setting)):
             self.wheel_pack.set(i, physical_setting[i])
 
+    def seek(self, count: int) -> None:
+        """Moves the wheels on by count key presses, as if that many letters
+        had been enciphered. Spaces and other characters that the machine
+        passes through unchanged do not count."""
+        self.wheel_pack.seek(count)
+
     def set_stecker(self, setting: str) -> None:
         """Accepts a string to be the new stecker board arrangement."""
         self.stecker = Stecker(setting)
 
+    def snapshot(self) -> MachineState:
+        """Returns the machine's state as a small, picklable token for
+        restore. Unlike set_wheels, restoring it puts back the step flags
+        and the stecker as well as the positions."""
+        rotors = self.wheel_pack.rotors
+        return MachineState(
+            tuple(rotor.position for rotor in rotors),
+            tuple(rotor.step_me for rotor in rotors),
+            self.stecker,
+        )
+
+    def restore(self, state: MachineState) -> None:
+        """Rewinds (or winds on) to a state from snapshot, which may have
+        been taken on another machine with the same number of rotors. The
+        rotors are updated in place; nothing is rebuilt."""
+        rotors = self.wheel_pack.rotors
+        if len(state.positions) != len(rotors) or len(state.flags) != len(rotors):
+            raise ValueError("The state is for a different number of rotors.")
+        for rotor, position, flag in zip(rotors, state.positions, state.flags):
+            rotor.position = position
+            rotor.step_me = flag
+        self.stecker = state.stecker
+
     # def set_wheelpack(self, list_rotors):
     # self.wheel_pack = RotorMechanism(list_rotors.reverse())
 
-    def parse(self, message: str = "Hello World") -> str:
+    def parse(self, message: str = "Hello World", vectorized: bool = False) -> str:
+        """Processes message through the machine and returns the result.
+
+        With vectorized=True the rotor positions for the whole message are
+        computed up front and the letters are substituted as NumPy array
+        operations. The output and the final machine state are identical to
+        the default path; this needs the optional numpy dependency.
+        """
+        str_message = self.prepare(message)
+
+        if vectorized:
+            from python_enigma import vectorized as vec
+
+            return vec.encipher(self, str_message)
+
+        return self.encipher(str_message)
+
+    def prepare(self, message: str) -> str:
+        """Returns message as it will be typed: formatted by the operator if
+        there is one, otherwise simply upper-cased."""
         if self.operator:
-            str_message = self.operator.format(message)
-        else:
-            str_message = message.upper()
+            return self.operator.format(message)
+        return message.upper()
+
+    def parse_parallel(self, message: str, workers: Optional[int] = None) -> str:
+        """Processes message like "parse", splitting it across a pool of
+        worker processes.
+
+        The message is formatted first, then cut into one contiguous chunk
+        per worker. Each worker gets a copy of this machine, seeks it to the
+        number of letters before its chunk and enciphers the chunk, so the
+        joined result is identical to a serial parse. This machine is left in
+        the same state a serial parse would leave it.
+        """
+        str_message = self.prepare(message)
+        workers = workers or os.cpu_count() or 1
+        if workers < 2 or not str_message:
+            return self.encipher(str_message)
+
+        size = -(-len(str_message) // workers)  # Ceiling division
+        chunks = [str_message[i : i + size] for i in range(0, len(str_message), size)]
+        offsets = []
+        letters = 0
+        for chunk in chunks:
+            offsets.append(letters)
+            letters += sum(1 for c in chunk if c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+        jobs = [(self, offset, chunk) for offset, chunk in zip(offsets, chunks)]
+        str_ciphertext = "".join(pool_map(_encipher_at, jobs, workers))
+        self.seek(letters)
+        return str_ciphertext
 
-        str_ciphertext = ""
+    def signal_tables(self) -> tuple[list[int], list[int]]:
+        """Returns the stecker and stator folded into two lookup tables:
+        from a letter (A=0) to the zero-indexed pin it enters the wheel pack
+        on, and from the zero-indexed pin a signal leaves on to the ASCII
+        code of the lamp that lights."""
+        stecker = list(range(26))
+        for fromchar, tochar in self.stecker.stecker_setting.items():
+            stecker[alpha_to_index(fromchar)] = alpha_to_index(tochar)
+        entry = [0] * 26
+        lamps = [0] * 26
+        for char, pin in self.stator.stator_settings.items():
+            steckered = stecker[alpha_to_index(char)]
+            entry[steckered] = pin - 1
+            lamps[pin - 1] = ord("A") + steckered
+        return entry, lamps
+
+    def parse_bytes(self, buffer: ByteBuffer) -> bytes:
+        """Processes ASCII text held in bytes, a bytearray, a memoryview or
+        the like, and returns the result as bytes. See parse_into."""
+        output = bytearray(len(memoryview(buffer).cast("B")))
+        self.parse_into(buffer, output)
+        return bytes(output)
+
+    def parse_into(self, source: ByteBuffer, target: ByteBuffer) -> int:
+        """Processes ASCII text from source into the writable buffer target,
+        which may be the same buffer. Letters are enciphered (lower case ones
+        as upper case) and every other byte is copied across unchanged, as
+        parse does with no operator. Nothing is decoded, and the operator
+        isn't used. Returns the number of letters enciphered."""
+        source_view = memoryview(source).cast("B")
+        target_view = memoryview(target).cast("B")
+        if len(target_view) < len(source_view):
+            raise ValueError("The target buffer is smaller than the source.")
+
+        entry, lamps = self.signal_tables()
+        mechanism = self.wheel_pack
+        advance = mechanism.advance
+        trace = mechanism.trace
+        positions = [rotor.position for rotor in mechanism.rotors]
+        flags = [rotor.step_me for rotor in mechanism.rotors]
+
+        letters = 0
+        for i, byte in enumerate(source_view):
+            if 97 <= byte <= 122:  # Lower case
+                byte -= 32
+            if 65 <= byte <= 90:
+                advance(positions, flags)
+                byte = lamps[trace(positions, entry[byte - 65])]
+                letters += 1
+            target_view[i] = byte
+
+        for rotor, position, flag in zip(mechanism.rotors, positions, flags):
+            rotor.position = position
+            rotor.step_me = flag
+        return letters
+
+    def compile(self) -> "CompiledKey":
+        """Returns a CompiledKey holding the substitution for every rotor
+        state this machine will pass through from its current state. See
+        python_enigma.compiled."""
+        from python_enigma.compiled import CompiledKey
+
+        return CompiledKey(self)
+
+    def config(self) -> "MachineConfig":
+        """Returns this machine's settings, less the operator and the wheel
+        positions, as an immutable MachineConfig that threads can share. See
+        python_enigma.config."""
+        from python_enigma.config import MachineConfig
+
+        return MachineConfig.from_machine(self)
+
+    def encipher(self, str_message: str) -> str:
+        """Sends an already prepared message through the machine, letter by
+        letter. Characters other than A-Z are passed through unchanged."""
+        str_ciphertext = []
         for character in str_message:
             character = Char(character)
             if character in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
@@ -474,9 +1184,36 @@ class Enigma:
                 next_char = lamp
             else:  # Raised if an unformatted message contains special characters
                 next_char = character
-            str_ciphertext += next_char
-
-        return str_ciphertext
+            str_ciphertext.append(next_char)
+
+        return "".join(str_ciphertext)
+
+    def iter_parse(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Processes a message given as any number of pieces, yielding the
+        output for each piece in turn. Machine state and the operator's word
+        grouping carry over from one piece to the next, so the joined output
+        is identical to a single parse of the joined pieces."""
+        formatter = self.operator.formatter() if self.operator else None
+        for chunk in chunks:
+            if formatter:
+                str_message = formatter.feed(chunk)
+            else:
+                str_message = chunk.upper()
+            yield self.encipher(str_message)
+
+    def parse_stream(
+        self, reader: TextIO, writer: TextIO, chunk_size: int = 1 << 16
+    ) -> int:
+        """Processes everything that can be read from reader, chunk_size
+        characters at a time, and writes the result to writer. Memory use
+        doesn't grow with the length of the input. Returns the number of
+        characters written."""
+        written = 0
+        chunks = iter(partial(reader.read, chunk_size), "")
+        for str_ciphertext in self.iter_parse(chunks):
+            writer.write(str_ciphertext)
+            written += len(str_ciphertext)
+        return written
 
     def __repr__(self) -> str:
         return f"""Enigma(catalog={self.catalog},
@@ -489,6 +1226,42 @@ word_length={self.operator.word_length if self.operator else 'NA'},
 ignore_static_wheels={self.ignore_static_wheels})"""
 
 
+def _encipher_at(machine: Enigma, offset: int, str_message: str) -> str:
+    """Worker for Enigma.parse_parallel: enciphers one chunk of a prepared
+    message that starts offset letters into the whole."""
+    machine.seek(offset)
+    return machine.encipher(str_message)
+
+
+def resolve_catalog(catalog: Catalog | str) -> Catalog:
+    """Returns catalog, or the default catalog for the string "default",
+    as every catalog argument in the package accepts."""
+    if isinstance(catalog, str):
+        if catalog != "default":
+            raise ValueError('Must be a Catalog or "default".')
+        catalog = Catalog.default()
+    return catalog
+
+
+def pool_map(
+    function: Callable[..., T],
+    jobs: Iterable[Sequence[Any]],
+    workers: Optional[int] = None,
+) -> list[T]:
+    """Calls function with the arguments of each job and returns the
+    results in order. The calls are spread over a pool of workers processes,
+    one per CPU by default; with fewer than 2 they run in this process."""
+    workers = workers or os.cpu_count() or 1
+    if workers < 2:
+        return [function(*job) for job in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(function, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
 def alpha_to_index(char: Char) -> int:
     """Takes a single character and converts it to a number where A=0"""
     translator = {
@@ -525,18 +1298,32 @@ def num_to_alpha(integ: int) -> str:
     return translator[integ]
 
 
-def map_faces(rotor: Rotor) -> tuple[dict[int, int], dict[int, int]]:
-    """Are you ready for bad entry pinning mapping?"""
-
-    pos = rotor.position + 1  # We need a pin number, rather than an index
-    neutral_to_pins: dict[int, int] = dict()
-    pins_to_neutral: dict[int, int] = dict()
-
-    for i in range(1, 27):
-        if pos > 26:
-            pos -= 26
-        neutral_to_pins[i] = pos
-        pins_to_neutral[pos] = i  # This is probably not right...
-        pos += 1
-
-    return neutral_to_pins, pins_to_neutral
+def wiring_bytes(description: RotorSpec) -> tuple[bytes, bytes]:
+    """A catalog entry's wiring and its inverse, as the zero-indexed output
+    for each zero-indexed input."""
+    wiring = bytearray(26)
+    inverse = bytearray(26)
+    for in_pin, out_pin in description["wiring"].items():
+        wiring[int(in_pin) - 1] = out_pin - 1
+        inverse[out_pin - 1] = int(in_pin) - 1
+    return bytes(wiring), bytes(inverse)
+
+
+@lru_cache(maxsize=None)
+def notch_letters(mask: int) -> str:
+    """The notch letters of a bitmask with A as bit 0, as in the binary
+    catalogue."""
+    return "".join(num_to_alpha(i + 1) for i in range(26) if mask >> i & 1)
+
+
+def compile_table(wiring: Mapping[int, int]) -> tuple[int, ...]:
+    """Flattens a pin-numbered wiring into a zero-indexed lookup table that
+    already accounts for every rotor position. The output for a signal x
+    entering at position p is found at index 26 * p + x."""
+    table = []
+    for position in range(26):
+        for signal in range(26):
+            entry_pin = (signal + position) % 26 + 1
+            exit_pin = wiring[entry_pin]
+            table.append((exit_pin - 1 - position) % 26)
+    return tuple(table)
@@ -0,0 +1,232 @@
+"""Daily key sheets and the traffic sent under them.
+
+A key sheet gives, for each day, the wheel order, ring settings, stecker and
+reflector, and for the prewar indicator procedure a Grundstellung. Each
+message then carries an indicator telling the receiver where to start the
+wheels. A KeySheet compiles a day's settings into a MachineConfig the first
+time a message for that day turns up and keeps it in a small LRU cache, so a
+day's traffic costs one compilation however many messages there are, and
+each message only a Cursor.
+
+Indicators are read one of two ways. By default the indicator is the
+message key (the starting positions) in the clear. With double=True it is
+the message key typed twice and enciphered: at the day's Grundstellung, if
+the indicator is just the six (or eight) enciphered letters, or at a
+Grundstellung of the operator's choosing sent in the clear ahead of them,
+as from 1938.
+
+A key sheet file is tab-separated text with a header row: date, rotors (left
+to right, comma separated), ringstellung, stecker, reflector and
+grundstellung, where the last three may be left empty. Message files have
+the columns date, indicator and ciphertext.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from python_enigma.config import MachineConfig
+from python_enigma.enigma import CacheInfo, Catalog, LRUCache, resolve_catalog
+
+KEY_SHEET_HEADER = "date\trotors\tringstellung\tstecker\treflector\tgrundstellung\n"
+MESSAGES_HEADER = "date\tindicator\tciphertext\n"
+
+
+class IndicatorInvalid(Exception):
+    """A doubly enciphered indicator whose two halves don't agree."""
+
+
+class DailyKey(NamedTuple):
+    """One day's line of a key sheet. Rotors and ringstellung read left to
+    right, as for Enigma."""
+
+    date: str
+    rotors: tuple[str, ...]
+    ringstellung: str
+    stecker: Optional[str] = None
+    reflector: str = "Reflector B"
+    grundstellung: Optional[str] = None
+
+    def config(
+        self, catalog: Catalog | str = "default", stator: str = "military"
+    ) -> MachineConfig:
+        """Compiles this day's settings."""
+        return MachineConfig(
+            catalog=catalog,
+            stecker=self.stecker,
+            stator=stator,
+            rotors=list(zip(self.rotors, self.ringstellung)),
+            reflector=self.reflector,
+        )
+
+
+class Decrypt(NamedTuple):
+    """A deciphered message and the message key it was found under."""
+
+    date: str
+    message_key: str
+    plaintext: str
+
+
+class KeySheet:
+    """A key sheet's days, with the MachineConfig of the most recently used
+    maxsize of them cached."""
+
+    def __init__(
+        self,
+        keys: Iterable[DailyKey],
+        catalog: Catalog | str = "default",
+        stator: str = "military",
+        maxsize: int = 32,
+    ) -> None:
+        catalog = resolve_catalog(catalog)
+        self.catalog = catalog
+        self.stator = stator
+        self.keys = {key.date: key for key in keys}
+        self.maxsize = maxsize
+        self._configs: LRUCache[str, MachineConfig] = LRUCache(maxsize)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path,
+        catalog: Catalog | str = "default",
+        stator: str = "military",
+        maxsize: int = 32,
+    ) -> "KeySheet":
+        """Reads a key sheet file. See read_key_sheet."""
+        return cls(read_key_sheet(path), catalog, stator, maxsize)
+
+    def config(self, date: str) -> MachineConfig:
+        """The compiled settings for date, compiling them on a miss. Raises
+        KeyError for a date the sheet doesn't have."""
+        return self._configs.lookup(
+            date, lambda: self.keys[date].config(self.catalog, self.stator)
+        )
+
+    def message_key(self, date: str, indicator: str, double: bool = False) -> str:
+        """The starting positions a message's indicator stands for. See the
+        module documentation for the two ways of reading it."""
+        indicator = indicator.replace(" ", "").upper()
+        if not double:
+            return indicator
+
+        config = self.config(date)
+        width = len(config.static)
+        if len(indicator) == 3 * width:
+            grundstellung, indicator = indicator[:width], indicator[width:]
+        elif len(indicator) == 2 * width:
+            grundstellung = self.keys[date].grundstellung or ""
+            if not grundstellung:
+                raise ValueError(f"The key sheet has no Grundstellung for {date}.")
+        else:
+            raise IndicatorInvalid(indicator)
+        doubled = config.cursor(grundstellung).encipher(indicator)
+        if doubled[:width] != doubled[width:]:
+            raise IndicatorInvalid(indicator)
+        return doubled[:width]
+
+    def decrypt(
+        self, date: str, indicator: str, ciphertext: str, double: bool = False
+    ) -> Decrypt:
+        """Deciphers one message. Characters other than letters, such as the
+        spaces between groups, are passed through."""
+        message_key = self.message_key(date, indicator, double)
+        cursor = self.config(date).cursor(message_key)
+        return Decrypt(date, message_key, cursor.encipher(ciphertext.upper()))
+
+    def decrypt_all(
+        self, records: Iterable[tuple[str, str, str]], double: bool = False
+    ) -> Iterator[Decrypt]:
+        """Deciphers a stream of (date, indicator, ciphertext) records, in
+        order. Traffic grouped by day makes the best use of the cache."""
+        for date, indicator, ciphertext in records:
+            yield self.decrypt(date, indicator, ciphertext, double)
+
+    def encrypt(
+        self,
+        date: str,
+        message_key: str,
+        plaintext: str,
+        double: bool = False,
+        grundstellung: Optional[str] = None,
+    ) -> tuple[str, str]:
+        """Enciphers a prepared message (see Enigma.prepare) as an operator
+        would, returning the indicator and ciphertext. With double, a
+        grundstellung given here is sent in the clear ahead of the doubled
+        message key; otherwise the day's is used."""
+        config = self.config(date)
+        message_key = message_key.upper()
+        indicator = message_key
+        if double:
+            ground = grundstellung or self.keys[date].grundstellung
+            if not ground:
+                raise ValueError(f"The key sheet has no Grundstellung for {date}.")
+            indicator = config.cursor(ground).encipher(2 * message_key)
+            if grundstellung:
+                indicator = grundstellung.upper() + indicator
+        return indicator, config.cursor(message_key).encipher(plaintext)
+
+    def info(self) -> CacheInfo:
+        """The statistics of the config cache."""
+        return self._configs.info()
+
+    def clear(self) -> None:
+        self._configs.clear()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"<KeySheet days={len(self.keys)} maxsize={self.maxsize}>"
+
+
+def read_key_sheet(path: str | Path) -> list[DailyKey]:
+    """Reads the days of a key sheet file."""
+    keys = []
+    with open(path, "r", encoding="ascii") as file:
+        file.readline()  # The header.
+        for line in file:
+            if not line.strip():
+                continue
+            date, rotors, rings, stecker, reflector, ground = line.rstrip("\n").split(
+                "\t"
+            )
+            keys.append(
+                DailyKey(
+                    date=date,
+                    rotors=tuple(rotors.split(",")),
+                    ringstellung=rings,
+                    stecker=stecker or None,
+                    reflector=reflector or "Reflector B",
+                    grundstellung=ground or None,
+                )
+            )
+    return keys
+
+
+def write_key_sheet(path: str | Path, keys: Iterable[DailyKey]) -> None:
+    """Writes a key sheet file."""
+    with open(path, "w", encoding="ascii") as out:
+        out.write(KEY_SHEET_HEADER)
+        for key in keys:
+            fields = (
+                key.date,
+                ",".join(key.rotors),
+                key.ringstellung,
+                key.stecker or "",
+                key.reflector,
+                key.grundstellung or "",
+            )
+            out.write("\t".join(fields) + "\n")
+
+
+def read_messages(path: str | Path) -> Iterator[tuple[str, str, str]]:
+    """Streams the (date, indicator, ciphertext) records of a message
+    file, a line at a time."""
+    with open(path, "r", encoding="ascii") as file:
+        file.readline()  # The header.
+        for line in file:
+            if line.strip():
+                date, indicator, ciphertext = line.rstrip("\n").split("\t")
+                yield date, indicator, ciphertext
@@ -0,0 +1,297 @@
+"""A stecker search for when the rotor settings are known.
+
+The stecker sits outside the wheel pack, so with the rotors fixed the
+scrambler permutation at each position of a message is the same whatever the
+stecker is. Those permutations are built once, as a ScramblerSequence, and
+kept in a ScramblerCache for the next stecker tried against the same wheels;
+after that, deciphering under a stecker s is, at each position,
+s[scrambler[s[c]]] - two lookups either side of a third.
+
+The search is a hill-climb. Starting from an empty (or given) board it tries
+plugging, unplugging and swapping pairs, and keeps any change that improves an
+n-gram score of the decrypt. A change of stecker only alters the decrypt where
+the ciphertext letter, or the letter leaving the scrambler, is one of the
+letters whose plugs moved, so each trial re-deciphers those positions and
+rescores the n-grams that touch them - never the whole message.
+"""
+
+from array import array
+from collections.abc import Hashable, Sequence
+from operator import add
+from typing import NamedTuple, Optional
+
+from python_enigma.bombe import letters_only
+from python_enigma.enigma import Catalog, Enigma, LRUCache, Stecker, alpha_to_index
+from python_enigma.scoring import NgramTable
+
+UPPER_CASE = bytes(range(65, 91))
+
+
+class PlugboardResult(NamedTuple):
+    """The best stecker found and the n-gram score of its decrypt."""
+
+    score: float
+    stecker: Optional[str]  # As for Enigma, "AQ BJ", or None for no plugs.
+
+
+class ScramblerSequence:
+    """The scrambler permutations (A=0, stator included, stecker left out)
+    for a run of key presses from one machine state. Each distinct rotor
+    state's permutation is stored once, in table, and index holds the offset
+    into table of the permutation for each key press.
+
+    Because the stecker is left out, one sequence serves every stecker: see
+    apply. Build these with "build" or, to share them, ScramblerCache.get.
+    """
+
+    def __init__(self, table: bytes, index: "array[int]") -> None:
+        self.table = table
+        self.index = index
+
+    @classmethod
+    def build(cls, machine: Enigma, length: int) -> "ScramblerSequence":
+        """The sequence for the next length key presses of machine, which
+        isn't moved."""
+        entry = [0] * 26
+        lamps = [0] * 26
+        for char, pin in machine.stator.stator_settings.items():
+            entry[alpha_to_index(char)] = pin - 1
+            lamps[pin - 1] = alpha_to_index(char)
+
+        mechanism = machine.wheel_pack
+        width = len(mechanism.rotors)
+        schedule = mechanism.schedule(length).tobytes()
+
+        table = bytearray()
+        offsets: dict[bytes, int] = {}  # Rotor states repeat in long messages.
+        index = array("I")
+        for k in range(length):
+            state = schedule[k * width : (k + 1) * width]
+            offset = offsets.get(state)
+            if offset is None:
+                offset = offsets[state] = len(table)
+                pins = mechanism.scrambler(state)
+                table.extend([lamps[pins[pin]] for pin in entry])
+            index.append(offset)
+        return cls(bytes(table), index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, position: int) -> bytes:
+        """The permutation at one key press."""
+        offset = self.index[position]
+        return self.table[offset : offset + 26]
+
+    @property
+    def nbytes(self) -> int:
+        """Roughly the memory this sequence holds."""
+        return len(self.table) + self.index.itemsize * len(self.index)
+
+    def apply(self, text: bytes, stecker: "Stecker | str | None" = None) -> bytes:
+        """Enciphers (or deciphers) text, ASCII letters A-Z only, as the
+        machine would with stecker in place. Anything else in text, even a
+        space, is refused with ValueError. The rotors are never touched:
+        the stecker goes on either side as two bytes.translate calls."""
+        if len(text) > len(self):
+            raise ValueError("The text is longer than the sequence.")
+        if text.translate(None, UPPER_CASE):
+            raise ValueError("Only the letters A-Z can be enciphered.")
+        partner = stecker_table(stecker)
+        into = bytes.maketrans(UPPER_CASE, bytes(partner[c] for c in range(26)))
+        out_of = bytes.maketrans(bytes(range(26)), bytes(65 + p for p in partner))
+        table = self.table
+        steckered = text.translate(into)
+        return bytes(map(table.__getitem__, map(add, self.index, steckered))).translate(
+            out_of
+        )
+
+    def __repr__(self) -> str:
+        return f"<ScramblerSequence length={len(self)} states={len(self.table) // 26}>"
+
+
+class ScramblerCache(LRUCache[tuple[Hashable, ...], tuple[Catalog, ScramblerSequence]]):
+    """A least-recently-used cache of ScramblerSequences, bounded by the
+    memory they hold rather than by count, so maxsize and currsize are in
+    bytes. Entries are keyed by everything that fixes a machine's scrambler
+    sequence - catalog identity, rotors, ring settings, reflector, stator and
+    the rotor positions and step flags - but not the stecker, so machines
+    differing only in stecker share one.
+
+    A sequence cached for more key presses than are asked for is returned
+    as it is; one for fewer is rebuilt at the new length.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20) -> None:
+        super().__init__(max_bytes, lambda entry: entry[1].nbytes)
+
+    def get(self, machine: Enigma, length: int) -> ScramblerSequence:
+        """Returns a sequence for at least the next length key presses of
+        machine, building it on a miss."""
+        rotors = machine.wheel_pack.rotors
+        key = (
+            id(machine.catalog),
+            machine.catalog.generation,
+            machine.rotor_names,
+            machine.reflector_name,
+            machine.stator.mode,
+            machine.ignore_static_wheels,
+            tuple(rotor.position for rotor in rotors),
+            tuple(rotor.step_me for rotor in rotors),
+        )
+        # The catalog is kept in the entry so its id can't be reused.
+        _, sequence = self.lookup(
+            key,
+            lambda: (machine.catalog, ScramblerSequence.build(machine, length)),
+            lambda entry: entry[0] is machine.catalog and len(entry[1]) >= length,
+        )
+        return sequence
+
+    def __repr__(self) -> str:
+        return f"ScramblerCache({self.maxsize!r})"
+
+
+SCRAMBLER_CACHE = ScramblerCache()
+"""The cache climb gets its scrambler sequences from by default."""
+
+
+def stecker_table(stecker: "Stecker | str | None") -> list[int]:
+    """The partner of each letter (A=0) on a stecker, given as a Stecker or
+    a setting string as for Enigma."""
+    if not isinstance(stecker, Stecker):
+        stecker = Stecker(stecker)
+    partner = list(range(26))
+    for fromchar, tochar in stecker.stecker_setting.items():
+        partner[alpha_to_index(fromchar)] = alpha_to_index(tochar)
+    return partner
+
+
+def stecker_pairs(stecker: Sequence[int]) -> Optional[str]:
+    """The stecker as a partner for each letter (A=0), as a setting string."""
+    pairs = " ".join(chr(65 + a) + chr(65 + b) for a, b in enumerate(stecker) if a < b)
+    return pairs or None
+
+
+def climb(
+    ciphertext: str,
+    machine: Enigma,
+    table: NgramTable,
+    stecker: Optional[str] = None,
+    max_pairs: int = 10,
+    cache: Optional[ScramblerCache] = SCRAMBLER_CACHE,
+) -> PlugboardResult:
+    """Hill-climbs the stecker for ciphertext under the rotor settings of
+    machine, as it stands (its own stecker is ignored and it isn't moved).
+
+    :param table: Scores decrypts; higher is better.
+    :param stecker: Where to start, as for Enigma; an empty board if None.
+    :param max_pairs: The most plug pairs to allow, ten historically.
+    :param cache: Where to get the scrambler sequence; None builds it afresh.
+    :returns: The best stecker found and its score.
+    """
+    cipher = [ord(c) - 65 for c in letters_only(ciphertext)]
+    length = len(cipher)
+    n = table.n
+    log_probs = table.log_probs
+    if length < n:
+        raise ValueError("Too little ciphertext to score.")
+
+    partner = stecker_table(stecker)
+    if sum(partner[a] > a for a in range(26)) > max_pairs:
+        raise ValueError(f"The starting stecker has more than {max_pairs} pairs.")
+
+    if cache is None:
+        sequence = ScramblerSequence.build(machine, length)
+    else:
+        sequence = cache.get(machine, length)
+    perms, index = sequence.table, sequence.index
+    # The letter leaving the scrambler at each position, and for each letter
+    # the positions it enters or leaves the scrambler as.
+    middle = [perms[index[k] + partner[c]] for k, c in enumerate(cipher)]
+    plain = [partner[m] for m in middle]
+    by_cipher: list[set[int]] = [set() for _ in range(26)]
+    by_middle: list[set[int]] = [set() for _ in range(26)]
+    for k, (c, m) in enumerate(zip(cipher, middle)):
+        by_cipher[c].add(k)
+        by_middle[m].add(k)
+
+    def gram(start: int) -> float:
+        value = 0
+        for code in plain[start : start + n]:
+            value = value * 26 + code
+        return log_probs[value]
+
+    score = sum(gram(start) for start in range(length - n + 1))
+
+    def attempt(trial: list[int]) -> bool:
+        """Switches to the trial stecker if it scores better."""
+        nonlocal score
+        changed = [a for a in range(26) if trial[a] != partner[a]]
+        affected: set[int] = set()
+        for letter in changed:
+            affected |= by_cipher[letter]
+            affected |= by_middle[letter]
+        starts = {
+            start
+            for k in affected
+            for start in range(max(0, k - n + 1), min(k, length - n) + 1)
+        }
+
+        old_plain = {k: plain[k] for k in affected}
+        old_middle = {k: middle[k] for k in affected}
+        before = sum(gram(start) for start in starts)
+        for k in affected:
+            middle[k] = perms[index[k] + trial[cipher[k]]]
+            plain[k] = trial[middle[k]]
+        delta = sum(gram(start) for start in starts) - before
+
+        if delta > 0:
+            score += delta
+            partner[:] = trial
+            for k in affected:
+                if middle[k] != old_middle[k]:
+                    by_middle[old_middle[k]].discard(k)
+                    by_middle[middle[k]].add(k)
+            return True
+        for k in affected:
+            middle[k] = old_middle[k]
+            plain[k] = old_plain[k]
+        return False
+
+    improved = True
+    while improved:
+        improved = False
+        for a in range(26):
+            for b in range(a + 1, 26):
+                x, y = partner[a], partner[b]
+                if x == b:
+                    trials = [unplug(partner, a, b)]
+                else:
+                    moved = unplug(unplug(partner, a, x), b, y)
+                    trials = [plug(moved, a, b)]
+                    if x != a and y != b:
+                        # Both were plugged elsewhere: also try pairing the
+                        # two letters they leave behind.
+                        trials.append(plug(plug(moved, a, b), x, y))
+                for trial in trials:
+                    if sum(trial[i] > i for i in range(26)) > max_pairs:
+                        continue
+                    if attempt(trial):
+                        improved = True
+                        break
+    return PlugboardResult(score=score, stecker=stecker_pairs(partner))
+
+
+def plug(stecker: Sequence[int], a: int, b: int) -> list[int]:
+    """A copy of stecker with a and b plugged together."""
+    result = list(stecker)
+    result[a], result[b] = b, a
+    return result
+
+
+def unplug(stecker: Sequence[int], a: int, b: int) -> list[int]:
+    """A copy of stecker with a and b (partners, or both the same letter)
+    unplugged."""
+    result = list(stecker)
+    result[a], result[b] = a, b
+    return result
@@ -0,0 +1,27 @@
+"""Regenerates ngrams_<language>.bin from a text corpus.
+
+Run from this directory, as ``python countngrams.py german corpus.txt ...``.
+Monogram to quadgram counts are taken over all the files together; see
+scoring.count_text for what is counted.
+
+The shipped tables were counted from the message catalogues of common free
+software packages: the German translations for ngrams_german.bin and the
+English originals for ngrams_english.bin. That is technical prose rather than
+military traffic, so pass a better corpus here if you have one.
+"""
+
+from pathlib import Path
+import sys
+from python_enigma import scoring
+
+
+def main(language: str, paths: list[str]) -> None:
+    text = " ".join(Path(path).read_text(encoding="utf-8") for path in paths)
+    scoring.write_counts(
+        scoring.NGRAM_FILE_NAME.format(language),
+        {n: scoring.count_text(text, n) for n in range(1, 5)},
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2:])
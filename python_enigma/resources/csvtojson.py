@@ -1,33 +1,22 @@
-import csv
-import json
-from python_enigma import enigma
-from python_enigma.types import Char
+"""Regenerates catalogue.json and catalogue.bin from table_rotors.csv.
 
-catalogue = {}
+Run from this directory. The conversion itself is Catalog.from_csv; this is
+just the convenience of writing both catalogue formats in one go.
+"""
 
-with open("table_rotors.csv", "r") as file:
-    reading = csv.reader(file)
-    for line in reading:
-        rotor_label = line[0]
-        bindings_dict = {}
-        counter = 1
-        for character in line[1]:
-            binding = enigma.alpha_to_num(Char(character.upper()))
-            new_entry = {counter: binding}
-            bindings_dict.update(new_entry)
-            counter += 1
-        notch = line[2]
+import json
+from python_enigma import enigma
 
-        catalogue.update(
-            {
-                rotor_label: {
-                    "wiring": bindings_dict,
-                    "notch": notch,
-                }
-            }
-        )
+catalogue = enigma.Catalog.from_csv("table_rotors.csv")
 
 with open("catalogue.json", "w") as out:
-    json.dump(catalogue, out)
+    json.dump(
+        {
+            name: {k: v for k, v in spec.items() if k != "name"}
+            for name, spec in catalogue.items()
+        },
+        out,
+    )
+catalogue.to_binary("catalogue.bin")
 print("Done")
 exit()
@@ -0,0 +1,181 @@
+"""Language scoring for decrypts.
+
+An NgramTable holds the log-probability of every n-letter sequence as a flat
+array indexed by the sequence read as a base-26 number (A=0, first letter most
+significant). Scoring a text is then a sum of array lookups, and the change
+in score from altering a few letters can be found by rescoring only the
+n-grams that touch them.
+
+Monogram to quadgram counts for German and English ship in
+python_enigma.resources as ngrams_<language>.bin; NgramTable.load reads them.
+The file is a header (magic and table count) followed, for each n, by n, the
+compressed length and the zlib-compressed little-endian 32-bit counts of all
+26 ** n n-grams. resources/countngrams.py writes it from a text corpus.
+"""
+
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from math import log10
+from pathlib import Path
+import struct
+import sys
+from typing import TYPE_CHECKING
+import zlib
+
+if TYPE_CHECKING:
+    from python_enigma.vectorized import Array
+
+LANGUAGES = ("german", "english")
+NGRAM_FILE_NAME = "ngrams_{}.bin"
+NGRAM_MAGIC = b"ENIGNGR1"
+NGRAM_HEADER = struct.Struct("<8sB")
+NGRAM_TABLE = struct.Struct("<BI")
+
+# Spelled out the way Enigma operators did, as the keyboard had no umlauts.
+TRANSLITERATION = str.maketrans(
+    {"Ä": "AE", "Ö": "OE", "Ü": "UE", "ä": "AE", "ö": "OE", "ü": "UE", "ß": "SS"}
+)
+
+
+class NgramTable:
+    """Log-probabilities (base 10) of all 26 ** n n-grams."""
+
+    _loaded: dict[tuple[str, int, float], "NgramTable"] = {}
+
+    def __init__(self, n: int, log_probs: Iterable[float]) -> None:
+        self.n = n
+        self.log_probs = array("d", log_probs)
+        if len(self.log_probs) != 26**n:
+            raise ValueError(f"An {n}-gram table needs {26 ** n} entries.")
+
+    @classmethod
+    def from_counts(
+        cls, n: int, counts: Sequence[int], floor: float = 0.01
+    ) -> "NgramTable":
+        """Builds a table from n-gram counts laid out like the table. Unseen
+        n-grams are scored as if seen floor times."""
+        total = sum(counts)
+        if not total:
+            raise ValueError("No n-grams were counted.")
+        log_total = log10(total)
+        unseen = log10(floor) - log_total
+        return cls(
+            n,
+            (log10(count) - log_total if count > floor else unseen for count in counts),
+        )
+
+    @classmethod
+    def from_text(cls, text: str, n: int, floor: float = 0.01) -> "NgramTable":
+        """Builds a table by counting the n-grams of text. See count_text."""
+        return cls.from_counts(n, count_text(text, n), floor)
+
+    @classmethod
+    def load(
+        cls, language: str = "german", n: int = 4, floor: float = 0.01
+    ) -> "NgramTable":
+        """Returns the table for one of the shipped LANGUAGES. Each is read
+        once and the same NgramTable handed out afterwards; don't modify it
+        in place."""
+        key = (language, n, floor)
+        if key not in cls._loaded:
+            if language not in LANGUAGES:
+                raise ValueError(f"No n-gram tables for {language!r}.")
+            from python_enigma.enigma import Catalog
+
+            with Catalog.resource_path(NGRAM_FILE_NAME.format(language)) as path:
+                counts = read_counts(path, only=n)
+            if n not in counts:
+                raise ValueError(f"No {n}-gram table for {language!r}.")
+            cls._loaded[key] = cls.from_counts(n, counts[n], floor)
+        return cls._loaded[key]
+
+    def score(self, codes: Sequence[int]) -> float:
+        """The total log-probability of the letter codes (A=0)."""
+        return sum(self.scores(codes))
+
+    def scores(self, codes: Sequence[int]) -> list[float]:
+        """The log-probability of the n-gram starting at each position."""
+        n = self.n
+        log_probs = self.log_probs
+        return [log_probs[index(codes, i, n)] for i in range(len(codes) - n + 1)]
+
+    def score_text(self, text: str) -> float:
+        """The total log-probability of the letters of text. See encode."""
+        return self.score(encode(text))
+
+    def score_many(self, decrypts: "Array") -> "Array":
+        """Scores many decrypts at once: decrypts is a (texts, length) array
+        of letter codes (A=0) or of ASCII upper case letters, and the result
+        holds one total log-probability per text. This needs NumPy."""
+        from python_enigma import vectorized as vec
+
+        return vec.ngram_scores(self.log_probs, self.n, decrypts)
+
+    def __repr__(self) -> str:
+        return f"<NgramTable n={self.n}>"
+
+
+def encode(text: str) -> list[int]:
+    """The letters A-Z of text (in either case) as codes, A=0. Umlauts and
+    eszett are spelled out first, as AE, OE, UE and SS."""
+    letters = text.translate(TRANSLITERATION).upper()
+    return [ord(c) - 65 for c in letters if "A" <= c <= "Z"]
+
+
+def index(codes: Sequence[int], start: int, n: int) -> int:
+    """The table index of the n-gram of codes at start."""
+    value = 0
+    for code in codes[start : start + n]:
+        value = value * 26 + code
+    return value
+
+
+def count_text(text: str, n: int) -> "array[int]":
+    """Counts the n-grams of the letters of text (see encode), laid out as
+    for NgramTable. Letters are counted across spaces and punctuation, as an
+    operator's text runs them together."""
+    codes = encode(text)
+    counts = array("I", bytes(4 * 26**n))
+    for i in range(len(codes) - n + 1):
+        counts[index(codes, i, n)] += 1
+    return counts
+
+
+def write_counts(path: str | Path, counts: Mapping[int, "array[int]"]) -> None:
+    """Writes n-gram counts, keyed by n, in the ngrams_<language>.bin
+    format."""
+    with open(path, "wb") as out:
+        out.write(NGRAM_HEADER.pack(NGRAM_MAGIC, len(counts)))
+        for n, table in sorted(counts.items()):
+            if len(table) != 26**n:
+                raise ValueError(f"An {n}-gram count needs {26 ** n} entries.")
+            little = array("I", table)
+            if sys.byteorder == "big":
+                little.byteswap()
+            data = zlib.compress(little.tobytes(), 9)
+            out.write(NGRAM_TABLE.pack(n, len(data)))
+            out.write(data)
+
+
+def read_counts(path: str | Path, only: int = 0) -> dict[int, "array[int]"]:
+    """Reads n-gram counts, keyed by n, from the ngrams_<language>.bin
+    format. With only, just that table is decompressed."""
+    counts = {}
+    with open(path, "rb") as file:
+        magic, tables = NGRAM_HEADER.unpack(file.read(NGRAM_HEADER.size))
+        if magic != NGRAM_MAGIC:
+            raise ValueError("Not an n-gram count file.")
+        for _ in range(tables):
+            n, length = NGRAM_TABLE.unpack(file.read(NGRAM_TABLE.size))
+            if only and n != only:
+                file.seek(length, 1)
+                continue
+            data = file.read(length)
+            table = array("I")
+            table.frombytes(zlib.decompress(data))
+            if sys.byteorder == "big":
+                table.byteswap()
+            if len(table) != 26**n:
+                raise ValueError(f"The {n}-gram table is the wrong size.")
+            counts[n] = table
+    return counts
@@ -0,0 +1,168 @@
+"""NumPy-backed batch processing for the Enigma machine.
+
+Stepping never depends on the text being typed, so the position of every
+rotor for every key press of a message can be worked out before a single
+letter is substituted. This module does exactly that, then pushes the whole
+message through stecker, stator, wheel pack and reflector as array gathers on
+the compiled rotor tables.
+
+The state tables further down serve the analysis modules, which need the
+scrambler for every rotor position of a wheel order at once.
+
+NumPy is an optional dependency; install it with the ``numpy`` extra. For
+enciphering, nothing here should be needed directly - use
+``Enigma.parse(message, vectorized=True)``.
+"""
+
+from array import array
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover - depends on the environment
+    raise ImportError(
+        "Vectorized parsing requires NumPy. "
+        "Install it with: pip install python_enigma[numpy]"
+    ) from e
+
+if TYPE_CHECKING:
+    from python_enigma.enigma import Enigma, RotorMechanism
+
+Array = np.ndarray[Any, Any]
+
+ORD_A = ord("A")
+
+
+def step_positions(mechanism: "RotorMechanism", count: int) -> Array:
+    """Returns a (count, rotors) array of the rotor positions in use at each
+    of the next count key presses, and leaves the mechanism in the state it
+    would be in after pressing them.
+
+    A rotor "fires" on a press when its step_me flag is up at the time the
+    notches are checked. The rightmost rotor fires on every press, and each
+    other rotor fires when its right-hand neighbour fired from a notch. Static
+    wheels never move, and so keep their flag up forever once it is raised.
+    """
+    rotors = mechanism.rotors
+    positions = np.empty((count, len(rotors)), dtype=np.int64)
+    if count == 0:
+        return positions
+
+    fired = np.ones(count, dtype=bool)  # The rightmost rotor always fires.
+    trigger = fired
+    for i, rotor in enumerate(rotors):
+        if i > 0:
+            fired = trigger.copy()
+            fired[0] |= rotor.step_me
+            if rotor.static:
+                fired = np.logical_or.accumulate(fired)
+
+        if rotor.static:
+            before = np.full(count, rotor.position, dtype=np.int64)
+            positions[:, i] = before
+            rotor.step_me = bool(fired[-1])
+        else:
+            steps = np.cumsum(fired, dtype=np.int64)
+            positions[:, i] = (rotor.position + steps) % 26
+            before = (rotor.position + steps - fired) % 26
+            rotor.position = int(positions[-1, i])
+            rotor.step_me = False
+
+        notches = np.zeros(26, dtype=bool)
+        notches[list(rotor.notch)] = True
+        trigger = fired & notches[before]
+
+    return positions
+
+
+def encipher(machine: "Enigma", message: str) -> str:
+    """Processes an already-formatted message the same way Enigma.parse
+    does, a whole message at a time instead of a character at a time."""
+    codes = np.frombuffer(message.encode("utf-32-le"), dtype=np.uint32).copy()
+    letters = (codes >= ORD_A) & (codes <= ord("Z"))
+    signal = codes[letters].astype(np.int64) - ORD_A
+
+    entry, lamps = (np.asarray(table) for table in machine.signal_tables())
+    mechanism = machine.wheel_pack
+    offsets = 26 * step_positions(mechanism, len(signal))
+
+    codes[letters] = lamps[wheel_pack(mechanism, offsets, entry[signal])]
+    return codes.tobytes().decode("utf-32-le")
+
+
+def wheel_pack(mechanism: "RotorMechanism", offsets: Array, signal: Array) -> Array:
+    """Sends signal (zero-indexed pins) through the rotors, reflector and
+    back. Offsets holds 26 times each rotor's position, in its last axis,
+    for each signal; the other axes broadcast against signal."""
+    rotors = mechanism.rotors
+    for i, rotor in enumerate(rotors):
+        signal = np.asarray(rotor.forward_table)[offsets[..., i] + signal]
+    signal = np.asarray(mechanism.reflector.forward_table[:26])[signal]
+    for i, rotor in reversed(list(enumerate(rotors))):
+        signal = np.asarray(rotor.backward_table)[offsets[..., i] + signal]
+    return signal
+
+
+def all_states(width: int) -> Array:
+    """Returns every combination of positions for width rotors, as a
+    (26 ** width, width) array with the rightmost rotor first. Row n holds the
+    state whose index is n, where index = sum(position[i] * 26 ** i)."""
+    index = np.arange(26**width)
+    return np.stack([index // 26**i % 26 for i in range(width)], axis=1)
+
+
+def scrambler_table(machine: "Enigma", states: Array) -> Array:
+    """Returns a (len(states), 26) uint8 array holding, for each row of
+    rotor positions in states, where each letter (A=0) comes out after the
+    stecker, stator, wheel pack and reflector and back again."""
+    entry, lamps = (np.asarray(table) for table in machine.signal_tables())
+    offsets = 26 * states[:, None, :]
+    signal = wheel_pack(machine.wheel_pack, offsets, entry[None, :])
+    return (lamps[signal] - ORD_A).astype(np.uint8)
+
+
+def next_states(mechanism: "RotorMechanism") -> Array:
+    """Returns an array giving, for each state index (see all_states), the
+    index of the state one key press later.
+
+    The step flag a static wheel keeps raised is not part of the state, so
+    static wheels with notches - which no catalogue wheel has - are refused
+    with a ValueError."""
+    rotors = mechanism.rotors
+    for rotor in rotors:
+        if rotor.static and rotor.notch:
+            raise ValueError(f"Static wheel {rotor.name} has notches.")
+
+    states = all_states(len(rotors))
+    following = np.zeros(len(states), dtype=np.int64)
+    fired = np.ones(len(states), dtype=bool)
+    for i, rotor in enumerate(rotors):
+        position = states[:, i]
+        if not rotor.static:
+            position = (position + fired) % 26
+        following += position * 26**i
+
+        notches = np.zeros(26, dtype=bool)
+        notches[list(rotor.notch)] = True
+        fired = fired & notches[states[:, i]]
+    return following
+
+
+def ngram_scores(log_probs: "array[float]", n: int, decrypts: Array) -> Array:
+    """Sums the n-gram log-probabilities (a flat table indexed by base-26
+    codes, as in scoring.NgramTable) along each row of decrypts, which holds
+    letter codes (A=0) or ASCII upper case letters."""
+    table = np.frombuffer(log_probs, dtype=np.float64)  # No copy.
+    codes = np.asarray(decrypts, dtype=np.int64)
+    if codes.ndim == 1:
+        codes = codes[None, :]
+    if codes.size and codes.max() >= 26:
+        codes = codes - ORD_A
+    windows = codes.shape[1] - n + 1
+    if windows <= 0:
+        return np.zeros(codes.shape[0])
+    indices = codes[:, :windows].copy()
+    for i in range(1, n):
+        indices *= 26
+        indices += codes[:, i : i + windows]
+    return table[indices].sum(axis=1)  # type: ignore[no-any-return]
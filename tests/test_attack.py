@@ -0,0 +1,92 @@
+import sys
+import pytest
+
+from python_enigma import enigma
+
+np = pytest.importorskip("numpy")
+from python_enigma import attack  # noqa: E402
+
+PLAINTEXT = (
+    "Die Lage an der Front ist unveraendert. Der Feind greift weiterhin mit "
+    "starken Kraeften an. Verstaerkungen werden dringend benoetigt. Munition "
+    "und Treibstoff sind knapp. Wir halten die Stellung bis zum letzten Mann "
+    "und erwarten weitere Befehle des Oberkommandos. "
+) * 2
+ROTORS = [("II", "A"), ("IV", "C"), ("III", "F")]
+
+
+def encipher(stecker: str = "AQ BJ") -> str:
+    machine = enigma.Enigma(rotors=ROTORS, reflector="Reflector B", stecker=stecker)
+    machine.set_wheels("KDQ")
+    return machine.parse(PLAINTEXT)
+
+
+class TestRotorSearch:
+    def test_scores_match_decrypts(self) -> None:
+        ciphertext = encipher().replace(" ", "").encode("ascii")
+        candidates = attack.score_order(
+            enigma.Catalog.default(),
+            ("I", "II", "III"),
+            "Reflector B",
+            "AAA",
+            "military",
+            ciphertext,
+            top=3,
+        )
+        assert len(candidates) == 3
+        for candidate in candidates:
+            decrypt = candidate.machine().parse_bytes(ciphertext)
+            assert candidate.score == pytest.approx(attack.score_text(decrypt))
+
+    def test_block(self) -> None:
+        ciphertext = encipher().replace(" ", "").encode("ascii")
+        settings = (
+            enigma.Catalog.default(),
+            ("II", "IV", "III"),
+            "Reflector B",
+            "AAA",
+            "military",
+            ciphertext,
+        )
+        assert attack.score_order(*settings, top=5, block=1000) == (
+            attack.score_order(*settings, top=5)
+        )
+
+    @pytest.mark.parametrize("wheel", [0, 1, 2])
+    def test_ring_trials(self, wheel: int) -> None:
+        ciphertext = encipher().replace(" ", "")
+        candidate = attack.Candidate(
+            0.0, ("II", "IV", "III"), "Reflector B", "AAB", "KDQ"
+        )
+        letters = np.frombuffer(ciphertext.encode("ascii"), dtype=np.uint8) - 65
+        scores = attack.ring_trials(
+            candidate.machine(), letters.astype(np.int64), wheel
+        )
+        for shift in range(1, 26):
+            rings = list(candidate.ringstellung)
+            positions = list(candidate.positions)
+            rings[wheel] = chr((ord(rings[wheel]) - 65 + shift) % 26 + 65)
+            positions[wheel] = chr((ord(positions[wheel]) - 65 + shift) % 26 + 65)
+            trial = candidate._replace(
+                ringstellung="".join(rings), positions="".join(positions)
+            )
+            decrypt = trial.machine().parse_bytes(ciphertext.encode("ascii"))
+            assert scores[shift - 1] == pytest.approx(attack.score_text(decrypt))
+
+    def test_finds_key(self) -> None:
+        candidates = attack.search(
+            encipher(),
+            orders=[("I", "II", "III"), ("II", "IV", "III")],
+            top=3,
+            workers=1,
+        )
+        best = candidates[0]
+        assert (best.rotors, best.ringstellung, best.positions) == (
+            ("II", "IV", "III"),
+            "ACF",
+            "KDQ",
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
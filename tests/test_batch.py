@@ -0,0 +1,70 @@
+import random
+import sys
+import pytest
+
+from python_enigma import enigma
+
+np = pytest.importorskip("numpy")
+from python_enigma import batch  # noqa: E402
+
+ROTORS = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII"]
+MESSAGE = "Hello, World! The quick brown fox jumps over the lazy dog. " * 20
+
+
+def random_keys(count: int, seed: int = 1) -> list[batch.Key]:
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    keys = []
+    for k in range(count):
+        letters = rng.sample(alphabet, 20)
+        stecker = " ".join(letters[i] + letters[i + 1] for i in range(0, 20, 2))
+        if k % 4 == 3:
+            rotors = (rng.choice(["Beta", "Gamma"]),) + tuple(rng.sample(ROTORS, 3))
+            reflector = rng.choice(["Reflector B Thin", "Reflector C Thin"])
+        else:
+            rotors = tuple(rng.sample(ROTORS, 3))
+            reflector = rng.choice(["Reflector B", "Reflector C"])
+        keys.append(
+            batch.Key(
+                rotors=rotors,
+                ringstellung="".join(rng.choices(alphabet, k=len(rotors))),
+                positions="".join(rng.choices(alphabet, k=len(rotors))),
+                stecker=stecker if k % 2 else None,
+                reflector=reflector,
+            )
+        )
+    return keys
+
+
+class TestKeyBatch:
+    def test_matches_machines(self) -> None:
+        keys = random_keys(40)
+        results = batch.encipher(MESSAGE, keys)
+        for key, result in zip(keys, results):
+            assert result == key.machine().parse_bytes(MESSAGE.encode("ascii"))
+
+    def test_small_blocks(self) -> None:
+        keys = random_keys(10, seed=2)
+        assert batch.encipher(MESSAGE, keys, block=1) == batch.encipher(MESSAGE, keys)
+
+    def test_step_positions(self) -> None:
+        keys = [key for key in random_keys(20, seed=3) if len(key.rotors) == 3]
+        positions = batch.KeyBatch(keys).step_positions(2000)
+        for key, row in zip(keys, positions):
+            schedule = key.machine().wheel_pack.schedule(2000)
+            assert row.ravel().tolist() == schedule.tolist()
+
+    def test_bad_keys(self) -> None:
+        key = batch.Key(("I", "II", "III"), "AAA", "AAA")
+        with pytest.raises(ValueError):
+            batch.KeyBatch([key, key._replace(rotors=("I", "II"))])
+        with pytest.raises(ValueError):
+            batch.KeyBatch([key._replace(positions="A1A")])
+        with pytest.raises(enigma.ReflectorNotFound):
+            batch.KeyBatch([key._replace(reflector="Nope")])
+        with pytest.raises(enigma.RotorNotFound):
+            batch.KeyBatch([key._replace(rotors=("I", "II", "Nope"))])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
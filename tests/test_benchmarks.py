@@ -0,0 +1,86 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks import bench
+
+
+class TestCompare:
+    BASELINE = {
+        "parse_large": {
+            "unit": "chars",
+            "size": 1000,
+            "rate": 1000.0,
+            "relative": 1.0,
+            "allocated_per_unit": 30.0,
+        },
+        "m4_step": {
+            "unit": "steps",
+            "size": 1000,
+            "rate": 1000.0,
+            "relative": 10.0,
+            "allocated_per_unit": 0.0,
+        },
+    }
+
+    def test_within_threshold(self) -> None:
+        results = {
+            "parse_large": bench.Result("chars", 1000, 800.0, 0.8, 36.0),
+            "m4_step": bench.Result("steps", 1000, 1200.0, 12.0, 0.5),
+            "construction": bench.Result("machines", 10, 1.0, 0.1, 1e6),  # Not in it.
+        }
+        assert bench.compare(results, self.BASELINE, 0.25) == []
+
+    def test_regressions(self) -> None:
+        results = {
+            "parse_large": bench.Result("chars", 1000, 700.0, 0.7, 40.0),
+            "m4_step": bench.Result("steps", 1000, 1000.0, 10.0, 2.0),
+        }
+        failures = bench.compare(results, self.BASELINE, 0.25)
+        assert len(failures) == 3
+        assert failures[0].startswith("parse_large: 0.7 chars per calibration")
+
+    def test_slower_computer(self) -> None:
+        """Half the rate against a calibration loop that ran at half speed
+        too is no regression."""
+        results = {"parse_large": bench.Result("chars", 1000, 500.0, 1.0, 30.0)}
+        assert bench.compare(results, self.BASELINE, 0.25) == []
+
+    def test_memory_needs_same_size(self) -> None:
+        results = {"parse_large": bench.Result("chars", 50, 1000.0, 1.0, 600.0)}
+        assert bench.compare(results, self.BASELINE, 0.25) == []
+
+
+class TestAllocated:
+    def test_counts_what_is_held(self) -> None:
+        assert bench.allocated(lambda: bytearray(100_000)) >= 100_000
+
+    def test_ignores_what_is_freed(self) -> None:
+        def churn() -> None:
+            for _ in range(100):
+                bytearray(100_000)
+
+        assert bench.allocated(churn) < 10_000
+
+
+class TestMain:
+    def test_save_and_compare(self, tmp_path: Path) -> None:
+        baseline = tmp_path / "baseline.json"
+        args = ["--quick", "--repeat", "1", "--only", "m4_step", "operator_format"]
+        assert bench.main(args + ["--save", "--baseline", str(baseline)]) == 0
+        saved = json.loads(baseline.read_text())["benchmarks"]
+        assert sorted(saved) == ["m4_step", "operator_format"]
+
+        saved["m4_step"]["relative"] *= 1000  # Make the current run look slow.
+        baseline.write_text(json.dumps({"benchmarks": saved}))
+        assert bench.main(args + ["--baseline", str(baseline)]) == 1
+
+    def test_committed_baseline(self) -> None:
+        baseline = json.loads(bench.BASELINE.read_text())["benchmarks"]
+        assert sorted(baseline) == sorted(b.name for b in bench.BENCHMARKS)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
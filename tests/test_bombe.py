@@ -0,0 +1,82 @@
+import sys
+import pytest
+
+from python_enigma import bombe, enigma
+
+PLAINTEXT = "WETTERVORHERSAGEBISKAYAXXREGENSCHAUERXXWINDAUSWEST"
+ROTORS = [("II", "A"), ("I", "A"), ("III", "A")]
+STECKER = "AQ BJ CX DE"
+
+
+def encipher(start: str = "KDQ") -> str:
+    machine = enigma.Enigma(
+        rotors=ROTORS, reflector="Reflector B", stecker=STECKER, word_length=4
+    )
+    machine.set_wheels(start)
+    return machine.parse(PLAINTEXT)
+
+
+class TestMenu:
+    def test_self_encipherment(self) -> None:
+        ciphertext = encipher()
+        with pytest.raises(ValueError):
+            bombe.build_menu(ciphertext, ciphertext[:4])
+        with pytest.raises(ValueError):
+            bombe.build_menu(ciphertext, PLAINTEXT, offset=1)
+
+    def test_loops(self) -> None:
+        assert bombe.menu_loops(bombe.build_menu("BCA", "ABC")) == 1
+        assert bombe.menu_loops(bombe.build_menu("BC", "AB")) == 0
+
+
+class TestSearch:
+    def test_finds_key(self) -> None:
+        ciphertext = encipher()
+        stops = bombe.search(
+            ciphertext,
+            PLAINTEXT[10:40],
+            offset=10,
+            orders=[("I", "II", "III"), ("II", "I", "III")],
+            workers=2,
+        )
+        assert [(s.rotors, s.positions) for s in stops] == [(("II", "I", "III"), "KDQ")]
+
+        machine = enigma.Enigma(
+            rotors=ROTORS,
+            reflector="Reflector B",
+            stecker=stops[0].stecker_setting(),
+            word_length=4,
+        )
+        machine.set_wheels("KDQ")
+        assert machine.parse(ciphertext).replace(" ", "") == PLAINTEXT
+
+
+class TestCribDragging:
+    def test_matches_naive(self) -> None:
+        ciphertext = encipher() * 3
+        cribs = ["WETTER", "KEINEBESONDERENEREIGNISSE", "X", "E" * 200]
+        letters = ciphertext.replace(" ", "")
+        found = bombe.drag_cribs(ciphertext, cribs)
+        for crib in cribs:
+            expected = [
+                i
+                for i in range(len(letters) - len(crib) + 1)
+                if all(a != b for a, b in zip(crib, letters[i:]))
+            ]
+            assert found[crib] == expected
+
+        offsets = bombe.crib_offsets(ciphertext, PLAINTEXT)
+        assert offsets == bombe.drag_cribs(ciphertext, [PLAINTEXT])[PLAINTEXT]
+        assert 0 in offsets
+        for offset in offsets:
+            bombe.build_menu(ciphertext, PLAINTEXT, offset)
+
+    def test_keys(self) -> None:
+        ciphertext = encipher()
+        found = bombe.drag_cribs(ciphertext, ["Wetter", "WETTER", "wet ter.", "X"])
+        assert list(found) == ["WETTER", "X"]
+        assert found["WETTER"] == bombe.crib_offsets(ciphertext, "we-tter")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
@@ -0,0 +1,146 @@
+import sys
+from pathlib import Path
+import pytest
+
+from python_enigma import cli, enigma
+
+SETTINGS = [
+    "--rotors",
+    "I,II,III",
+    "--rings",
+    "ABC",
+    "--reflector",
+    "Reflector B",
+    "--stecker",
+    "AQ BJ",
+    "--start",
+    "ABC",
+]
+MESSAGE = "Hello world, this is a test (of the CLI)? Yes.\n" * 500
+
+
+def expected(operator: bool) -> str:
+    machine = enigma.Enigma(
+        stecker="AQ BJ",
+        rotors=[("I", "A"), ("II", "B"), ("III", "C")],
+        reflector="Reflector B",
+        operator=operator,
+    )
+    machine.set_wheels("ABC")
+    return machine.parse(MESSAGE)
+
+
+class TestCli:
+    @pytest.mark.parametrize("jobs", ["1", "3"])
+    @pytest.mark.parametrize("operator", [True, False])
+    def test_single_file(self, tmp_path: Path, jobs: str, operator: bool) -> None:
+        source = tmp_path / "message.txt"
+        source.write_text(MESSAGE)
+        output = tmp_path / "message.out"
+        options = [] if operator else ["--no-operator"]
+
+        args = SETTINGS + options + ["--jobs", jobs, "--chunk-size", "1000"]
+        assert cli.main(args + [str(source), "-o", str(output)]) == 0
+        assert output.read_text() == expected(operator)
+
+    def test_many_files(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        sources = [tmp_path / f"message{i}.txt" for i in range(3)]
+        for source in sources:
+            source.write_text(MESSAGE)
+
+        args = SETTINGS + ["--jobs", "2", "--stats"] + [str(s) for s in sources]
+        assert cli.main(args) == 0
+        for source in sources:
+            assert Path(str(source) + ".enigma").read_text() == expected(True)
+        assert "bytes/s" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("chunk_size", ["7", "64", "100000"])
+    def test_pieces(self, tmp_path: Path, chunk_size: str) -> None:
+        message = "Grüße aus Köln, um 12:00 Uhr. Ende? ß€ " * 40
+        source = tmp_path / "message.txt"
+        source.write_text(message, encoding="utf-8")
+        output = tmp_path / "message.out"
+
+        args = SETTINGS + ["--jobs", "3", "--chunk-size", chunk_size]
+        assert cli.main(args + [str(source), "-o", str(output)]) == 0
+        machine = enigma.Enigma(
+            stecker="AQ BJ",
+            rotors=[("I", "A"), ("II", "B"), ("III", "C")],
+            reflector="Reflector B",
+        )
+        machine.set_wheels("ABC")
+        assert output.read_text() == machine.parse(message)
+
+    @pytest.mark.parametrize("operator", [True, False])
+    def test_empty_file(self, tmp_path: Path, operator: bool) -> None:
+        source = tmp_path / "empty.txt"
+        source.write_text("")
+        output = tmp_path / "empty.out"
+        options = [] if operator else ["--no-operator"]
+
+        args = SETTINGS + options + ["--jobs", "2", str(source), "-o", str(output)]
+        assert cli.main(args) == 0
+        assert output.read_text() == ""
+
+    @pytest.mark.parametrize(
+        "option, value, complaint",
+        [
+            ("--rings", "AB", "--rings"),
+            ("--rings", "1BC", "--rings"),
+            ("--rings", "A-C", "--rings"),
+            ("--rotors", "I,II,XX", "no rotor XX"),
+            ("--reflector", "Reflector Q", "no reflector Reflector Q"),
+            ("--start", "ABCD", "--start"),
+            ("--start", "A1C", "--start"),
+            ("--stecker", "AB A", "--stecker"),
+            ("--stecker", "A1", "--stecker"),
+        ],
+    )
+    def test_bad_settings(
+        self,
+        capsys: pytest.CaptureFixture[str],
+        option: str,
+        value: str,
+        complaint: str,
+    ) -> None:
+        with pytest.raises(SystemExit) as exit:
+            cli.main([option, value])
+        assert exit.value.code == 2
+        error = capsys.readouterr().err
+        assert complaint in error
+        assert "Traceback" not in error
+
+    def test_output_with_many_files(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        sources = [str(tmp_path / f"message{i}.txt") for i in range(2)]
+        with pytest.raises(SystemExit) as exit:
+            cli.main(SETTINGS + sources + ["-o", str(tmp_path / "out")])
+        assert exit.value.code == 2
+        error = capsys.readouterr().err
+        assert error.startswith("usage: enigma")
+        assert "--output can only be used with a single input" in error
+
+    @pytest.mark.parametrize("option", ["--word-length", "--chunk-size", "--jobs"])
+    @pytest.mark.parametrize("value", ["0", "-3", "two"])
+    def test_bad_counts(
+        self,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture[str],
+        option: str,
+        value: str,
+    ) -> None:
+        source = tmp_path / "message.txt"
+        source.write_text(MESSAGE)
+        with pytest.raises(SystemExit) as exit:
+            cli.main(SETTINGS + ["--jobs", "2", option, value, str(source)])
+        assert exit.value.code == 2
+        error = capsys.readouterr().err
+        assert f"{option}: " in error
+        assert "Traceback" not in error
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
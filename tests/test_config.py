@@ -0,0 +1,102 @@
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from python_enigma import enigma
+from python_enigma.config import Cursor, MachineConfig
+
+M3: dict[str, Any] = {
+    "stecker": "AQ BJ",
+    "rotors": (("I", "A"), ("II", "B"), ("III", "C")),
+    "reflector": "Reflector B",
+}
+M4: dict[str, Any] = {
+    "stecker": "AE BF CM DQ HU JN LX PR SZ VW",
+    "rotors": (("Beta", "E"), ("V", "P"), ("VI", "E"), ("VIII", "L")),
+    "reflector": "Reflector C Thin",
+}
+TEXT = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 30
+
+
+def machine_output(settings: dict[str, Any], positions: str, text: str) -> str:
+    machine = enigma.Enigma(operator=False, **settings)
+    machine.set_wheels(positions)
+    return machine.encipher(text)
+
+
+class TestMachineConfig:
+    def test_equal_and_hashable(self) -> None:
+        first = MachineConfig(**M3)
+        second = MachineConfig(**(M3 | {"stecker": "JB QA"}))
+        assert first == second
+        assert hash(first) == hash(second)
+        assert len({first, second, MachineConfig(**M4)}) == 2
+
+    def test_immutable(self) -> None:
+        config = MachineConfig(**M3)
+        with pytest.raises(AttributeError):
+            config.stecker = None  # type: ignore[misc]
+        with pytest.raises(AttributeError):
+            del config.entry
+
+    def test_from_machine(self) -> None:
+        machine = enigma.Enigma(operator=False, **M3)
+        assert machine.config() == MachineConfig(**M3)
+
+    def test_pickle(self) -> None:
+        config = MachineConfig(**M4)
+        assert pickle.loads(pickle.dumps(config)) == config
+
+
+class TestCursor:
+    @pytest.mark.parametrize("settings, positions", [(M3, "ABC"), (M4, "CDSZ")])
+    def test_matches_enigma(self, settings: dict[str, Any], positions: str) -> None:
+        cursor = MachineConfig(**settings).cursor(positions)
+        text = "HELLO WORLD " + TEXT
+        assert cursor.encipher(text) == machine_output(settings, positions, text)
+        assert cursor.offset == len(text.replace(" ", ""))
+
+    def test_offset(self) -> None:
+        config = MachineConfig(**M4)
+        whole = config.cursor("CDSZ").encipher(TEXT)
+        cursor = config.cursor("CDSZ", offset=500)
+        assert cursor.encipher(TEXT[500:]) == whole[500:]
+
+    def test_split_messages(self) -> None:
+        cursor = MachineConfig(**M3).cursor("ZZZ")
+        other = cursor.copy()
+        first = cursor.encipher(TEXT[:100])
+        assert first + cursor.encipher(TEXT[100:]) == other.encipher(TEXT)
+        assert cursor.positions == other.positions
+
+    def test_reset(self) -> None:
+        cursor = MachineConfig(**M3).cursor("ABC")
+        once = cursor.encipher(TEXT)
+        cursor.reset()
+        assert cursor.offset == 0
+        assert cursor.positions == "ABC"
+        assert cursor.encipher(TEXT) == once
+
+    def test_bad_positions(self) -> None:
+        config = MachineConfig(**M3)
+        with pytest.raises(ValueError):
+            Cursor(config, "AB")
+        with pytest.raises(ValueError):
+            config.cursor("A1C")
+
+    def test_threads(self) -> None:
+        config = MachineConfig(**M4)
+        starts = ["CDSZ", "AAAA", "ZZZZ", "MNOP"] * 4
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(
+                pool.map(lambda start: config.cursor(start).encipher(TEXT), starts)
+            )
+        for start, result in zip(starts, results):
+            assert result == machine_output(M4, start, TEXT)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
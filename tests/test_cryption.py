@@ -1,10 +1,16 @@
+import copy
+import io
+import pickle
 import sys
+from pathlib import Path
 from collections import Counter
+from contextlib import nullcontext
 from collections.abc import Mapping, Sequence
 from typing import Any
 import pytest
 
 from python_enigma import enigma
+from python_enigma.types import RotorSpec
 
 
 class TestEncrypt:
@@ -217,6 +223,14 @@ class TestDefault:
     def test_ignore_static_wheels(self) -> None:
         self.default_test("ignore_static_wheels")
 
+    def test_resolve_catalog(self) -> None:
+        default = enigma.Catalog.default()
+        copy = enigma.Catalog(default.data.copy())
+        assert enigma.resolve_catalog("default") is default
+        assert enigma.resolve_catalog(copy) is copy
+        with pytest.raises(ValueError):
+            enigma.resolve_catalog("military")
+
 
 class TestMutation:
     def test_rotor_mutation(self) -> None:
@@ -263,5 +277,560 @@ class TestMutation:
         assert ctext1 == ctext2
 
 
+def map_faces(rotor: enigma.Rotor) -> tuple[dict[int, int], dict[int, int]]:
+    """Are you ready for bad entry pinning mapping?"""
+
+    pos = rotor.position + 1  # We need a pin number, rather than an index
+    neutral_to_pins: dict[int, int] = dict()
+    pins_to_neutral: dict[int, int] = dict()
+
+    for i in range(1, 27):
+        if pos > 26:
+            pos -= 26
+        neutral_to_pins[i] = pos
+        pins_to_neutral[pos] = i  # This is probably not right...
+        pos += 1
+
+    return neutral_to_pins, pins_to_neutral
+
+
+def reference_process(mechanism: enigma.RotorMechanism, bit_in: int) -> int:
+    """The original map_faces signal path, kept to check the compiled one."""
+    mechanism.rotors[0].step_me = True
+    for indexer, rotor in enumerate(mechanism.rotors):
+        if rotor.position in rotor.notch and rotor.step_me:
+            if indexer + 1 < len(mechanism.rotors):
+                mechanism.rotors[indexer + 1].step_me = True
+    for rotor in mechanism.rotors:
+        if not rotor.static and rotor.step_me:
+            rotor.step_me = False
+            rotor.position = (rotor.position + 1) % 26
+
+    next_bit = bit_in
+    for rotor in mechanism.rotors:
+        entry_face, exit_face = map_faces(rotor)
+        next_bit = exit_face[rotor.wiring[entry_face[next_bit]]]
+    next_bit = mechanism.reflector.wiring[next_bit]
+    for rotor in reversed(mechanism.rotors):
+        entry_face, exit_face = map_faces(rotor)
+        next_bit = exit_face[rotor.wiring_back[entry_face[next_bit]]]
+    return next_bit
+
+
+class TestCompiledTables:
+    CONFIGS: Sequence[tuple[list[tuple[str, str]], str, str]] = [
+        ([("I", "A"), ("II", "B"), ("III", "C")], "Reflector B", "ADU"),
+        ([("VI", "Q"), ("VII", "E"), ("VIII", "Z")], "Reflector C", "ZZY"),
+        (
+            [("Beta", "E"), ("V", "P"), ("VI", "E"), ("VIII", "L")],
+            "Reflector C Thin",
+            "CDSZ",
+        ),
+    ]
+
+    @pytest.mark.parametrize("rotors,reflector,start", CONFIGS)
+    def test_matches_reference(
+        self, rotors: list[tuple[str, str]], reflector: str, start: str
+    ) -> None:
+        compiled = enigma.Enigma(rotors=rotors, reflector=reflector)
+        reference = enigma.Enigma(rotors=rotors, reflector=reflector)
+        compiled.set_wheels(start)
+        reference.set_wheels(start)
+
+        for i in range(2000):
+            bit_in = i * 7 % 26 + 1
+            expected = reference_process(reference.wheel_pack, bit_in)
+            assert compiled.wheel_pack.process(bit_in) == expected
+            assert [r.position for r in compiled.wheel_pack.rotors] == [
+                r.position for r in reference.wheel_pack.rotors
+            ]
+
+
+class TestSchedule:
+    @pytest.mark.parametrize("rotors,reflector,start", TestCompiledTables.CONFIGS)
+    def test_matches_stepping(
+        self, rotors: list[tuple[str, str]], reflector: str, start: str
+    ) -> None:
+        machine = enigma.Enigma(rotors=rotors, reflector=reflector)
+        machine.set_wheels(start)
+        pack = machine.wheel_pack
+        before = [(r.position, r.step_me) for r in pack.rotors]
+
+        schedule = pack.schedule(20000)
+        assert len(schedule) == 20000 * len(pack.rotors)
+        assert [(r.position, r.step_me) for r in pack.rotors] == before
+
+        for k in range(20000):
+            pack.step()
+            row = schedule[k * len(pack.rotors) : (k + 1) * len(pack.rotors)]
+            assert list(row) == [r.position for r in pack.rotors]
+
+    def test_advance(self) -> None:
+        stepped = enigma.Enigma(rotors=TestCompiledTables.CONFIGS[2][0])
+        scheduled = enigma.Enigma(rotors=TestCompiledTables.CONFIGS[2][0])
+        for _ in range(700):
+            stepped.wheel_pack.step()
+        scheduled.wheel_pack.schedule(700, advance=True)
+        assert [(r.position, r.step_me) for r in scheduled.wheel_pack.rotors] == [
+            (r.position, r.step_me) for r in stepped.wheel_pack.rotors
+        ]
+
+    @pytest.mark.parametrize("rotors,reflector,start", TestCompiledTables.CONFIGS)
+    def test_scrambler(
+        self, rotors: list[tuple[str, str]], reflector: str, start: str
+    ) -> None:
+        machine = enigma.Enigma(rotors=rotors, reflector=reflector, operator=False)
+        pack = machine.wheel_pack
+        entry, lamps = machine.signal_tables()
+        machine.set_wheels(start)
+        positions = [r.position for r in pack.rotors]
+        flags = [r.step_me for r in pack.rotors]
+        pack.advance(positions, flags)
+        scrambler = pack.scrambler(positions)
+        assert sorted(scrambler) == list(range(26))
+
+        for letter in range(26):
+            machine.set_wheels(start)
+            expected = machine.parse(chr(65 + letter))
+            assert chr(lamps[scrambler[entry[letter]]]) == expected
+            assert pack.trace(positions, entry[letter]) == scrambler[entry[letter]]
+
+
+class TestSeek:
+    @staticmethod
+    def notched_static_catalog() -> enigma.Catalog:
+        """A catalog with a static wheel that has notches, to exercise the
+        flag a static wheel leaves raised."""
+        catalog = enigma.Catalog(enigma.Catalog.default().data.copy())
+        catalog["Delta"] = RotorSpec(
+            name="Delta",
+            wiring=catalog["Beta"]["wiring"],
+            notch="DQ",
+            static=True,
+        )
+        return catalog
+
+    @pytest.mark.parametrize(
+        "rotors",
+        [config[0] for config in TestCompiledTables.CONFIGS]
+        + [
+            [("I", "A"), ("Delta", "A"), ("II", "A"), ("III", "A")],
+            [("Delta", "A"), ("II", "A"), ("III", "A")],
+            [("II", "A"), ("III", "A"), ("Delta", "A")],
+        ],
+    )
+    @pytest.mark.parametrize("start", ["AAAA", "QDEV", "ZZZZ"])
+    def test_matches_schedule(self, rotors: list[tuple[str, str]], start: str) -> None:
+        catalog = self.notched_static_catalog()
+        sought = enigma.Enigma(catalog=catalog, rotors=rotors)
+        stepped = enigma.Enigma(catalog=catalog, rotors=rotors)
+        for count in [0, 1, 25, 26, 27, 675, 676, 677, 17575, 17577, 31337]:
+            sought.set_wheels(start[: len(rotors)])
+            stepped.set_wheels(start[: len(rotors)])
+            sought.seek(count)
+            stepped.wheel_pack.schedule(count, advance=True)
+            assert [(r.position, r.step_me) for r in sought.wheel_pack.rotors] == [
+                (r.position, r.step_me) for r in stepped.wheel_pack.rotors
+            ]
+
+    def test_slice(self) -> None:
+        machine = enigma.Enigma(operator=False)
+        machine.set_wheels("QEV")
+        ctext = machine.parse("A" * 5000)
+
+        machine.set_wheels("QEV")
+        machine.seek(4321)
+        assert machine.parse("A" * 100) == ctext[4321:4421]
+
+
+class TestSnapshot:
+    def test_rewind(self) -> None:
+        rotors = TestCompiledTables.CONFIGS[2][0]
+        machine = enigma.Enigma(rotors=rotors, stecker="AQ BJ", operator=False)
+        machine.set_wheels("QDEV")
+        machine.parse("A" * 1000)  # Far enough to raise the greek wheel's flag.
+        state = machine.snapshot()
+        expected = machine.parse("HELLO WORLD " * 50)
+
+        machine.set_stecker("CX")
+        machine.parse("A" * 123)
+        machine.restore(state)
+        assert machine.parse("HELLO WORLD " * 50) == expected
+
+    def test_pickle_and_transfer(self) -> None:
+        source = enigma.Enigma(stecker="AQ BJ", operator=False)
+        source.set_wheels("ABC")
+        source.parse("A" * 77)
+        state = pickle.loads(pickle.dumps(source.snapshot()))
+
+        target = enigma.Enigma(operator=False)
+        target.restore(state)
+        assert target.parse("A" * 200) == source.parse("A" * 200)
+        assert target.snapshot()[:2] == source.snapshot()[:2]
+
+    def test_wrong_width(self) -> None:
+        machine = enigma.Enigma(operator=False)
+        with pytest.raises(ValueError):
+            machine.restore(
+                enigma.MachineState((0, 0), (False, False), machine.stecker)
+            )
+
+
+class TestParallel:
+    @pytest.mark.parametrize("operator", [True, False])
+    def test_matches_serial(self, operator: bool) -> None:
+        message = "Enigma, the machine; 1939 (or so)? " * 300
+        rotors = TestCompiledTables.CONFIGS[2][0]
+        serial = enigma.Enigma(rotors=rotors, operator=operator)
+        parallel = enigma.Enigma(rotors=rotors, operator=operator)
+        serial.set_wheels("QDEV")
+        parallel.set_wheels("QDEV")
+
+        expected = serial.parse(message)
+        assert parallel.parse_parallel(message, workers=3) == expected
+        assert [(r.position, r.step_me) for r in parallel.wheel_pack.rotors] == [
+            (r.position, r.step_me) for r in serial.wheel_pack.rotors
+        ]
+
+    @pytest.mark.parametrize("message", ["", "1234 5"])
+    def test_empty(self, message: str) -> None:
+        machine = enigma.Enigma()
+        assert machine.parse_parallel(message, workers=2) == ""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_pool_map(self, workers: int) -> None:
+        jobs = [(n, 7) for n in range(20)]
+        assert enigma.pool_map(divmod, jobs, workers) == [
+            divmod(n, 7) for n in range(20)
+        ]
+        assert enigma.pool_map(divmod, [], workers) == []
+
+
+class TestCompiledKey:
+    @pytest.mark.parametrize("rotors,reflector,start", TestCompiledTables.CONFIGS)
+    def test_matches_parse(
+        self, rotors: list[tuple[str, str]], reflector: str, start: str
+    ) -> None:
+        machine = enigma.Enigma(
+            rotors=rotors, reflector=reflector, stator="civilian", stecker="AE BF CM"
+        )
+        machine.set_wheels(start)
+        key = machine.compile()
+        assert len(key.table) == 26 * len(key)
+
+        message = machine.prepare("The quick brown fox jumps over the lazy dog. " * 3)
+        letters = sum(c.isalpha() for c in message)
+        for offset in [0, 5, len(key) - 7]:
+            machine.set_wheels(start)
+            machine.seek(offset)
+            expected = machine.encipher(message)
+            assert key.encipher(message, offset) == expected
+
+        # Wrapping around the end of the table.
+        machine.set_wheels(start)
+        machine.seek(len(key) * 2 - letters // 2)
+        assert key.encipher(message, len(key) * 2 - letters // 2) == (
+            machine.encipher(message)
+        )
+
+
+class TestRotorCache:
+    def test_shared_tables(self) -> None:
+        first = enigma.Enigma(rotors=[("I", "A"), ("II", "B"), ("III", "C")])
+        second = enigma.Enigma(rotors=[("I", "A"), ("II", "B"), ("III", "C")])
+        for a, b in zip(first.wheel_pack.rotors, second.wheel_pack.rotors):
+            assert a.tables is b.tables
+            assert a is not b
+
+    def test_counters_and_eviction(self) -> None:
+        catalog = enigma.Catalog.default()
+        cache = enigma.RotorCache(maxsize=2)
+        first = cache.get(catalog, "I", 1, False)
+        assert cache.get(catalog, "I", 1, False) is first
+        cache.get(catalog, "II", 1, False)
+        cache.get(catalog, "III", 1, False)  # Evicts rotor I
+        assert cache.info() == enigma.CacheInfo(1, 3, 2, 2)
+
+        assert cache.get(catalog, "I", 1, False) is not first
+        assert cache.info().misses == 4
+
+    def test_catalog_identity(self) -> None:
+        cache = enigma.RotorCache()
+        default = enigma.Catalog.default()
+        copy = enigma.Catalog(default.data.copy())
+        cache.get(default, "I", 1, False)
+        cache.get(copy, "I", 1, False)
+        assert cache.info().misses == 2
+
+        with pytest.raises(enigma.RotorNotFound):
+            cache.get(default, "No such rotor", 1, False)
+
+    def test_catalog_changed(self) -> None:
+        catalog = enigma.Catalog(enigma.Catalog.default().data.copy())
+        before = enigma.Enigma(catalog=catalog).parse("HELLO")
+        catalog["I"] = catalog["IV"]
+        fresh = enigma.Catalog(catalog.data.copy())
+        after = enigma.Enigma(catalog=catalog).parse("HELLO")
+        assert after != before
+        assert after == enigma.Enigma(catalog=fresh).parse("HELLO")
+
+        del catalog["II"]
+        with pytest.raises(enigma.RotorNotFound):
+            enigma.Enigma(catalog=catalog)
+
+
+class TestLRUCache:
+    def test_sizeof(self) -> None:
+        cache: enigma.LRUCache[str, str] = enigma.LRUCache(10, len)
+        assert cache.lookup("a", lambda: "aaaa") == "aaaa"
+        cache.lookup("b", lambda: "bbbb")
+        assert cache.lookup("a", lambda: "new") == "aaaa"  # a is now newest.
+        cache.lookup("c", lambda: "cccc")  # Evicts b.
+        assert cache.info() == enigma.CacheInfo(1, 3, 10, 8)
+        assert cache.lookup("d", lambda: "d" * 11) == "d" * 11  # Too big to keep.
+        assert len(cache) == 2
+
+    def test_usable(self) -> None:
+        cache: enigma.LRUCache[str, str] = enigma.LRUCache(10, len)
+        cache.lookup("a", lambda: "a")
+        assert cache.lookup("a", lambda: "aaa", lambda value: len(value) > 2) == "aaa"
+        assert cache.info() == enigma.CacheInfo(0, 2, 10, 3)
+
+        cache.clear()
+        assert cache.info() == enigma.CacheInfo(0, 0, 10, 0)
+
+
+class TestCatalogFormats:
+    RESOURCES = Path(enigma.__file__).parent / "resources"
+
+    @staticmethod
+    def normalized(catalog: enigma.Catalog) -> dict[str, Any]:
+        return {
+            k: {**v, "notch": "".join(sorted(v["notch"]))} for k, v in catalog.items()
+        }
+
+    def test_formats_agree(self, tmp_path: Path) -> None:
+        from_json = enigma.Catalog.from_json(self.RESOURCES / "catalogue.json")
+        from_csv = enigma.Catalog.from_csv(self.RESOURCES / "table_rotors.csv")
+        shipped = enigma.Catalog.from_binary(self.RESOURCES / "catalogue.bin")
+        assert from_csv.data == from_json.data
+        assert self.normalized(shipped) == self.normalized(from_json)
+        assert self.normalized(enigma.Catalog.default()) == self.normalized(from_json)
+
+        from_csv.to_binary(tmp_path / "catalogue.bin")
+        written = enigma.Catalog.from_binary(tmp_path / "catalogue.bin")
+        assert self.normalized(written) == self.normalized(from_json)
+
+    def test_binary_wiring(self) -> None:
+        shipped = enigma.Catalog.from_binary(self.RESOURCES / "catalogue.bin")
+        from_json = enigma.Catalog.from_json(self.RESOURCES / "catalogue.json")
+        assert set(shipped.wirings) == set(shipped)
+        assert not from_json.wirings
+        for name in ["I", "VIII", "Beta", "Reflector B"]:
+            for ring in [1, 7, 26]:
+                compiled = enigma.compile_rotor(shipped, name, ring, False)
+                parsed = enigma.compile_rotor(from_json, name, ring, False)
+                assert compiled.forward_table == parsed.forward_table
+                assert compiled.backward_table == parsed.backward_table
+
+        shipped["I"] = from_json["II"]
+        assert "I" not in shipped.wirings
+        replaced = enigma.compile_rotor(shipped, "I", 1, False)
+        assert (
+            replaced.forward_table
+            == enigma.compile_rotor(from_json, "II", 1, False).forward_table
+        )
+
+    def test_default_read_only(self) -> None:
+        default = enigma.Catalog.default()
+        with pytest.raises(TypeError):
+            default["I"] = default["IV"]
+        with pytest.raises(TypeError):
+            del default["I"]
+        assert enigma.Catalog.default()["I"] != default["IV"]
+
+    def test_copy(self) -> None:
+        shipped = enigma.Catalog.from_binary(self.RESOURCES / "catalogue.bin")
+        for other in [shipped.copy(), copy.copy(shipped)]:
+            assert other.data == shipped.data
+            assert other.wirings == shipped.wirings
+            other["I"] = shipped["II"]
+            assert "I" in shipped.wirings
+            assert shipped["I"] != other["I"]
+
+        changed = enigma.Catalog.default().copy()
+        changed["I"] = changed["IV"]
+        assert not changed.readonly
+
+    def test_not_binary(self) -> None:
+        with pytest.raises(ValueError):
+            enigma.Catalog.from_buffer(b"")
+        with pytest.raises(ValueError):
+            enigma.Catalog.from_buffer(b"{ This is JSON }")
+
+    def test_truncated_binary(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        truncated = tmp_path / "catalogue.bin"
+        header = enigma.Catalog.BINARY_HEADER
+        truncated.write_bytes(header.pack(enigma.Catalog.BINARY_MAGIC, 5) + b"x" * 10)
+        with pytest.raises(ValueError):
+            enigma.Catalog.from_binary(truncated)
+
+        # Catalog.default falls back to the JSON catalogue.
+        real_path = enigma.Catalog.resource_path
+        monkeypatch.setattr(
+            enigma.Catalog,
+            "resource_path",
+            staticmethod(
+                lambda name: (
+                    nullcontext(truncated)
+                    if name == enigma.Catalog.BINARY_FILE_NAME
+                    else real_path(name)
+                )
+            ),
+        )
+        monkeypatch.setattr(enigma.Catalog, "default_data", None)
+        monkeypatch.setattr(enigma.Catalog, "default_catalog", None)
+        from_json = enigma.Catalog.from_json(self.RESOURCES / "catalogue.json")
+        assert enigma.Catalog.default().data == from_json.data
+
+
+class TestStreaming:
+    MESSAGE = "Wetterbericht: Regen, später (vielleicht) Schnee? Ja. " * 50
+
+    @pytest.mark.parametrize("operator", [True, False])
+    @pytest.mark.parametrize("size", [1, 3, 5, 7, 64, 10000])
+    def test_chunks_match_parse(self, operator: bool, size: int) -> None:
+        whole = enigma.Enigma(rotors=TestCompiledTables.CONFIGS[2][0], operator=operator)
+        pieces = enigma.Enigma(rotors=TestCompiledTables.CONFIGS[2][0], operator=operator)
+        chunks = [
+            self.MESSAGE[i : i + size] for i in range(0, len(self.MESSAGE), size)
+        ]
+        assert "".join(pieces.iter_parse(chunks)) == whole.parse(self.MESSAGE)
+
+    def test_stream(self) -> None:
+        whole = enigma.Enigma(word_length=4)
+        streamed = enigma.Enigma(word_length=4)
+        writer = io.StringIO()
+        written = streamed.parse_stream(io.StringIO(self.MESSAGE), writer, 13)
+        assert writer.getvalue() == whole.parse(self.MESSAGE)
+        assert written == len(writer.getvalue())
+
+
+def reference_format(message: str, word_length: int) -> str:
+    """The original multi-pass Operator.format, kept to check the new one."""
+    message_characters = message.upper().replace(" ", "")
+    for punct, replacement in {
+        ".": "X",
+        ":": "XX",
+        ",": "ZZ",
+        "?": "FRAQ",
+        "(": "KLAM",
+        ")": "KLAM",
+        "'": "X",
+    }.items():
+        message_characters = message_characters.replace(punct, replacement)
+    for character in message_characters:
+        if character not in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+            message_characters = message_characters.replace(character, "")
+    m = message_characters
+    return " ".join(m[i : i + word_length] for i in range(0, len(m), word_length))
+
+
+class TestOperatorFormat:
+    MESSAGES = [
+        "",
+        "hello world",
+        "Straße 12, (Hof): 'hinten'? Ja.\nNein!\t\u00e9\u4e2d\U0001f600",
+        "0123456789" * 30 + "abc",
+        ".:,?()'" * 3,
+    ]
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    @pytest.mark.parametrize("word_length", [1, 4, 5])
+    def test_matches_reference(self, message: str, word_length: int) -> None:
+        operator = enigma.Operator(word_length)
+        assert operator.format(message) == reference_format(message, word_length)
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 11])
+    def test_incremental(self, size: int) -> None:
+        message = "".join(self.MESSAGES) * 3
+        formatter = enigma.Operator(5).formatter()
+        pieces = [
+            formatter.feed(message[i : i + size]) for i in range(0, len(message), size)
+        ]
+        assert "".join(pieces) == reference_format(message, 5)
+
+    def test_table_bounded(self) -> None:
+        message = "".join(chr(code) for code in range(0x4E00, 0x5E00)) + "ok."
+        size = len(enigma.OPERATOR_TABLE)
+        assert enigma.Operator(5).format(message) == reference_format(message, 5)
+        assert len(enigma.OPERATOR_TABLE) == size
+
+
+class TestBytes:
+    MESSAGE = "Attack at dawn, 0600 hours!\nHold the line. " * 20
+
+    @pytest.mark.parametrize("rotors,reflector,start", TestCompiledTables.CONFIGS)
+    def test_matches_parse(
+        self, rotors: list[tuple[str, str]], reflector: str, start: str
+    ) -> None:
+        text = enigma.Enigma(rotors=rotors, reflector=reflector, operator=False)
+        raw = enigma.Enigma(rotors=rotors, reflector=reflector, operator=False)
+        text.set_wheels(start)
+        raw.set_wheels(start)
+
+        expected = text.parse(self.MESSAGE).encode("ascii")
+        assert raw.parse_bytes(self.MESSAGE.encode("ascii")) == expected
+        assert [(r.position, r.step_me) for r in raw.wheel_pack.rotors] == [
+            (r.position, r.step_me) for r in text.wheel_pack.rotors
+        ]
+
+    def test_in_place(self) -> None:
+        machine = enigma.Enigma(operator=False)
+        machine.set_wheels("AAA")
+        expected = machine.parse(self.MESSAGE).encode("ascii")
+
+        buffer = bytearray(self.MESSAGE.encode("ascii"))
+        machine.set_wheels("AAA")
+        letters = machine.parse_into(buffer, memoryview(buffer))
+        assert buffer == expected
+        assert letters == sum(c.isalpha() for c in self.MESSAGE)
+
+        with pytest.raises(ValueError):
+            machine.parse_into(b"ABC", bytearray(2))
+
+
+class TestVectorized:
+    MESSAGE = "Attack at dawn, 0600 hours! Über alles? " * 40
+
+    @pytest.mark.parametrize("rotors,reflector,start", TestCompiledTables.CONFIGS)
+    @pytest.mark.parametrize("operator", [True, False])
+    def test_matches_serial(
+        self,
+        rotors: list[tuple[str, str]],
+        reflector: str,
+        start: str,
+        operator: bool,
+    ) -> None:
+        pytest.importorskip("numpy")
+        serial = enigma.Enigma(
+            rotors=rotors, reflector=reflector, stecker="AE BF CM", operator=operator
+        )
+        vector = enigma.Enigma(
+            rotors=rotors, reflector=reflector, stecker="AE BF CM", operator=operator
+        )
+        serial.set_wheels(start)
+        vector.set_wheels(start)
+
+        for _ in range(2):  # The second round checks the state left behind.
+            expected = serial.parse(self.MESSAGE)
+            assert vector.parse(self.MESSAGE, vectorized=True) == expected
+            assert [(r.position, r.step_me) for r in vector.wheel_pack.rotors] == [
+                (r.position, r.step_me) for r in serial.wheel_pack.rotors
+            ]
+
+
 if __name__ == "__main__":
     sys.exit(pytest.main(args=[__file__]))
@@ -0,0 +1,94 @@
+import random
+import sys
+from pathlib import Path
+import pytest
+
+from python_enigma import cycles, enigma
+
+ORDERS = [("I", "II", "III"), ("III", "I", "II")]
+
+
+def machine(positions: str, stecker: str | None = "AQ BJ CX") -> enigma.Enigma:
+    result = enigma.Enigma(
+        rotors=[("III", "A"), ("I", "A"), ("II", "A")],
+        reflector="Reflector B",
+        stecker=stecker,
+        operator=False,
+    )
+    result.set_wheels(positions)
+    return result
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory: pytest.TempPathFactory) -> cycles.CycleIndex:
+    pytest.importorskip("numpy")
+    path = tmp_path_factory.mktemp("cycles") / "index.bin"
+    return cycles.CycleIndex.build(path, orders=ORDERS, workers=1)
+
+
+class TestCharacteristic:
+    def test_partitions(self) -> None:
+        assert len(cycles.PARTITIONS) == 101
+        assert all(sum(p) == 26 for p in cycles.PARTITIONS)
+        for number in (0, 4321, cycles.CHARACTERISTICS - 1):
+            value = cycles.characteristic_of(number)
+            assert cycles.characteristic_number(value) == number
+
+    def test_stecker_independent(self) -> None:
+        assert cycles.characteristic(machine("KDQ")) == cycles.characteristic(
+            machine("KDQ", None)
+        )
+
+    def test_from_indicators(self) -> None:
+        rng = random.Random(0)
+        indicators = []
+        for _ in range(150):
+            key = "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=3))
+            indicators.append(machine("KDQ").parse(key + key))
+        expected = cycles.characteristic(machine("KDQ"))
+        assert cycles.characteristic_from_indicators(indicators) == expected
+        with pytest.raises(ValueError):
+            cycles.characteristic_from_indicators(indicators[:5])
+
+
+class TestCycleIndex:
+    @pytest.mark.parametrize("positions", ["AAA", "KDQ", "ADU", "AEV", "ZZZ"])
+    def test_lookup(self, index: cycles.CycleIndex, positions: str) -> None:
+        expected = cycles.characteristic(machine(positions))
+        assert index.lookup(("III", "I", "II"), positions) == expected
+        found = index.find(expected)
+        assert (("III", "I", "II"), positions) in found
+        assert index.count(expected) == len(found)
+
+    @pytest.mark.parametrize("positions", ["AA", "AAAA", "A1A", "A A", "AÄA", "[AA"])
+    def test_bad_positions(self, index: cycles.CycleIndex, positions: str) -> None:
+        with pytest.raises(ValueError):
+            index.lookup(ORDERS[0], positions)
+
+    def test_lower_case(self, index: cycles.CycleIndex) -> None:
+        assert index.lookup(ORDERS[0], "kdq") == index.lookup(ORDERS[0], "KDQ")
+
+    def test_reopen(self, index: cycles.CycleIndex, tmp_path: Path) -> None:
+        assert len(index) == len(ORDERS) * 26**3
+        value = index.lookup(ORDERS[0], "QEV")
+        with cycles.CycleIndex(index.path) as again:
+            assert again.orders == ORDERS
+            assert again.find(value) == index.find(value)
+
+        bad = tmp_path / "bad.bin"
+        bad.write_bytes(b"not an index at all")
+        with pytest.raises(ValueError):
+            cycles.CycleIndex(bad)
+
+    @pytest.mark.parametrize("size", [8, 12, 19, 100])
+    def test_truncated(
+        self, index: cycles.CycleIndex, tmp_path: Path, size: int
+    ) -> None:
+        truncated = tmp_path / "truncated.bin"
+        truncated.write_bytes(index.path.read_bytes()[:size])
+        with pytest.raises(ValueError, match="wrong size"):
+            cycles.CycleIndex(truncated)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+import pytest
+
+np = pytest.importorskip("numpy")
+from python_enigma import dataset  # noqa: E402
+
+CORPUS = (
+    "Die Lage an der Front ist unveraendert. Der Feind greift weiterhin mit "
+    "starken Kraeften an. Verstaerkungen werden dringend benoetigt."
+)
+
+
+class TestGenerate:
+    def test_records_decipher(self, tmp_path: Path) -> None:
+        paths = dataset.generate(tmp_path, 250, 3, seed=7, length=40, workers=1)
+        records = [r for path in paths for r in dataset.read_shard(path)]
+        assert [len(dataset.read_shard(path)) for path in paths] == [84, 83, 83]
+        assert {len(key.rotors) for key, _, _ in records} == {3, 4}
+        for key, plaintext, ciphertext in records:
+            assert len(plaintext) == 40
+            assert key.stecker is not None and len(key.stecker.split()) == 10
+            assert key.machine().parse(ciphertext) == plaintext
+
+    def test_deterministic(self, tmp_path: Path) -> None:
+        serial = dataset.generate(tmp_path / "a", 100, 4, seed=1, workers=1)
+        pooled = dataset.generate(tmp_path / "b", 100, 4, seed=1, workers=2)
+        other = dataset.generate(tmp_path / "c", 100, 4, seed=2, workers=1)
+        for a, b, c in zip(serial, pooled, other):
+            assert a.read_bytes() == b.read_bytes() != c.read_bytes()
+
+    def test_corpus_and_models(self, tmp_path: Path) -> None:
+        paths = dataset.generate(
+            tmp_path, 20, 1, length=30, models=["M4"], plugs=0, corpus=CORPUS
+        )
+        letters = CORPUS.upper().replace(" ", "").replace(".", "")
+        for key, plaintext, ciphertext in dataset.read_shard(paths[0]):
+            assert key.rotors[0] in ("Beta", "Gamma")
+            assert key.reflector.endswith("Thin")
+            assert key.stecker is None
+            assert plaintext in letters
+            assert key.machine().parse(plaintext) == ciphertext
+
+    def test_bad_settings(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            dataset.generate(tmp_path, 10, 1, models=["M5"])
+        with pytest.raises(ValueError):
+            dataset.generate(tmp_path, 10, 1, plugs=14)
+        with pytest.raises(ValueError):
+            dataset.generate(tmp_path, 10, 1, length=500, corpus=CORPUS, workers=1)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
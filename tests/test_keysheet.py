@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from python_enigma import enigma
+from python_enigma.keysheet import (
+    DailyKey,
+    IndicatorInvalid,
+    KeySheet,
+    read_key_sheet,
+    read_messages,
+    write_key_sheet,
+)
+
+DAYS = [
+    DailyKey("1938-09-01", ("I", "II", "III"), "ABC", "AQ BJ", "Reflector B", "QWE"),
+    DailyKey("1938-09-02", ("IV", "V", "I"), "XYZ", None, "Reflector C", "RTZ"),
+    DailyKey(
+        "1942-02-01",
+        ("Beta", "V", "VI", "VIII"),
+        "EPEL",
+        "AE BF CM",
+        "Reflector C Thin",
+    ),
+]
+TEXT = "HELLO WORLD"
+
+
+class TestKeySheet:
+    def test_plain_indicator(self) -> None:
+        sheet = KeySheet(DAYS)
+        machine = enigma.Enigma(
+            rotors=list(zip(("I", "II", "III"), "ABC")),
+            reflector="Reflector B",
+            stecker="AQ BJ",
+            operator=False,
+        )
+        machine.set_wheels("XYZ")
+        ciphertext = machine.parse(TEXT)
+        assert sheet.decrypt("1938-09-01", "XYZ", ciphertext) == (
+            "1938-09-01",
+            "XYZ",
+            TEXT,
+        )
+
+    @pytest.mark.parametrize("grundstellung", [None, "PDQ"])
+    def test_double_indicator(self, grundstellung: str | None) -> None:
+        sheet = KeySheet(DAYS)
+        indicator, ciphertext = sheet.encrypt(
+            "1938-09-02", "LOK", TEXT, double=True, grundstellung=grundstellung
+        )
+        assert len(indicator) == (9 if grundstellung else 6)
+        assert indicator.startswith(grundstellung or "")
+        decrypt = sheet.decrypt("1938-09-02", indicator, ciphertext, double=True)
+        assert decrypt.message_key == "LOK"
+        assert decrypt.plaintext == TEXT
+
+    def test_bad_indicator(self) -> None:
+        sheet = KeySheet(DAYS)
+        indicator, _ = sheet.encrypt("1938-09-01", "LOK", TEXT, double=True)
+        garbled = indicator[:5] + ("A" if indicator[5] != "A" else "B")
+        with pytest.raises(IndicatorInvalid):
+            sheet.message_key("1938-09-01", garbled, double=True)
+        with pytest.raises(IndicatorInvalid):
+            sheet.message_key("1938-09-01", "ABCD", double=True)
+        with pytest.raises(ValueError):
+            sheet.message_key("1942-02-01", "ABCDEFGH", double=True)
+
+    def test_cache(self) -> None:
+        sheet = KeySheet(DAYS, maxsize=2)
+        records = []
+        for key in DAYS:
+            indicator, ciphertext = sheet.encrypt(
+                key.date, "AAAA"[: len(key.rotors)], TEXT
+            )
+            records += [(key.date, indicator, ciphertext)] * 3
+        sheet.clear()
+
+        decrypts = list(sheet.decrypt_all(records))
+        assert [d.plaintext for d in decrypts] == [TEXT] * 9
+        assert sheet.info() == enigma.CacheInfo(6, 3, 2, 2)
+        assert sheet.config(DAYS[2].date) is sheet.config(DAYS[2].date)
+        with pytest.raises(KeyError):
+            sheet.config("1900-01-01")
+
+    def test_files(self, tmp_path: Path) -> None:
+        write_key_sheet(tmp_path / "sheet.tsv", DAYS)
+        assert read_key_sheet(tmp_path / "sheet.tsv") == DAYS
+
+        sheet = KeySheet.from_file(tmp_path / "sheet.tsv")
+        indicator, ciphertext = sheet.encrypt("1942-02-01", "CDSZ", TEXT)
+        (tmp_path / "messages.tsv").write_text(
+            f"date\tindicator\tciphertext\n1942-02-01\t{indicator}\t{ciphertext}\n"
+        )
+        records = read_messages(tmp_path / "messages.tsv")
+        assert [d.plaintext for d in sheet.decrypt_all(records)] == [TEXT]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
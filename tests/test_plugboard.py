@@ -0,0 +1,118 @@
+import sys
+import pytest
+
+from python_enigma import enigma, plugboard, scoring
+
+PLAINTEXT = (
+    "Die Lage an der Front ist unveraendert. Der Feind greift weiterhin mit "
+    "starken Kraeften an. Verstaerkungen werden dringend benoetigt. Munition "
+    "und Treibstoff sind knapp. Wir halten die Stellung bis zum letzten Mann "
+    "und erwarten weitere Befehle des Oberkommandos. "
+) * 2
+CORPUS = (
+    "Das Wetter ist heute klar und die Sicht ist gut. Die Truppen stehen "
+    "bereit und warten auf den Befehl zum Angriff. Der Kommandant meldet, "
+    "dass der Gegner sich zurueckgezogen hat und die Bruecke unbeschaedigt "
+    "ist. Nachschub an Munition und Verpflegung wird fuer morgen erwartet. "
+    "Alle Einheiten halten ihre Stellungen und melden jede Bewegung des "
+    "Feindes sofort an die Division. Die Verbindung zur Armee ist wieder "
+    "hergestellt. Ende der Meldung."
+)
+ROTORS = [("II", "A"), ("IV", "C"), ("III", "F")]
+
+
+def machine(stecker: str | None = None) -> enigma.Enigma:
+    result = enigma.Enigma(
+        rotors=ROTORS, reflector="Reflector B", stecker=stecker, operator=False
+    )
+    result.set_wheels("KDQ")
+    return result
+
+
+class TestScramblers:
+    def test_matches_machine(self) -> None:
+        text = "ABCDEFGHIJKLMNOPQRSTUVWXYZ" * 30
+        stecker = plugboard.plug(range(26), 0, 16)
+        stecker = plugboard.plug(stecker, 1, 9)
+        expected = machine("AQ BJ").parse(text)
+
+        unmoved = machine()
+        sequence = plugboard.ScramblerSequence.build(unmoved, len(text))
+        assert [r.position for r in unmoved.wheel_pack.rotors] == [16, 3, 10]
+        assert len(sequence) == len(text)
+        deciphered = "".join(
+            chr(65 + stecker[sequence[k][stecker[ord(c) - 65]]])
+            for k, c in enumerate(text)
+        )
+        assert deciphered == expected
+
+    @pytest.mark.parametrize("stecker", [None, "AQ BJ", "AQ BJ CX DM EZ FN"])
+    def test_apply(self, stecker: str | None) -> None:
+        text = PLAINTEXT.upper().replace(" ", "").replace(".", "")
+        sequence = plugboard.ScramblerSequence.build(machine(), len(text))
+        expected = machine(stecker).parse(text).encode("ascii")
+        assert sequence.apply(text.encode("ascii"), stecker) == expected
+        assert sequence.apply(text.encode("ascii"), enigma.Stecker(stecker)) == (
+            expected
+        )
+        with pytest.raises(ValueError):
+            sequence.apply(b"A" * (len(text) + 1))
+        for bad in [b"HELLO WORLD", b"hello", b"A1"]:
+            with pytest.raises(ValueError):
+                sequence.apply(bad)
+
+
+class TestScramblerCache:
+    def test_shared_across_steckers(self) -> None:
+        cache = plugboard.ScramblerCache()
+        first = cache.get(machine("AQ"), 100)
+        assert cache.get(machine("BJ CX"), 100) is first
+        assert cache.get(machine(), 50) is first
+        assert cache.info().hits == 2
+
+        moved = machine()
+        moved.set_wheels("KDR")
+        assert cache.get(moved, 100) is not first
+        longer = cache.get(machine(), 200)
+        assert len(longer) == 200
+        assert cache.info().misses == 3
+        assert cache.info().currsize == longer.nbytes + cache.get(moved, 1).nbytes
+
+    def test_evicts_by_size(self) -> None:
+        size = plugboard.ScramblerSequence.build(machine(), 100).nbytes
+        cache = plugboard.ScramblerCache(max_bytes=2 * size)
+        for positions in ("AAA", "BBB", "CCC"):
+            moved = machine()
+            moved.set_wheels(positions)
+            cache.get(moved, 100)
+        assert cache.info().currsize <= 2 * size
+        oldest = machine()
+        oldest.set_wheels("AAA")
+        cache.get(oldest, 100)
+        assert cache.info().hits == 0
+        cache.clear()
+        assert cache.info() == (0, 0, 2 * size, 0)
+
+
+class TestClimb:
+    @pytest.mark.parametrize("stecker", ["AQ BJ", "AQ BJ CX DM EZ FN"])
+    def test_recovers_stecker(self, stecker: str) -> None:
+        table = scoring.NgramTable.from_text(CORPUS, 2)
+        ciphertext = machine(stecker).parse(PLAINTEXT)
+        result = plugboard.climb(ciphertext, machine(), table)
+        assert result.stecker == stecker
+        decrypt = machine(result.stecker).parse(ciphertext)
+        assert result.score == pytest.approx(table.score(scoring.encode(decrypt)))
+
+    def test_max_pairs(self) -> None:
+        table = scoring.NgramTable.from_text(CORPUS, 2)
+        ciphertext = machine("AQ BJ CX DM EZ FN").parse(PLAINTEXT)
+        result = plugboard.climb(ciphertext, machine(), table, max_pairs=2)
+        assert result.stecker is not None
+        assert len(result.stecker.split()) <= 2
+        with pytest.raises(ValueError):
+            plugboard.climb(ciphertext, machine(), table, "AB CD EF", max_pairs=2)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+import pytest
+
+from python_enigma import scoring
+
+GERMAN = (
+    "Die Lage an der Front ist unveraendert. Der Feind greift weiterhin mit "
+    "starken Kraeften an. Verstaerkungen werden dringend benoetigt."
+)
+ENGLISH = (
+    "The situation at the front is unchanged. The enemy continues to attack "
+    "in strength. Reinforcements are urgently needed."
+)
+
+
+class TestNgramTable:
+    def test_from_text(self) -> None:
+        table = scoring.NgramTable.from_text("ab ab, BA!", 2)
+        assert len(table.log_probs) == 26**2
+        assert table.log_probs[scoring.index([0, 1], 0, 2)] == pytest.approx(
+            -0.3979, abs=1e-4
+        )
+        assert table.score([0, 1, 0]) == pytest.approx(sum(table.scores([0, 1, 0])))
+        with pytest.raises(ValueError):
+            scoring.NgramTable(2, [0.0] * 26)
+
+    def test_encode(self) -> None:
+        assert scoring.encode("Grüße, Zoë!") == scoring.encode("GRUESSEZO")
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 4])
+    def test_load(self, n: int) -> None:
+        german = scoring.NgramTable.load("german", n)
+        english = scoring.NgramTable.load("english", n)
+        assert scoring.NgramTable.load("german", n) is german
+        assert len(german.log_probs) == 26**n
+        if n > 1:
+            assert german.score_text(GERMAN) > english.score_text(GERMAN)
+            assert english.score_text(ENGLISH) > german.score_text(ENGLISH)
+
+    def test_load_unknown(self) -> None:
+        with pytest.raises(ValueError):
+            scoring.NgramTable.load("klingon")
+        with pytest.raises(ValueError):
+            scoring.NgramTable.load("german", 5)
+
+    def test_counts_round_trip(self, tmp_path: Path) -> None:
+        counts = {n: scoring.count_text(GERMAN, n) for n in (1, 3)}
+        path = tmp_path / "ngrams.bin"
+        scoring.write_counts(path, counts)
+        assert scoring.read_counts(path) == counts
+        assert scoring.read_counts(path, only=3) == {3: counts[3]}
+        path.write_bytes(b"not a table")
+        with pytest.raises(ValueError):
+            scoring.read_counts(path)
+
+    def test_score_many(self) -> None:
+        np = pytest.importorskip("numpy")
+        table = scoring.NgramTable.load("german", 4)
+        texts = [scoring.encode(GERMAN)[:60], scoring.encode(ENGLISH)[:60]]
+        codes = np.array(texts, dtype=np.uint8)
+        expected = [table.score(text) for text in texts]
+        assert table.score_many(codes) == pytest.approx(expected)
+        assert table.score_many(codes + 65) == pytest.approx(expected)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(args=[__file__]))